@@ -0,0 +1,6 @@
+"""
+性能测试，不会随包发布
+
+运行方式: ``python -m benchmarks``（渲染热路径）、``python -m benchmarks.kmarkdown``、``python -m benchmarks.fields``、
+``python -m benchmarks.actions``
+"""
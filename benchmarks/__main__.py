@@ -0,0 +1,74 @@
+"""
+运行渲染热路径的性能测试
+
+ex::
+
+    python -m benchmarks -o before.json
+    git checkout other-branch
+    python -m benchmarks -o after.json --compare before.json
+    python -m benchmarks --compare before.json after.json
+"""
+import argparse
+import sys
+from typing import List
+
+from .render import CASES, Result, compare, load, run, save
+from .shapes import DEFAULT_SEED, SHAPES
+
+
+def _print_header() -> None:
+    print(f'{"case":<24} {"shape":<8} {"ops/sec":>12} {"us/op":>12} {"blocks":>9} {"peak KiB":>10}')
+
+
+def _print_result(result: Result) -> None:
+    print(f'{result.case:<24} {result.shape:<8} {result.ops:>12.1f} {result.us:>12.1f} {result.blocks:>9} '
+          f'{result.peak / 1024:>10.1f}', flush=True)
+
+
+def _print_compare(old: List[Result], new: List[Result], threshold: float) -> int:
+    """:return: 变慢超过阈值的数量"""
+    print(f'{"case":<24} {"shape":<8} {"time":>8} {"blocks":>8} {"peak":>8}')
+    slower = 0
+    for i in compare(old, new):
+        mark = ''
+        if i['time'] > 1 + threshold:
+            mark = '  slower'
+            slower += 1
+        elif i['time'] < 1 - threshold:
+            mark = '  faster'
+        print(f'{i["case"]:<24} {i["shape"]:<8} {i["time"]:>7.2f}x {i["blocks"]:>7.2f}x {i["peak"]:>7.2f}x{mark}')
+    return slower
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='khl_card 渲染性能测试')
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help='只运行这些用例')
+    parser.add_argument('--shapes', nargs='+', choices=list(SHAPES), help='只使用这些形状')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='生成形状使用的随机种子')
+    parser.add_argument('--min-time', type=float, default=0.2, help='每轮至少运行的秒数')
+    parser.add_argument('--rounds', type=int, default=3, help='轮数，取最快的一轮')
+    parser.add_argument('-o', '--output', help='把结果保存为 json')
+    parser.add_argument('--compare', nargs='+', metavar='FILE',
+                        help='一个文件时与本次结果比较，两个文件时只比较这两个文件')
+    parser.add_argument('--threshold', type=float, default=0.1, help='耗时变化超过该比例时标记')
+    parser.add_argument('--fail-on-regression', action='store_true', help='有用例变慢超过阈值时返回非零值')
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare 最多两个文件')
+    if args.compare and len(args.compare) == 2:
+        new = load(args.compare[1])['results']
+    else:
+        _print_header()
+        new = run(args.cases, args.shapes, args.seed, args.min_time, args.rounds, report=_print_result)
+        if args.output:
+            save(args.output, new, args.seed)
+    if not args.compare:
+        return 0
+    print()
+    slower = _print_compare(load(args.compare[0])['results'], new, args.threshold)
+    return 1 if slower and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+比较按钮点击的两种处理方式：value 中放 json、用 if/elif 按动作名分发，与 ``ActionRegistry`` 的紧凑编码和字典分发
+
+运行方式: ``python -m benchmarks.actions``
+"""
+import json
+import random
+import timeit
+from typing import Callable, List, Optional, Tuple
+
+from khl_card import ActionRegistry
+
+# 处理函数的个数
+ACTIONS = 20
+# 每轮处理的点击数
+CLICKS = 10000
+
+
+def _handler(index: int) -> Callable:
+    def handler(event, poll: int, option: int) -> int:
+        return index + poll + option
+
+    handler.__qualname__ = f'action_{index}'
+    return handler
+
+
+def make_registry() -> ActionRegistry:
+    registry = ActionRegistry()
+    for i in range(ACTIONS):
+        registry.action(_handler(i))
+    return registry
+
+
+def json_dispatch(value: str, event) -> Optional[int]:
+    """原来的写法：解析 json 后按动作名逐个比较"""
+    try:
+        data = json.loads(value)
+    except ValueError:
+        return None
+    action = data.get('action')
+    for i in range(ACTIONS):
+        if action == f'action_{i}':
+            return i + data['poll'] + data['option']
+    return None
+
+
+def make_clicks(registry: ActionRegistry, seed: int = 20221101) -> Tuple[List[str], List[str]]:
+    """:return: (紧凑编码的 value, json 形式的 value)，内容一一对应"""
+    rnd = random.Random(seed)
+    actions = registry.actions
+    compact, legacy = [], []
+    for _ in range(CLICKS):
+        i = rnd.randrange(ACTIONS)
+        poll, option = rnd.randrange(100000), rnd.randrange(10)
+        compact.append(actions[i].encode(poll, option))
+        legacy.append(json.dumps({'action': f'action_{i}', 'poll': poll, 'option': option}))
+    return compact, legacy
+
+
+def measure(func) -> float:
+    """:return: 每秒处理的点击数"""
+    timer = timeit.Timer(func)
+    return CLICKS / min(timer.repeat(5, 1))
+
+
+def main() -> None:
+    registry = make_registry()
+    compact, legacy = make_clicks(registry)
+    assert [registry.dispatch(i, None) for i in compact] == [json_dispatch(i, None) for i in legacy]
+    compact_len = sum(map(len, compact)) / CLICKS
+    legacy_len = sum(map(len, legacy)) / CLICKS
+    json_rate = measure(lambda: [json_dispatch(i, None) for i in legacy])
+    registry_rate = measure(lambda: [registry.dispatch(i, None) for i in compact])
+    print(f'{"":<16} {"avg value length":>17} {"clicks/s":>12}')
+    print(f'{"json + if/elif":<16} {legacy_len:>17.1f} {json_rate:>12,.0f}')
+    print(f'{"ActionRegistry":<16} {compact_len:>17.1f} {registry_rate:>12,.0f}')
+    print(f'speedup {registry_rate / json_rate:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+使用 pytest-benchmark 运行 ``render`` 中的用例，需要显式指定文件::
+
+    pytest benchmarks/bench_render.py --benchmark-json=result.json
+    pytest-benchmark compare
+"""
+import pytest
+
+from .render import CASES
+from .shapes import DEFAULT_SEED, SHAPES, make_specs
+
+pytest.importorskip('pytest_benchmark')
+
+
+@pytest.mark.parametrize('shape', list(SHAPES))
+@pytest.mark.parametrize('name', list(CASES))
+def test_render(benchmark, name: str, shape: str) -> None:
+    case = CASES[name]
+    specs = make_specs(shape, DEFAULT_SEED)
+    if case.reuse:
+        shared = case.prepare(specs)
+        benchmark(case.func, shared)
+    else:
+        # 每次调用前重新准备对象，准备的耗时不计入结果
+        benchmark.pedantic(case.func, setup=lambda: ((case.prepare(specs),), {}), rounds=20, warmup_rounds=1)
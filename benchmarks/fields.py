@@ -0,0 +1,123 @@
+"""
+比较字段声明生成的 ``build`` 与原来手写的 ``build``（逐个 append 的循环与字典字面量）
+
+手写版本原样保存在这里，测试时临时替换到类上，使用相同的对象比较
+
+运行方式: ``python -m benchmarks.fields``
+"""
+import timeit
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator
+
+from khl_card import ActionGroup, Audio, Button, Container, Context, Countdown, Divider, File, Header, Image, \
+    ImageGroup, Invite, Kmarkdown, Paragraph, PlainText, Section, Video
+
+from .shapes import SHAPES, make_message, make_specs
+
+
+def _text(self) -> dict:
+    return {'type': self.type, 'content': self.content}
+
+
+def _paragraph(self) -> dict:
+    ret = {'type': self.type, 'cols': self.cols, 'fields': []}
+    for i in self.fields:
+        ret['fields'].append(i.build())
+    return ret
+
+
+def _image(self) -> dict:
+    return {'type': self.type, 'src': self.src, 'alt': self.alt, 'size': self.size, 'circle': self.circle}
+
+
+def _button(self) -> dict:
+    return {'type': self.type, 'theme': self.theme, 'value': self.value, 'click': self.click,
+            'text': self.text.build()}
+
+
+def _header(self) -> dict:
+    return {"type": self.type, "text": self.text.build()}
+
+
+def _section(self) -> dict:
+    ret = {'type': self.type, 'mode': self.mode, 'text': self.text.build()}
+    if self.accessory is None:
+        return ret
+    ret['accessory'] = self.accessory.build()
+    return ret
+
+
+def _elements(self) -> dict:
+    ret = {'type': self.type, 'elements': []}
+    for i in self.elements:
+        ret['elements'].append(i.build())
+    return ret
+
+
+def _divider(self) -> dict:
+    return {'type': self.type}
+
+
+def _countdown(self) -> dict:
+    return {'type': self.type, 'mode': self.mode, 'endTime': self.endTime, 'startTime': self.startTime}
+
+
+def _invite(self) -> dict:
+    return {'type': self.type, 'code': self.code}
+
+
+def _file(self) -> dict:
+    return {'type': self.type, 'src': self.src, 'title': self.title}
+
+
+def _audio(self) -> dict:
+    ret = _file(self)
+    ret['cover'] = self.cover if self.cover is not None else ''
+    return ret
+
+
+LEGACY: Dict[type, Callable] = {
+    PlainText: _text, Kmarkdown: _text, Paragraph: _paragraph, Image: _image, Button: _button, Header: _header,
+    Section: _section, ImageGroup: _elements, Container: _elements, ActionGroup: _elements, Context: _elements,
+    Divider: _divider, Countdown: _countdown, Invite: _invite, File: _file, Video: _file, Audio: _audio,
+}
+
+
+@contextmanager
+def legacy() -> Iterator[None]:
+    """在此期间使用手写的 build"""
+    saved = {cls: cls.__dict__.get('build') for cls in LEGACY}
+    for cls, func in LEGACY.items():
+        cls.build = func
+    try:
+        yield
+    finally:
+        for cls, func in saved.items():
+            if func is None:
+                del cls.build
+            else:
+                cls.build = func
+
+
+def measure(func) -> float:
+    """:return: 单次调用的耗时（微秒）"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(5, number)) / number * 1e6
+
+
+def main() -> None:
+    print(f'{"shape":<8} {"modules":>8} {"handwritten (us)":>17} {"generated (us)":>15} {"speedup":>8}')
+    for shape in SHAPES:
+        message = make_message(make_specs(shape))
+        generated = message.build()
+        with legacy():
+            assert message.build() == generated
+            old = measure(message.build)
+        new = measure(message.build)
+        modules = sum(len(card) for card in message)
+        print(f'{shape:<8} {modules:>8} {old:>17.1f} {new:>15.1f} {old / new:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+比较用 ``Kmarkdown.__add__`` 与 ``KmarkdownBuilder`` 拼接排行榜文本的耗时
+
+运行方式: ``python -m benchmarks.kmarkdown``
+"""
+import timeit
+
+from khl_card import Kmarkdown, KmarkdownBuilder, KmarkdownColors
+
+# 每行约 50 个字符，100 行约 5000 个字符
+ROWS = (10, 25, 50, 100, 200)
+
+
+def by_add(rows: int) -> Kmarkdown:
+    ret = Kmarkdown()
+    for i in range(rows):
+        ret = ret + Kmarkdown(f'{i + 1}. ') + Kmarkdown.at_user(str(10000000 + i)) + Kmarkdown(' ') + \
+              Kmarkdown.bold(str(i * 37)) + Kmarkdown.color('pts', KmarkdownColors.SUCCESS) + Kmarkdown('\n')
+    return ret
+
+
+def by_builder(rows: int) -> Kmarkdown:
+    builder = KmarkdownBuilder()
+    for i in range(rows):
+        builder.text(f'{i + 1}. ').at_user(str(10000000 + i)).text(' ').bold(str(i * 37)) \
+            .color('pts', KmarkdownColors.SUCCESS).newline()
+    return builder.build()
+
+
+def measure(func, rows: int) -> float:
+    """:return: 单次调用的耗时（微秒）"""
+    timer = timeit.Timer(lambda: func(rows))
+    number, _ = timer.autorange()
+    return min(timer.repeat(3, number)) / number * 1e6
+
+
+def main() -> None:
+    assert by_add(20).content == by_builder(20).content
+    print(f'{"rows":>6} {"chars":>7} {"__add__ (us)":>14} {"builder (us)":>14} {"us/row add":>12} {"us/row builder":>15}')
+    for rows in ROWS:
+        chars = len(by_builder(rows).content)
+        add = measure(by_add, rows)
+        builder = measure(by_builder, rows)
+        print(f'{rows:>6} {chars:>7} {add:>14.1f} {builder:>14.1f} {add / rows:>12.2f} {builder / rows:>15.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+渲染热路径的性能测试：构造、``build()``、``build_to_json()``、``__repr__`` 与卡片消息的组装
+
+每个用例在每个形状上测量每秒次数，并用 tracemalloc 统计单次调用新分配的内存块数与内存峰值。
+结果可以保存为 json，之后与另一次提交的结果比较。
+"""
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from khl_card import CardMessage, serialization_cache
+
+from .shapes import DEFAULT_SEED, SHAPES, make_cards, make_message, make_message_by_builder, make_specs
+
+__all__ = ['Case', 'CASES', 'Result', 'run', 'save', 'load', 'compare']
+
+# 结果文件的格式版本
+FORMAT_VERSION = 1
+
+
+class Case(NamedTuple):
+    """
+    一个测试用例
+    """
+    # 每次调用前执行，不计入耗时，参数为形状的描述
+    prepare: Callable[[list], Any]
+    # 被测量的调用，参数为 prepare 的返回值
+    func: Callable[[Any], Any]
+    # 为真时 prepare 只执行一次，所有调用共用同一个对象（测量缓存命中的情况）
+    reuse: bool = False
+
+
+def _fresh_json(message: CardMessage) -> str:
+    # 内容相同的卡片指纹相同，需要清空缓存才能测量真正的序列化
+    serialization_cache.clear()
+    return message.build_to_json(pretty=True)
+
+
+CASES: Dict[str, Case] = {
+    'construct': Case(lambda specs: specs, make_message),
+    'construct_builder': Case(lambda specs: specs, make_message_by_builder),
+    'assemble_message': Case(make_cards, lambda cards: CardMessage(*cards)),
+    'build': Case(make_message, CardMessage.build),
+    'build_to_json_compact': Case(make_message, lambda message: message.build_to_json(pretty=False)),
+    'build_to_json_pretty': Case(make_message, _fresh_json),
+    'build_to_json_cached': Case(make_message, CardMessage.build_to_json, reuse=True),
+    'repr': Case(make_message, repr),
+}
+
+
+class Result(NamedTuple):
+    """
+    一个用例在一个形状上的结果
+    """
+    case: str
+    shape: str
+    # 每秒次数
+    ops: float
+    # 单次调用的耗时（微秒），取各轮中最快的一轮
+    us: float
+    # 单次调用新分配且在返回时仍未释放的内存块数（包括返回值）
+    blocks: int
+    # 单次调用期间的内存峰值（字节）
+    peak: int
+
+
+def _timing(case: Case, specs: list, min_time: float, rounds: int) -> float:
+    """:return: 单次调用的耗时（秒）"""
+    best = float('inf')
+    shared = case.prepare(specs) if case.reuse else None
+    case.func(shared if case.reuse else case.prepare(specs))  # 预热
+    for _ in range(rounds):
+        total = 0.0
+        count = 0
+        # prepare 比被测调用慢得多时（例如 huge 的组装）按实际经过的时间提前结束，至少测量 5 次
+        deadline = time.perf_counter() + min_time * 10
+        while total < min_time and (count < 5 or time.perf_counter() < deadline):
+            obj = shared if case.reuse else case.prepare(specs)
+            start = time.perf_counter()
+            case.func(obj)
+            total += time.perf_counter() - start
+            count += 1
+        best = min(best, total / count)
+    return best
+
+
+_IGNORE = (tracemalloc.Filter(False, tracemalloc.__file__),)
+
+
+def _memory(case: Case, specs: list) -> Tuple[int, int]:
+    """:return: (新分配的内存块数, 内存峰值)"""
+    obj = case.prepare(specs)
+    if case.reuse:
+        case.func(obj)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+        base = tracemalloc.get_traced_memory()[0]
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        result = case.func(obj)
+        peak = tracemalloc.get_traced_memory()[1] - base
+        after = tracemalloc.take_snapshot().filter_traces(_IGNORE)
+        del result
+    finally:
+        tracemalloc.stop()
+    blocks = sum(i.count_diff for i in after.compare_to(before, 'filename'))
+    return max(blocks, 0), max(peak, 0)
+
+
+def run(cases: Optional[Iterable[str]] = None, shapes: Optional[Iterable[str]] = None, seed: int = DEFAULT_SEED,
+        min_time: float = 0.2, rounds: int = 3,
+        report: Optional[Callable[[Result], None]] = None) -> List[Result]:
+    """
+    运行测试
+
+    :param cases: ``CASES`` 中的名称，为 None 时运行全部
+    :param shapes: ``SHAPES`` 中的名称，为 None 时运行全部
+    :param seed: 生成形状使用的随机种子
+    :param min_time: 每轮至少运行的时间（秒）
+    :param rounds: 轮数，取最快的一轮
+    :param report: 每得到一个结果时调用
+    :return: 所有结果
+    """
+    out = []
+    for shape in (SHAPES if shapes is None else shapes):
+        specs = make_specs(shape, seed)
+        for name in (CASES if cases is None else cases):
+            case = CASES[name]
+            seconds = _timing(case, specs, min_time, rounds)
+            blocks, peak = _memory(case, specs)
+            result = Result(name, shape, 1 / seconds, seconds * 1e6, blocks, peak)
+            out.append(result)
+            if report is not None:
+                report(result)
+    return out
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(path: str, results: List[Result], seed: int = DEFAULT_SEED) -> None:
+    """
+    保存结果
+
+    :param path: 文件路径
+    :param results: ``run`` 的结果
+    :param seed: 生成形状使用的随机种子
+    """
+    data = {
+        'version': FORMAT_VERSION,
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'seed': seed,
+        'results': [i._asdict() for i in results],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def load(path: str) -> dict:
+    """
+    读取 ``save`` 保存的结果
+
+    :param path: 文件路径
+    :return: 结果文件的内容，results 为 ``Result`` 列表
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != FORMAT_VERSION:
+        raise Exception(f'不支持的结果文件版本 {data.get("version")}')
+    data['results'] = [Result(**i) for i in data['results']]
+    return data
+
+
+def _ratio(new: float, old: float) -> float:
+    if old:
+        return new / old
+    return 1.0 if new == 0 else float('inf')
+
+
+def compare(old: List[Result], new: List[Result]) -> List[Dict[str, Any]]:
+    """
+    比较两次运行的结果，只比较两边都有的用例与形状
+
+    :param old: 原来的结果
+    :param new: 新的结果
+    :return: 每项包含 case、shape 与 新/旧 的耗时、内存块数与内存峰值比例，耗时比例大于 1 表示变慢
+    """
+    before = {(i.case, i.shape): i for i in old}
+    out = []
+    for i in new:
+        j = before.get((i.case, i.shape))
+        if j is None:
+            continue
+        out.append({
+            'case': i.case,
+            'shape': i.shape,
+            'time': i.us / j.us,
+            'blocks': _ratio(i.blocks, j.blocks),
+            'peak': _ratio(i.peak, j.peak),
+        })
+    return out
@@ -0,0 +1,158 @@
+"""
+按固定随机种子生成的卡片消息形状，从只有一个内容模块到包含数百个模块、图片组与交互模块填满上限
+
+同一个种子总是生成相同的内容，因此不同提交之间的结果可以直接比较
+"""
+import random
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from khl_card import ActionGroup, Button, Card, CardBuilder, CardMessage, CardMessageBuilder, Context, Divider, \
+    File, Header, Image, ImageGroup, Invite, Kmarkdown, Paragraph, PlainText, Section
+from khl_card.limits import MAX_BUTTONS, MAX_CONTEXT_ELEMENTS, MAX_IMAGES
+
+__all__ = ['Shape', 'SHAPES', 'DEFAULT_SEED', 'make_specs', 'make_message', 'make_message_by_builder', 'make_cards']
+
+DEFAULT_SEED = 20221101
+
+# (模块种类, 参数)
+_Spec = Tuple[str, tuple]
+
+
+class Shape(NamedTuple):
+    """
+    卡片消息的形状
+    """
+    # 卡片数
+    cards: int
+    # 每张卡片的模块数（不含标题）
+    modules: int
+    # 各种模块的权重
+    weights: Dict[str, int]
+
+
+_TEXT_ONLY = {'section': 1}
+_MIXED = {'section': 6, 'paragraph': 1, 'divider': 2, 'context': 2, 'image_group': 1, 'action_group': 1,
+          'file': 1, 'invite': 1}
+# 图片组、交互模块与备注模块都填满上限
+_HEAVY = {'section': 2, 'image_group': 2, 'action_group': 2, 'context': 2, 'divider': 1}
+
+SHAPES: Dict[str, Shape] = {
+    'tiny': Shape(1, 1, _TEXT_ONLY),
+    'small': Shape(1, 8, _MIXED),
+    'medium': Shape(2, 25, _MIXED),
+    'large': Shape(5, 10, _MIXED),
+    'huge': Shape(5, 100, _HEAVY),
+}
+
+_WORDS = ('卡片', 'card', 'message', '消息', 'kook', 'bot', '排行', 'score', 'hello', '世界')
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(_WORDS) for _ in range(words))
+
+
+def _url(rng: random.Random, ext: str) -> str:
+    return f'https://img.kookapp.cn/assets/{rng.getrandbits(64):016x}.{ext}'
+
+
+def _spec(kind: str, rng: random.Random, heavy: bool) -> _Spec:
+    if kind == 'section':
+        button = rng.random() < 0.3
+        return kind, (_text(rng, rng.randint(3, 30)), _text(rng, 2) if button else None, str(rng.getrandbits(32)))
+    if kind == 'paragraph':
+        return kind, tuple(_text(rng, rng.randint(1, 5)) for _ in range(rng.randint(2, 3)))
+    if kind == 'image_group':
+        count = MAX_IMAGES if heavy else rng.randint(1, MAX_IMAGES)
+        return kind, tuple(_url(rng, 'png') for _ in range(count))
+    if kind == 'action_group':
+        count = MAX_BUTTONS if heavy else rng.randint(1, MAX_BUTTONS)
+        return kind, tuple((_text(rng, 1), str(rng.getrandbits(32))) for _ in range(count))
+    if kind == 'context':
+        count = MAX_CONTEXT_ELEMENTS if heavy else rng.randint(1, MAX_CONTEXT_ELEMENTS)
+        return kind, tuple(_text(rng, rng.randint(1, 4)) for _ in range(count))
+    if kind == 'file':
+        return kind, (_url(rng, 'zip'), _text(rng, 2))
+    if kind == 'invite':
+        return kind, (f'{rng.getrandbits(24):06x}',)
+    return kind, ()
+
+
+def make_specs(name: str, seed: int = DEFAULT_SEED) -> List[Tuple[str, List[_Spec]]]:
+    """
+    生成形状的描述，与具体的构造方式无关
+
+    :param name: ``SHAPES`` 中的名称
+    :param seed: 随机种子
+    :return: 每张卡片的 (标题, 模块描述)
+    """
+    shape = SHAPES[name]
+    rng = random.Random(f'{name}:{seed}')
+    kinds = list(shape.weights)
+    weights = list(shape.weights.values())
+    heavy = shape.weights is _HEAVY
+    return [(_text(rng, 3), [_spec(rng.choices(kinds, weights)[0], rng, heavy) for _ in range(shape.modules)])
+            for _ in range(shape.cards)]
+
+
+def _section(args: tuple) -> Section:
+    content, button, value = args
+    accessory = Button(PlainText(button), value=value) if button is not None else None
+    return Section(Kmarkdown(content), accessory=accessory)
+
+
+def _paragraph(args: tuple) -> Section:
+    return Section(Paragraph(len(args), [Kmarkdown(i) for i in args]))
+
+
+def _context(args: tuple) -> Context:
+    return Context(*(PlainText(i) if n % 2 else Kmarkdown(i) for n, i in enumerate(args)))
+
+
+_FACTORIES: Dict[str, Callable[[tuple], object]] = {
+    'section': _section,
+    'paragraph': _paragraph,
+    'divider': lambda args: Divider(),
+    'context': _context,
+    'image_group': lambda args: ImageGroup(*(Image(i) for i in args)),
+    'action_group': lambda args: ActionGroup(*(Button(PlainText(t), value=v) for t, v in args)),
+    'file': lambda args: File(*args),
+    'invite': lambda args: Invite(*args),
+}
+
+
+def make_cards(specs: List[Tuple[str, List[_Spec]]]) -> List[Card]:
+    """直接使用构造函数创建卡片"""
+    return [Card(Header(title), *(_FACTORIES[kind](args) for kind, args in modules)) for title, modules in specs]
+
+
+def make_message(specs: List[Tuple[str, List[_Spec]]]) -> CardMessage:
+    """直接使用构造函数创建卡片消息"""
+    return CardMessage(*make_cards(specs))
+
+
+def make_message_by_builder(specs: List[Tuple[str, List[_Spec]]]) -> CardMessage:
+    """使用 ``CardBuilder`` 创建卡片消息，内容与 ``make_message`` 相同"""
+    message = CardMessageBuilder()
+    for title, modules in specs:
+        builder = CardBuilder().header(title)
+        for kind, args in modules:
+            if kind == 'section':
+                content, button, value = args
+                builder.section(Kmarkdown(content),
+                                accessory=Button(PlainText(button), value=value) if button is not None else None)
+            elif kind == 'divider':
+                builder.divider()
+            elif kind == 'file':
+                builder.file(*args)
+            elif kind == 'invite':
+                builder.invite(*args)
+            elif kind == 'image_group':
+                builder.image_group(_FACTORIES[kind](args))
+            elif kind == 'action_group':
+                builder.action_group(_FACTORIES[kind](args))
+            elif kind == 'context':
+                builder.context(_context(args))
+            else:
+                builder.section(_paragraph(args).text)
+        message.card(builder.build())
+    return message.build()
@@ -1,8 +1,19 @@
 from .accessory import PlainText, Kmarkdown, Paragraph, Image, Button
 from .builder import CardBuilder, CardMessageBuilder, ImageGroupBuilder, ContainerBuilder, ContextBuilder, \
-    ActionGroupBuilder
+    ActionGroupBuilder, KmarkdownBuilder
 from .card import Card, CardMessage
 from .modules import Header, Section, ImageGroup, Container, Context, ActionGroup, File, Audio, Video, Divider, Invite, \
     Countdown
 from .types import ThemeTypes, SizeTypes, NamedColor, KmarkdownColors
 from .color import Color
+from .template import CardTemplate, Repeat
+from .limits import trusted
+from .validator import validate, Violation, CardValidationError
+from .pagination import split_cards, paginate_rows
+from .node import SerializedSize
+from .pool import intern
+from .cache import serialization_cache
+from .serializer import configure_json, get_json_backend, available_json_backends
+from .instrumentation import instrument, build_stats, BuildStats
+from .upload import AssetUploader, ThreadPoolUploader, HttpUploader, AssetCache, AssetStore, LocalAsset
+from .actions import ActionRegistry, ButtonAction
@@ -1,16 +1,96 @@
-import json
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import TYPE_CHECKING, List, Optional, Union
 
 __all__ = ['PlainText', 'Kmarkdown', 'Paragraph', 'Image', 'Button', '_BaseAccessory', '_BaseText', '_BaseNonText']
 
+from .fields import child, children, field
+from .kmarkdown import KmdSpan, parse, to_plain_text, truncate
+from .limits import is_trusted
+from .node import _Node
 from .types import ThemeTypes, SizeTypes, KmarkdownColors
 
+if TYPE_CHECKING:
+    from .assets import AssetSource
 
-class _BaseAccessory(ABC):
+# kmarkdown 语法字符的转义表，str.translate 一次遍历完成转义
+_ESCAPE_TABLE = str.maketrans({c: '\\' + c for c in '\\*~`[]()>-'})
+_CODE_ESCAPE_TABLE = str.maketrans({'`': '\\`'})
+_LINK_ESCAPE_TABLE = str.maketrans({'(': '%28', ')': '%29'})
+
+
+def _str(value, table: Optional[dict] = None) -> str:
+    """转换为字符串，table 不为 None 时按它转义"""
+    text = value if value.__class__ is str else str(value)
+    return text if table is None else text.translate(table)
+
+
+def _escaped(value, escape: bool) -> str:
+    return _str(value, _ESCAPE_TABLE if escape else None)
+
+
+# 以下函数只拼接 kmarkdown 文本，由 Kmarkdown 的构造方法与 KmarkdownBuilder 共用
+def _bold(content, escape: bool = False) -> str:
+    return f'**{_escaped(content, escape)}**'
+
+
+def _italic(content, escape: bool = False) -> str:
+    return f'*{_escaped(content, escape)}*'
+
+
+def _bold_italic(content, escape: bool = False) -> str:
+    return f'***{_escaped(content, escape)}***'
+
+
+def _strikethrough(content, escape: bool = False) -> str:
+    return f'~~{_escaped(content, escape)}~~'
+
+
+def _link(text, link, escape: bool = False) -> str:
+    return f'[{_escaped(text, escape)}]({_str(link, _LINK_ESCAPE_TABLE if escape else None)})'
+
+
+def _quote(content, escape: bool = False) -> str:
+    return f'> {_escaped(content, escape)}'
+
+
+def _underline(content, escape: bool = False) -> str:
+    return f'(ins){_escaped(content, escape)}(ins)'
+
+
+def _spoiler(content, escape: bool = False) -> str:
+    return f'(spl){_escaped(content, escape)}(spl)'
+
+
+def _at_channel(channel_id, escape: bool = False) -> str:
+    return f'(chn){_escaped(channel_id, escape)}(chn)'
+
+
+def _at_user(user_id, escape: bool = False) -> str:
+    return f'(met){_escaped(user_id, escape)}(met)'
+
+
+def _at_role(role_id, escape: bool = False) -> str:
+    return f'(rol){_escaped(role_id, escape)}(rol)'
+
+
+def _inline_code(code, escape: bool = False) -> str:
+    # 代码中的其它语法不会生效，只需要转义反引号
+    return f'`{_str(code, _CODE_ESCAPE_TABLE if escape else None)}`'
+
+
+def _code_block(code, language: str = '', escape: bool = False) -> str:
+    return f'```{language}\n{_str(code, _CODE_ESCAPE_TABLE if escape else None)}\n```'
+
+
+def _color(content, color: Union[str, KmarkdownColors] = KmarkdownColors.NONE, escape: bool = False) -> str:
+    return f'(font){_escaped(content, escape)}(font)[{color if isinstance(color, str) else color.value}]'
+
+
+class _BaseAccessory(_Node, ABC):
     """
     元素基类
     """
+    __slots__ = ()
 
     @abstractmethod
     def build(self) -> dict:
@@ -18,9 +98,6 @@ class _BaseAccessory(ABC):
         :return: 构造后元素
         """
 
-    def build_to_json(self) -> str:
-        return json.dumps(self.build(), indent=4, ensure_ascii=False)
-
     @abstractmethod
     def __repr__(self):
         ...
@@ -30,20 +107,28 @@ class _BaseText(_BaseAccessory, ABC):
     """
     文字类元素基类
     """
+    __slots__ = ('content',)
     content: str
 
+    def _text_chars(self) -> int:
+        return len(self.content)
+
 
 class _BaseNonText(_BaseAccessory, ABC):
     """
     非文字类元素基类
     """
+    __slots__ = ()
 
 
 class PlainText(_BaseText):
     """
     构造纯文本元素
     """
+    __slots__ = ('emoji',)
+    type = 'plain-text'
     emoji: bool
+    _fields = (field('content', ''), field('emoji', True, omit_default=True))
 
     def __init__(self, content: str = '', emoji=True) -> None:
         """
@@ -52,21 +137,18 @@ class PlainText(_BaseText):
         :param content: 文本内容
         :param emoji: 默认为 true。如果为 true,会把 emoji 的 shortcut 转为 emoji
         """
-        self.type = 'plain-text'
-        self.content = content
-        self.emoji = emoji
-
-    def build(self) -> dict:
-        return {'type': self.type, 'content': self.content}
-
-    def __repr__(self):
-        return f'PlainText(content=\'{self.content}\', emoji={self.emoji})'
+        PlainText._init_fields(self, content, emoji)
 
 
 class Kmarkdown(_BaseText):
     """
     构造kmarkdown文本元素
     """
+    __slots__ = ('_ast',)
+    type = 'kmarkdown'
+    _fields = (field('content', ''),)
+    # (解析时的文本, 语法树)，文本被修改后重新解析
+    _ast: Optional[tuple]
 
     def __init__(self, content: str = '') -> None:
         """
@@ -74,82 +156,129 @@ class Kmarkdown(_BaseText):
 
         :param content: kmarkdown文本
         """
-        self.type = 'kmarkdown'
-        self.content = content
+        Kmarkdown._init_fields(self, content)
+
+    @property
+    def ast(self) -> KmdSpan:
+        """解析后的语法树，在第一次访问时解析并缓存，修改 ``content`` 后重新解析"""
+        cached = self._ast
+        if cached is None or cached[0] is not self.content:
+            cached = self._ast = (self.content, parse(self.content))
+        return cached[1]
+
+    def to_plain_text(self) -> str:
+        """
+        :return: 去掉所有格式后的文本，提及显示为 ``@id`` 或 ``#id``
+        """
+        return to_plain_text(self.ast)
+
+    @property
+    def visible_length(self) -> int:
+        """去掉格式后的字符数"""
+        return len(to_plain_text(self.ast))
+
+    def truncate(self, max_length: int, ellipsis: str = '...') -> 'Kmarkdown':
+        """
+        把去掉格式后的字符数限制在 ``max_length`` 以内，不会截断格式标记、提及与代码
+
+        :param max_length: 最大可见字符数
+        :param ellipsis: 截断后添加在末尾的文本
+        :return: 新的 Kmarkdown，未超出时返回自身
+        """
+        if self.visible_length <= max_length:
+            return self
+        return Kmarkdown(truncate(self.ast, max_length, ellipsis))
+
+    @staticmethod
+    def escape(text: str) -> str:
+        """
+        转义 kmarkdown 语法字符，用于在 kmarkdown 中原样显示不受信任的文本
+
+        :param text: 原始文本
+        :return: 转义后的文本
+        """
+        return _str(text, _ESCAPE_TABLE)
 
     @classmethod
-    def bold(cls, content: str = ''):
+    def bold(cls, content: str = '', escape: bool = False):
         """构造加粗文字"""
-        return cls(f'**{content}**')
+        return cls(_bold(content, escape))
 
     @classmethod
-    def italic(cls, content: str = ''):
+    def italic(cls, content: str = '', escape: bool = False):
         """构造斜体文字"""
-        return cls(f'*{content}*')
+        return cls(_italic(content, escape))
 
     @classmethod
-    def bold_italic(cls, content: str = ''):
+    def bold_italic(cls, content: str = '', escape: bool = False):
         """构造加粗斜体文字"""
-        return cls(f'***{content}***')
+        return cls(_bold_italic(content, escape))
 
     @classmethod
-    def strikethrough(cls, content: str = ''):
+    def strikethrough(cls, content: str = '', escape: bool = False):
         """构造删除线文字"""
-        return cls(f'~~{content}~~')
+        return cls(_strikethrough(content, escape))
 
     @classmethod
-    def link(cls, text: str, link: str):
+    def link(cls, text: str, link: str, escape: bool = False):
         """构造超链接文字"""
-        return cls(f'[{text}]({link})')
+        return cls(_link(text, link, escape))
 
     @classmethod
     def divider(cls):
         return cls('---')
 
     @classmethod
-    def quote(cls, content: str = ''):
-        return cls(f'> {content}')
+    def quote(cls, content: str = '', escape: bool = False):
+        return cls(_quote(content, escape))
 
     @classmethod
-    def underline(cls, content: str = ''):
-        return cls(f'(ins){content}(ins)')
+    def underline(cls, content: str = '', escape: bool = False):
+        return cls(_underline(content, escape))
 
     @classmethod
-    def spoiler(cls, content: str = ''):
-        return cls(f'(spl){content}(spl)')
+    def spoiler(cls, content: str = '', escape: bool = False):
+        return cls(_spoiler(content, escape))
 
     @classmethod
-    def at_channel(cls, channel_id: str):
-        return cls(f'(chn){channel_id}(chn)')
+    def at_channel(cls, channel_id: str, escape: bool = False):
+        return cls(_at_channel(channel_id, escape))
 
     @classmethod
-    def at_user(cls, user_id: str):
-        return cls(f'(met){user_id}(met)')
+    def at_user(cls, user_id: str, escape: bool = False):
+        return cls(_at_user(user_id, escape))
 
     @classmethod
-    def at_role(cls, role_id: str):
-        return cls(f'(rol){role_id}(rol)')
+    def at_role(cls, role_id: str, escape: bool = False):
+        return cls(_at_role(role_id, escape))
 
     @classmethod
-    def inline_code(cls, code: str):
-        return cls(f'`{code}`')
+    def inline_code(cls, code: str, escape: bool = False):
+        return cls(_inline_code(code, escape))
 
     @classmethod
-    def code_block(cls, code: str, language: str = ''):
-        return cls(f'```{language}\n{code}\n```')
+    def code_block(cls, code: str, language: str = '', escape: bool = False):
+        return cls(_code_block(code, language, escape))
 
     @classmethod
-    def color(cls, content: str, color: Union[str, KmarkdownColors] = KmarkdownColors.NONE):
-        return cls(f'(font){content}(font)[{color if isinstance(color, str) else color.value}]')
-
-    def build(self) -> dict:
-        return {'type': self.type, 'content': self.content}
-
-    def __repr__(self):
-        return f'Kmarkdown(content=\'{self.content}\')'
-
-    def __add__(self, other: 'Kmarkdown') -> 'Kmarkdown':
-        self.content += other.content
+    def color(cls, content: str, color: Union[str, KmarkdownColors] = KmarkdownColors.NONE, escape: bool = False):
+        return cls(_color(content, color, escape))
+
+    def __add__(self, other: Union['Kmarkdown', str]) -> 'Kmarkdown':
+        """返回拼接后的新元素，不会修改原来的元素；大量拼接请使用 ``KmarkdownBuilder``"""
+        if isinstance(other, Kmarkdown):
+            return Kmarkdown(self.content + other.content)
+        if isinstance(other, str):
+            return Kmarkdown(self.content + other)
+        return NotImplemented
+
+    def __iadd__(self, other: Union['Kmarkdown', str]) -> 'Kmarkdown':
+        if isinstance(other, Kmarkdown):
+            self.content += other.content
+        elif isinstance(other, str):
+            self.content += other
+        else:
+            return NotImplemented
         return self
 
 
@@ -157,8 +286,11 @@ class Paragraph(_BaseAccessory):
     """
     构造多列文本元素
     """
+    __slots__ = ('cols', 'fields')
+    type = 'paragraph'
     cols: int
     fields: List[_BaseText]
+    _fields = (field('cols'), children('fields', _BaseText))
 
     def __init__(self, cols: int, fields: List[_BaseText]) -> None:
         """
@@ -167,75 +299,51 @@ class Paragraph(_BaseAccessory):
         :param cols: 列数 只能为 1-3
         :param fields: 文本组件列表
         """
-        if not (1 <= cols <= 3):
-            raise Exception('文本列数不为 1-3')
-        if len(fields) != cols:
-            raise Exception('文本列数与列表不符')
-        for i in fields:
-            if isinstance(i, Paragraph):
-                raise Exception('文本组件不能为paragraph')
-        self.type = 'paragraph'
-        self.cols = cols
-        self.fields = fields
-
-    def build(self) -> dict:
-        ret = {'type': self.type, 'cols': self.cols, 'fields': []}
-        for i in self.fields:
-            ret['fields'].append(i.build())
-        return ret
-
-    def __repr__(self):
-        return f'Paragraph(cols={self.cols}, fields=[{", ".join([text.__repr__() for text in self.fields])}])'
+        if not is_trusted():
+            if not (1 <= cols <= 3):
+                raise Exception('文本列数不为 1-3')
+            if len(fields) != cols:
+                raise Exception('文本列数与列表不符')
+            for i in fields:
+                if isinstance(i, Paragraph):
+                    raise Exception('文本组件不能为paragraph')
+        Paragraph._init_fields(self, cols, fields)
 
 
 class Image(_BaseNonText):
     """
     显示图片元素
     """
+    __slots__ = ('src', 'alt', 'size', 'circle')
+    type = 'image'
     src: str
     alt: str
     size: str
     circle: bool
+    _fields = (field('src'), field('alt', ''), field('size', 'lg'), field('circle', False))
 
-    def __init__(self, src: str, size: Union[str, SizeTypes] = 'lg', alt: str = '', circle: bool = False) -> None:
+    def __init__(self, src: Union[str, 'AssetSource'], size: Union[str, SizeTypes] = 'lg', alt: str = '',
+                 circle: bool = False) -> None:
         """
         显示图片元素
 
-        :param src: 图片地址
+        :param src: 图片地址，也可以是返回地址的 awaitable 或函数，构造前需要 ``await card.resolve()``
         :param size: 图片大小样式 只能为 sm 或 lg
         :param alt: 不知道干嘛用的
         :param circle: 显示圆形图片，在文本+图片时有效
         """
-        self.type = 'image'
-        self.src = src
-        self.alt = alt
-        self.size = size.value if isinstance(size, SizeTypes) else size
-        self.circle = circle
-
-    def build(self) -> dict:
-        return {'type': self.type, 'src': self.src, 'alt': self.alt, 'size': self.size, 'circle': self.circle}
-
-    def __repr__(self):
-        return f'Image(src=\'{self.src}\', size=\'{self.size}\', alt=\'{self.alt}\', circle={self.circle})'
+        Image._init_fields(self, src, alt, size.value if isinstance(size, SizeTypes) else size, circle)
 
 
 class Button(_BaseNonText):
+    __slots__ = ('theme', 'value', 'click', 'text')
+    type = 'button'
     theme: str
     value: str
     click: str
     text: _BaseText
+    _fields = (field('theme', 'primary'), field('value', ''), field('click', ''), child('text', _BaseText))
 
     def __init__(self, text: _BaseText, theme: Union[str, ThemeTypes] = 'primary', value: str = '',
                  click: str = '') -> None:
-        self.type = 'button'
-        self.text = text
-        self.theme = theme if isinstance(theme, str) else theme.value
-        self.value = value
-        self.click = click
-
-    def build(self) -> dict:
-        return {'type': self.type, 'theme': self.theme, 'value': self.value, 'click': self.click,
-                'text': self.text.build()}
-
-    def __repr__(self):
-        return f'Button(text={self.text.__repr__()}, theme=\'{self.theme}\', value=\'{self.value}\', click=\'{self.click}\')'
+        Button._init_fields(self, theme if isinstance(theme, str) else theme.value, value, click, text)
@@ -0,0 +1,336 @@
+import base64
+import inspect
+import struct
+from hashlib import blake2b
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union, get_type_hints
+
+from .accessory import Button, _BaseText
+from .limits import MAX_BUTTON_VALUE_LENGTH
+from .types import ThemeTypes
+
+__all__ = ['ActionRegistry', 'ButtonAction', 'ROUTE_ALPHABET']
+
+# 路由编号使用的字符，与 base64url 相同
+ROUTE_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_'
+
+_DOUBLE = struct.Struct('>d')
+
+
+def _write_uint(value: int, out: bytearray) -> None:
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_uint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_int(value: int, out: bytearray) -> None:
+    # zigzag，绝对值小的负数也只占一个字节
+    _write_uint(value << 1 if value >= 0 else (-value << 1) - 1, out)
+
+
+def _read_int(data: bytes, pos: int) -> Tuple[int, int]:
+    value, pos = _read_uint(data, pos)
+    return (-(value >> 1) - 1 if value & 1 else value >> 1), pos
+
+
+def _write_bool(value: bool, out: bytearray) -> None:
+    out.append(1 if value else 0)
+
+
+def _read_bool(data: bytes, pos: int) -> Tuple[bool, int]:
+    byte = data[pos]
+    if byte > 1:
+        raise ValueError(f'bool 的值只能为 0 或 1，实际为 {byte}')
+    return byte == 1, pos + 1
+
+
+def _write_float(value: float, out: bytearray) -> None:
+    out += _DOUBLE.pack(value)
+
+
+def _read_float(data: bytes, pos: int) -> Tuple[float, int]:
+    if pos + 8 > len(data):
+        raise IndexError
+    return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+
+
+def _write_bytes(value: bytes, out: bytearray) -> None:
+    _write_uint(len(value), out)
+    out += value
+
+
+def _read_bytes(data: bytes, pos: int) -> Tuple[bytes, int]:
+    size, pos = _read_uint(data, pos)
+    end = pos + size
+    if end > len(data):
+        raise IndexError
+    return data[pos:end], end
+
+
+def _write_str(value: str, out: bytearray) -> None:
+    _write_bytes(value.encode('utf-8'), out)
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    value, pos = _read_bytes(data, pos)
+    return value.decode('utf-8'), pos
+
+
+# 最后一个 str 与 bytes 参数直接延续到结尾，不写长度
+def _write_tail_bytes(value: bytes, out: bytearray) -> None:
+    out += value
+
+
+def _read_tail_bytes(data: bytes, pos: int) -> Tuple[bytes, int]:
+    return data[pos:], len(data)
+
+
+def _write_tail_str(value: str, out: bytearray) -> None:
+    out += value.encode('utf-8')
+
+
+def _read_tail_str(data: bytes, pos: int) -> Tuple[str, int]:
+    return data[pos:].decode('utf-8'), len(data)
+
+
+# 类型 -> (写入, 读取, 最后一个参数时的写入, 读取)
+_CODECS = {
+    int: (_write_int, _read_int, _write_int, _read_int),
+    bool: (_write_bool, _read_bool, _write_bool, _read_bool),
+    float: (_write_float, _read_float, _write_float, _read_float),
+    str: (_write_str, _read_str, _write_tail_str, _read_tail_str),
+    bytes: (_write_bytes, _read_bytes, _write_tail_bytes, _read_tail_bytes),
+}
+
+
+def _schema(func: Callable, context: int) -> Tuple[type, ...]:
+    """:return: 跳过前 context 个参数后，其余参数的类型"""
+    params = list(inspect.signature(func).parameters.values())[context:]
+    hints = get_type_hints(func)
+    out = []
+    for param in params:
+        if param.kind not in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+            raise TypeError(f'{func.__qualname__} 的参数 {param.name} 必须是位置参数')
+        kind = hints.get(param.name)
+        if kind not in _CODECS:
+            raise TypeError(f'{func.__qualname__} 的参数 {param.name} 需要标注为 int|bool|float|str|bytes，'
+                            f'实际为 {kind!r}')
+        out.append(kind)
+    return tuple(out)
+
+
+class ButtonAction:
+    """
+    注册到 ``ActionRegistry`` 的按钮处理函数，可以像原函数一样调用
+
+    按钮的 value 为 前缀 + 路由编号 + 参数的 base64url（无填充），参数按类型紧凑编码：
+    int 为 zigzag varint，bool 为一个字节，float 为 8 个字节，str 与 bytes 为长度 + 内容（最后一个参数不写长度）
+    """
+    __slots__ = ('func', 'name', 'route', 'schema', '_prefix', '_max_length', '_writers', '_readers')
+
+    def __init__(self, func: Callable, name: str, route: str, schema: Tuple[type, ...], prefix: str,
+                 max_length: int) -> None:
+        """
+        :param func: 处理函数
+        :param name: 名称
+        :param route: 路由编号
+        :param schema: 参数的类型
+        :param prefix: value 的前缀
+        :param max_length: value 的最大长度
+        """
+        self.func = func
+        self.name = name
+        self.route = route
+        self.schema = schema
+        self._prefix = prefix + route
+        self._max_length = max_length
+        last = len(schema) - 1
+        self._writers = tuple(_CODECS[kind][2 if i == last else 0] for i, kind in enumerate(schema))
+        self._readers = tuple(_CODECS[kind][3 if i == last else 1] for i, kind in enumerate(schema))
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        schema = ', '.join(i.__name__ for i in self.schema)
+        return f'ButtonAction({self.name!r}, route={self.route!r}, schema=({schema}))'
+
+    def encode(self, *args) -> str:
+        """
+        :param args: 参数，类型与处理函数的标注一致
+        :return: 按钮的 value，超过长度限制时抛出 ValueError
+        """
+        if len(args) != len(self.schema):
+            raise TypeError(f'{self.name} 需要 {len(self.schema)} 个参数，实际为 {len(args)}')
+        if not args:
+            return self._prefix
+        out = bytearray()
+        for writer, kind, arg in zip(self._writers, self.schema, args):
+            # bool 是 int 的子类，需要单独排除
+            if not isinstance(arg, kind) or (kind is int and arg.__class__ is bool):
+                raise TypeError(f'{self.name} 的参数应为 {kind.__name__}，实际为 {type(arg).__name__}')
+            writer(arg, out)
+        value = self._prefix + base64.urlsafe_b64encode(out).rstrip(b'=').decode('ascii')
+        if len(value) > self._max_length:
+            raise ValueError(f'{self.name} 的按钮 value 最多 {self._max_length} 个字符，编码后为 {len(value)}')
+        return value
+
+    def decode(self, payload: str) -> tuple:
+        """
+        :param payload: value 中路由编号之后的部分
+        :return: 参数，格式错误时抛出 ValueError
+        """
+        if not self._readers:
+            if payload:
+                raise ValueError(f'{self.name} 不需要参数')
+            return ()
+        try:
+            data = base64.b64decode(payload + '=' * (-len(payload) % 4), b'-_', validate=True)
+            pos = 0
+            args = []
+            for reader in self._readers:
+                arg, pos = reader(data, pos)
+                args.append(arg)
+        except (IndexError, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f'无法解析 {self.name} 的按钮 value: {payload!r}') from e
+        if pos != len(data):
+            raise ValueError(f'无法解析 {self.name} 的按钮 value: {payload!r}')
+        return tuple(args)
+
+    def button(self, text: _BaseText, *args, theme: Union[str, ThemeTypes] = 'primary') -> Button:
+        """
+        :param text: 按钮文字
+        :param args: 参数
+        :param theme: 按钮主题
+        :return: 点击后回传 value 的按钮
+        """
+        return Button(text, theme, self.encode(*args), 'return-val')
+
+
+class ActionRegistry:
+    """
+    按钮处理函数的注册表，点击时根据按钮的 value 找到处理函数并传入参数
+
+    ex::
+
+        actions = ActionRegistry()
+
+        @actions.action
+        async def vote(event, poll: int, option: int):
+            ...
+
+        card.append(ActionGroup(vote.button(PlainText('赞成'), 12, 1), vote.button(PlainText('反对'), 12, 2)))
+
+        # 收到点击事件时
+        await actions.dispatch(value, event)
+    """
+
+    def __init__(self, context: int = 1, prefix: str = '~', route_length: int = 3,
+                 max_length: int = MAX_BUTTON_VALUE_LENGTH) -> None:
+        """
+        :param context: 处理函数开头由 ``dispatch`` 传入的参数个数（如点击事件），之后的参数编码在 value 中
+        :param prefix: value 的前缀，用于区分其它按钮的 value
+        :param route_length: 路由编号的长度
+        :param max_length: value 的最大长度
+        """
+        self.context = context
+        self.prefix = prefix
+        self.route_length = route_length
+        self.max_length = max_length
+        self._routes: Dict[str, ButtonAction] = {}
+
+    def _route(self, name: str) -> str:
+        digest = blake2b(name.encode('utf-8'), digest_size=16).digest()
+        return base64.urlsafe_b64encode(digest).decode('ascii')[:self.route_length]
+
+    def action(self, func: Optional[Callable] = None, *, name: Optional[str] = None,
+               route: Optional[str] = None) -> Any:
+        """
+        注册处理函数，可以直接作为装饰器使用，也可以带参数 ``@actions.action(name='vote')``
+
+        路由编号默认由名称的哈希得到，重启后不变，已经发出的按钮仍然有效；
+        名称默认为 ``模块.函数名``，移动或重命名函数前请用 ``name`` 或 ``route`` 固定
+
+        :param func: 处理函数，除开头的 ``context`` 个参数外都需要标注为 int|bool|float|str|bytes
+        :param name: 名称
+        :param route: 路由编号，长度为 ``route_length``，只能包含 ``ROUTE_ALPHABET`` 中的字符
+        :return: ``ButtonAction``
+        """
+        if func is None:
+            return lambda f: self.action(f, name=name, route=route)
+        if name is None:
+            name = f'{func.__module__}.{func.__qualname__}'
+        if route is None:
+            route = self._route(name)
+        elif len(route) != self.route_length or any(i not in ROUTE_ALPHABET for i in route):
+            raise ValueError(f'路由编号 {route!r} 的长度应为 {self.route_length} 且只能包含 base64url 字符')
+        other = self._routes.get(route)
+        if other is not None:
+            raise ValueError(f'{name} 与 {other.name} 的路由编号 {route!r} 重复，请指定 route')
+        action = ButtonAction(func, name, route, _schema(func, self.context), self.prefix, self.max_length)
+        self._routes[route] = action
+        return action
+
+    def remove(self, action: ButtonAction) -> None:
+        """
+        :param action: 要移除的处理函数
+        """
+        del self._routes[action.route]
+
+    @property
+    def actions(self) -> List[ButtonAction]:
+        """所有处理函数"""
+        return list(self._routes.values())
+
+    def decode(self, value: str) -> Optional[Tuple[ButtonAction, tuple]]:
+        """
+        :param value: 按钮的 value
+        :return: (处理函数, 参数)，不是由该注册表编码的 value 时为 None；路由存在但参数格式错误时抛出 ValueError
+        """
+        prefix = self.prefix
+        if not value.startswith(prefix):
+            return None
+        start = len(prefix)
+        end = start + self.route_length
+        action = self._routes.get(value[start:end])
+        if action is None:
+            return None
+        return action, action.decode(value[end:])
+
+    def dispatch(self, value: str, *context) -> Any:
+        """
+        解析 value 并调用对应的处理函数，参数为 ``(*context, *value 中的参数)``
+
+        async 处理函数返回 coroutine，由调用方 await
+
+        :param value: 按钮的 value
+        :param context: 传给处理函数开头的参数
+        :return: 处理函数的返回值，不是由该注册表编码的 value 时为 None
+        """
+        decoded = self.decode(value)
+        if decoded is None:
+            return None
+        action, args = decoded
+        return action.func(*context, *args)
+
+    def __contains__(self, value: str) -> bool:
+        prefix = self.prefix
+        start = len(prefix)
+        return value.startswith(prefix) and value[start:start + self.route_length] in self._routes
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __repr__(self):
+        return f'ActionRegistry({len(self._routes)} actions, prefix={self.prefix!r})'
@@ -0,0 +1,119 @@
+import asyncio
+import inspect
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from .card import Card, CardMessage
+from .node import _Node, _node_types
+from .upload import AssetStore, LocalAsset, LocalSource, is_local
+
+__all__ = ['AssetSource', 'DEFAULT_CONCURRENCY', 'is_pending', 'pending_sources', 'resolve']
+
+# 资源地址：字符串、返回地址的 awaitable、调用后返回地址（或 awaitable）的函数，或者需要上传的本地文件与内容
+AssetSource = Union[str, Awaitable[str], Callable[[], Union[str, Awaitable[str]]], LocalAsset, LocalSource]
+
+# 同时解析的资源数
+DEFAULT_CONCURRENCY = 8
+
+
+def is_pending(value) -> bool:
+    """
+    :param value: 属性值
+    :return: 是否为尚未解析的资源地址（awaitable、函数或本地文件）
+    """
+    if value is None or value.__class__ is str:
+        return False
+    if value.__class__ in _node_types or isinstance(value, (list, tuple)):
+        return False
+    return inspect.isawaitable(value) or callable(value) or is_local(value)
+
+
+def _nodes(obj: Union[CardMessage, Card, _Node]) -> List[_Node]:
+    if isinstance(obj, CardMessage):
+        return [node for card in obj for node in _nodes(card)]
+    if isinstance(obj, Card):
+        return [node for module in obj for node in _nodes(module)]
+    out = [obj]
+    for child in obj._iter_children():
+        out.extend(_nodes(child))
+    return out
+
+
+def pending_sources(obj: Union[CardMessage, Card, _Node]) -> List[Tuple[_Node, str]]:
+    """
+    找出所有尚未解析的资源地址
+
+    :param obj: 卡片消息、卡片、模块或元素
+    :return: (节点, 属性名) 列表
+    """
+    out = []
+    for node in _nodes(obj):
+        names = node._slot_fields
+        if node._has_dict:
+            names = (*names, *node.__dict__)
+        for name in names:
+            if is_pending(getattr(node, name, None)):
+                out.append((node, name))
+    return out
+
+
+async def _await(source, semaphore: asyncio.Semaphore, store: Optional[AssetStore]) -> str:
+    async with semaphore:
+        if is_local(source):
+            # 解析结束后由 resolve 统一保存索引
+            return await store.url_for(source, flush=False)
+        if not inspect.isawaitable(source):
+            # 延迟创建的资源，在获得许可后才调用，避免一次性发起所有上传
+            source = source()
+            if not inspect.isawaitable(source):
+                return source
+        return await source
+
+
+async def resolve(obj: Union[CardMessage, Card, _Node], concurrency: Optional[int] = None,
+                  store: Optional[AssetStore] = None) -> int:
+    """
+    并发解析所有尚未解析的资源地址，并把结果写回对应的属性
+
+    同一个 awaitable 或函数被多处引用时只解析一次。awaitable 只能被等待一次，需要失败后重试时请传入函数。
+    任意一个资源解析失败时取消其余尚未完成的资源并抛出该异常，已经完成的资源仍然会写回。
+
+    :param obj: 卡片消息、卡片、模块或元素
+    :param concurrency: 同时解析的资源数，为 None 时使用 ``DEFAULT_CONCURRENCY``
+    :param store: 上传本地文件与内容使用的 ``AssetStore``，树中有本地资源时必须提供
+    :return: 解析的资源数（去重后）
+    """
+    pending = pending_sources(obj)
+    if not pending:
+        return 0
+    if concurrency is None:
+        concurrency = DEFAULT_CONCURRENCY
+    if concurrency < 1:
+        raise ValueError(f'concurrency 至少为 1，实际为 {concurrency}')
+    if store is None:
+        for node, name in pending:
+            if is_local(getattr(node, name)):
+                raise Exception(f'{type(node).__name__}.{name} 是本地文件，需要提供 store 才能上传')
+    semaphore = asyncio.Semaphore(concurrency)
+    # id(资源) -> (资源, 引用它的位置)
+    groups: Dict[int, Tuple[object, List[Tuple[_Node, str]]]] = {}
+    for node, name in pending:
+        source = getattr(node, name)
+        groups.setdefault(id(source), (source, []))[1].append((node, name))
+
+    async def run(source, targets: List[Tuple[_Node, str]]) -> None:
+        value = await _await(source, semaphore, store)
+        for node, name in targets:
+            setattr(node, name, value)
+
+    tasks = [asyncio.ensure_future(run(source, targets)) for source, targets in groups.values()]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        if store is not None:
+            # 所有上传的地址只保存一次索引
+            store.flush()
+    return len(groups)
@@ -1,13 +1,18 @@
 from abc import ABC, abstractmethod
-from typing import Union, Optional, List
+from datetime import tzinfo
+from typing import Iterable, Union, Optional, List
 
 from .modules import Header, Section, ImageGroup, Container, ActionGroup, Context, Divider, Invite, File, Video, Audio, \
     Countdown
-from .accessory import PlainText, _BaseText, _BaseNonText, Paragraph, Image, Button, _BaseAccessory
+from .accessory import PlainText, Kmarkdown, _BaseText, _BaseNonText, Paragraph, Image, Button, _BaseAccessory, \
+    _bold, _italic, _bold_italic, _strikethrough, _link, _quote, _underline, _spoiler, _at_channel, \
+    _at_user, _at_role, _inline_code, _code_block, _color, _escaped
 from .card import CardMessage, Card
+from .timestamp import TimeValue
+from .types import KmarkdownColors
 
 __all__ = ['CardMessageBuilder', 'CardBuilder', 'ImageGroupBuilder', 'ContainerBuilder', 'ContextBuilder',
-           'ActionGroupBuilder']
+           'ActionGroupBuilder', 'KmarkdownBuilder']
 
 
 class AbstractBuilder(ABC):
@@ -97,32 +102,36 @@ class CardBuilder(AbstractBuilder):
         self._card.append(Divider())
         return self
 
-    def day_countdown(self, end_time: str):
+    def day_countdown(self, end_time: TimeValue, tz: Optional[tzinfo] = None):
         """
         为卡片添加一个 天-倒计时
 
         :param end_time: 结束时间 ex: 2022-05-05 08:00:00
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
         """
-        self._card.append(Countdown.new_day_countdown(end_time))
+        self._card.append(Countdown.new_day_countdown(end_time, tz))
         return self
 
-    def hour_countdown(self, end_time: str):
+    def hour_countdown(self, end_time: TimeValue, tz: Optional[tzinfo] = None):
         """
         为卡片添加一个 小时-倒计时
 
         :param end_time: 结束时间 ex: 2022-05-05 08:00:00
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
         """
-        self._card.append(Countdown.new_hour_countdown(end_time))
+        self._card.append(Countdown.new_hour_countdown(end_time, tz))
         return self
 
-    def second_countdown(self, end_time: str, start_time: Optional[str] = None):
+    def second_countdown(self, end_time: TimeValue, start_time: Optional[TimeValue] = None,
+                         tz: Optional[tzinfo] = None):
         """
         为卡片添加一个 秒-倒计时
 
         :param end_time: 结束时间 ex: 2022-05-05 08:00:00
         :param start_time: 开始时间 ex: 2022-05-05 08:00:00 留空则为当前时间
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
         """
-        self._card.append(Countdown.new_second_countdown(end_time, start_time))
+        self._card.append(Countdown.new_second_countdown(end_time, start_time, tz))
         return self
 
     def invite(self, code: str):
@@ -224,3 +233,184 @@ class ContextBuilder(MultiBuilder):
 
     def build(self) -> Context:
         return Context(*self.elements)
+
+
+class KmarkdownBuilder(AbstractBuilder):
+    """
+    拼接 kmarkdown 文本
+
+    片段先保存在列表中，``build()`` 时只拼接一次，添加片段的开销与已有长度无关
+
+    ex::
+
+        builder = KmarkdownBuilder()
+        for rank, user in enumerate(users, 1):
+            builder.text(f'{rank}. ').at_user(user.id).text(' ').bold(user.score).newline()
+        Section(builder.build(max_length=5000))
+    """
+    def __init__(self, *fragments: Union[str, Kmarkdown]) -> None:
+        """
+        :param fragments: 初始的片段
+        """
+        self._fragments: List[str] = []
+        self._length = 0
+        self.extend(fragments)
+
+    def append(self, fragment: Union[str, Kmarkdown, 'KmarkdownBuilder']):
+        """
+        添加一个片段
+
+        :param fragment: 文本、kmarkdown 元素或另一个 builder
+        """
+        if isinstance(fragment, KmarkdownBuilder):
+            self._fragments.extend(fragment._fragments)
+            self._length += fragment._length
+            return self
+        text = fragment.content if isinstance(fragment, Kmarkdown) else fragment
+        if not isinstance(text, str):
+            raise TypeError(f'片段只能为 str 或 Kmarkdown，实际为 {type(fragment).__name__}')
+        self._fragments.append(text)
+        self._length += len(text)
+        return self
+
+    def extend(self, fragments: Iterable[Union[str, Kmarkdown]], separator: str = ''):
+        """
+        添加多个片段
+
+        :param fragments: 片段
+        :param separator: 片段之间的分隔符，如 ``'\\n'``
+        """
+        first = True
+        for i in fragments:
+            if separator and not first:
+                self.append(separator)
+            first = False
+            self.append(i)
+        return self
+
+    def __iadd__(self, fragment: Union[str, Kmarkdown, 'KmarkdownBuilder']) -> 'KmarkdownBuilder':
+        return self.append(fragment)
+
+    def __len__(self) -> int:
+        """拼接后的字符数"""
+        return self._length
+
+    def __repr__(self):
+        return f'KmarkdownBuilder(fragments={len(self._fragments)}, length={self._length})'
+
+    def text(self, content: str, escape: bool = False):
+        """添加文本，``escape`` 为 true 时转义其中的 kmarkdown 语法字符"""
+        return self.append(_escaped(content, escape))
+
+    def newline(self):
+        """添加换行"""
+        return self.append('\n')
+
+    def bold(self, content: str = '', escape: bool = False):
+        """添加加粗文字"""
+        return self.append(_bold(content, escape))
+
+    def italic(self, content: str = '', escape: bool = False):
+        """添加斜体文字"""
+        return self.append(_italic(content, escape))
+
+    def bold_italic(self, content: str = '', escape: bool = False):
+        """添加加粗斜体文字"""
+        return self.append(_bold_italic(content, escape))
+
+    def strikethrough(self, content: str = '', escape: bool = False):
+        """添加删除线文字"""
+        return self.append(_strikethrough(content, escape))
+
+    def link(self, text: str, link: str, escape: bool = False):
+        """添加超链接文字"""
+        return self.append(_link(text, link, escape))
+
+    def divider(self):
+        """添加分割线"""
+        return self.append('---')
+
+    def quote(self, content: str = '', escape: bool = False):
+        """添加引用"""
+        return self.append(_quote(content, escape))
+
+    def underline(self, content: str = '', escape: bool = False):
+        """添加下划线文字"""
+        return self.append(_underline(content, escape))
+
+    def spoiler(self, content: str = '', escape: bool = False):
+        """添加剧透文字"""
+        return self.append(_spoiler(content, escape))
+
+    def at_channel(self, channel_id: str, escape: bool = False):
+        """添加频道引用"""
+        return self.append(_at_channel(channel_id, escape))
+
+    def at_user(self, user_id: str, escape: bool = False):
+        """添加 @用户"""
+        return self.append(_at_user(user_id, escape))
+
+    def at_role(self, role_id: str, escape: bool = False):
+        """添加 @角色"""
+        return self.append(_at_role(role_id, escape))
+
+    def inline_code(self, code: str, escape: bool = False):
+        """添加行内代码"""
+        return self.append(_inline_code(code, escape))
+
+    def code_block(self, code: str, language: str = '', escape: bool = False):
+        """添加代码块"""
+        return self.append(_code_block(code, language, escape))
+
+    def color(self, content: str, color: Union[str, KmarkdownColors] = KmarkdownColors.NONE, escape: bool = False):
+        """添加彩色文字"""
+        return self.append(_color(content, color, escape))
+
+    def truncate(self, max_length: int, ellipsis: str = '...'):
+        """
+        把长度限制在 ``max_length`` 以内
+
+        只会丢弃末尾的整个片段，不会截断片段中的 kmarkdown 语法；发生截断时在末尾添加 ``ellipsis``
+
+        :param max_length: 最大字符数
+        :param ellipsis: 截断后添加在末尾的文本
+        """
+        if self._length <= max_length:
+            return self
+        if len(ellipsis) > max_length:
+            raise ValueError('ellipsis 比 max_length 更长')
+        limit = max_length - len(ellipsis)
+        length = 0
+        count = 0
+        for i in self._fragments:
+            if length + len(i) > limit:
+                break
+            length += len(i)
+            count += 1
+        del self._fragments[count:]
+        self._length = length
+        if ellipsis:
+            self.append(ellipsis)
+        return self
+
+    def to_string(self, max_length: Optional[int] = None, ellipsis: str = '...') -> str:
+        """
+        :param max_length: 最大字符数，超出时按 ``truncate`` 的规则截断，不会修改 builder
+        :param ellipsis: 截断后添加在末尾的文本
+        :return: 拼接后的 kmarkdown 文本
+        """
+        if max_length is not None and self._length > max_length:
+            copied = KmarkdownBuilder()
+            copied._fragments = list(self._fragments)
+            copied._length = self._length
+            return copied.truncate(max_length, ellipsis).to_string()
+        return ''.join(self._fragments)
+
+    def build(self, max_length: Optional[int] = None, ellipsis: str = '...') -> Kmarkdown:
+        """
+        构造为 Kmarkdown
+
+        :param max_length: 最大字符数，超出时按 ``truncate`` 的规则截断，不会修改 builder
+        :param ellipsis: 截断后添加在末尾的文本
+        """
+        return Kmarkdown(self.to_string(max_length, ellipsis))
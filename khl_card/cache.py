@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+__all__ = ['CacheStats', 'SerializationCache', 'serialization_cache']
+
+
+class CacheStats(NamedTuple):
+    """
+    缓存的统计信息
+    """
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+class SerializationCache:
+    """
+    以指纹为键的序列化结果 LRU 缓存，同时限制条目数与总字节数，可以在多个线程中使用
+
+    内容相同的卡片指纹相同，因此不需要在修改卡片时手动清除
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024) -> None:
+        """
+        :param max_entries: 最多缓存的条目数，为 0 时不缓存
+        :param max_bytes: 最多缓存的总字节数
+        """
+        self._lock = threading.Lock()
+        self._data: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        :param key: 指纹
+        :return: 缓存的序列化结果，没有时为 None
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """
+        :param key: 指纹
+        :param value: 序列化结果，大于 ``max_bytes`` 时不会缓存
+        """
+        if self.max_entries <= 0 or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._data[key] = value
+            self._bytes += len(value)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+            _, value = self._data.popitem(last=False)
+            self._bytes -= len(value)
+            self.evictions += 1
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """
+        修改容量，超出的条目立即淘汰
+
+        :param max_entries: 最多缓存的条目数，为 None 时不修改
+        :param max_bytes: 最多缓存的总字节数，为 None 时不修改
+        """
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self) -> None:
+        """清空缓存与统计信息"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """命中、未命中、淘汰次数，当前条目数与字节数"""
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._data), self._bytes)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self):
+        return f'SerializationCache(max_entries={self.max_entries}, max_bytes={self.max_bytes})'
+
+
+# 进程内共享的缓存，build_to_json 输出带缩进的 json 时会使用它
+serialization_cache = SerializationCache()
+
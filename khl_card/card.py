@@ -1,29 +1,184 @@
 import json
-from collections.abc import Sequence
-from typing import List, Iterator, TypeVar
+import weakref
+from collections.abc import MutableSequence, Sequence
+from hashlib import blake2b
+from typing import TYPE_CHECKING, BinaryIO, Iterable, List, Iterator, Tuple, TypeVar
 from typing import Optional, Union
 
 from .color import Color
+from .encoder import DEFAULT_CHUNK_SIZE, encode_value, iter_chunks, write_chunks
+from .limits import MAX_CARDS, MAX_MODULES
 from .modules import _Module
+from .node import SerializedSize, _ChildList, _own_list
+from .serializer import to_json
 from .types import ThemeTypes, SizeTypes, NamedColor
 
+if TYPE_CHECKING:
+    from .diff import CardDiff
+    from .node import _Node
+    from .query import CardIndex, TypeFilter
+    from .upload import AssetStore
+
 __all__ = ['Card', 'CardMessage']
 
 _T_co = TypeVar("_T_co", covariant=True)
 
 
+class _LazyModules(MutableSequence):
+    """
+    按需还原的模块列表
+
+    保存原始字典，第一次读取某个模块时才还原为对象并替换原位置；
+    比较、拼接、排序、``repr`` 等需要所有模块的操作会先全部还原，结果与普通列表相同
+    """
+    __slots__ = ('_items', '_owner')
+
+    def __init__(self, items: Iterable[Union[dict, _Module]] = (), owner: Optional['Card'] = None) -> None:
+        """
+        :param items: 模块或模块的字典
+        :param owner: 所属的卡片，修改时让它的缓存失效
+        """
+        self._items = list(items)
+        self._owner = None if owner is None else weakref.ref(owner)
+
+    # 与 _ChildList 相同，通知所属的卡片
+    _changed = _ChildList._changed
+
+    def _decode(self, index: int) -> _Module:
+        item = self._items[index]
+        if item.__class__ is dict:
+            item = _Module.from_dict(item)
+            self._items[index] = item
+        return item
+
+    def _decode_all(self) -> List[_Module]:
+        """:return: 全部还原后的内部列表"""
+        for i in range(len(self._items)):
+            self._decode(i)
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(len(self._items))[index]]
+        return self._decode(index)
+
+    def __setitem__(self, index, value) -> None:
+        self._items[index] = list(value) if isinstance(index, slice) else value
+        self._changed()
+
+    def __delitem__(self, index) -> None:
+        del self._items[index]
+        self._changed()
+
+    def __iter__(self) -> Iterator[_Module]:
+        for i in range(len(self._items)):
+            yield self._decode(i)
+
+    def __reversed__(self) -> Iterator[_Module]:
+        for i in range(len(self._items) - 1, -1, -1):
+            yield self._decode(i)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._decode_all()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _LazyModules):
+            other = other._decode_all()
+        elif not isinstance(other, list):
+            return NotImplemented
+        return self._decode_all() == other
+
+    __hash__ = None
+
+    def __add__(self, other) -> List[_Module]:
+        if isinstance(other, _LazyModules):
+            other = other._decode_all()
+        return self._decode_all() + other
+
+    def __radd__(self, other) -> List[_Module]:
+        if not isinstance(other, list):
+            return NotImplemented
+        return other + self._decode_all()
+
+    def __iadd__(self, other) -> '_LazyModules':
+        self.extend(other)
+        return self
+
+    def __mul__(self, n: int) -> List[_Module]:
+        return self._decode_all() * n
+
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return repr(self._decode_all())
+
+    def __reduce_ex__(self, protocol):
+        # 复制与序列化时还原为普通列表
+        return list, (self._decode_all()[:],)
+
+    def insert(self, index: int, value: _Module) -> None:
+        self._items.insert(index, value)
+        self._changed()
+
+    def append(self, value: _Module) -> None:
+        self._items.append(value)
+        self._changed()
+
+    def extend(self, values: Iterable[_Module]) -> None:
+        self._items.extend(list(values))
+        self._changed()
+
+    def pop(self, index: int = -1) -> _Module:
+        item = self._decode(index)
+        del self._items[index]
+        self._changed()
+        return item
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._changed()
+
+    def index(self, value, *args) -> int:
+        return self._decode_all().index(value, *args)
+
+    def count(self, value) -> int:
+        return self._decode_all().count(value)
+
+    def copy(self) -> List[_Module]:
+        return self._decode_all()[:]
+
+    def sort(self, *, key=None, reverse: bool = False) -> None:
+        self._decode_all().sort(key=key, reverse=reverse)
+        self._changed()
+
+    def reverse(self) -> None:
+        self._items.reverse()
+        self._changed()
+
+
 class Card(Sequence):
     """
     构建卡片
     """
+    __slots__ = ('modules', 'theme', 'size', 'color', '_json', '_size', '_digest', '_interned', '_query',
+                 '__weakref__')
     type: str = 'card'
     theme: str
     size: str
     color: Optional[str]
     modules: List[_Module]
+    _json: Optional[str]
+    _size: Optional[SerializedSize]
+    _digest: Optional[str]
+    _interned: bool
+    _query: Optional['CardIndex']
 
     def __init__(self, *modules: _Module, theme: Union[str, ThemeTypes] = ThemeTypes.PRIMARY,
-                 size: Union[str, SizeTypes] = SizeTypes.LG, color: Union[Color, NamedColor, str, None] = None) -> None:
+                 size: Union[str, SizeTypes] = SizeTypes.LG, color: Union[Color, NamedColor, str, None] = None,
+                 intern: bool = False) -> None:
         """
         构建卡片
 
@@ -31,26 +186,96 @@ class Card(Sequence):
         :param theme: 卡片主题
         :param size: 目前只支持sm与lg。 lg仅在PC端有效, 在移动端不管填什么，均为sm。
         :param color: 卡片颜色 ex: #55ffff or NamedColor.XXX
+        :param intern: 为 true 时模块（包括之后添加的模块）会通过 ``intern`` 与其它卡片共享值相同的模块
         """
-        self.modules = list(modules)
-        self.theme = theme if isinstance(theme, str) else theme.value
-        self.size = size if isinstance(size, str) else size.value
-        if color is None:
-            self.color = None
-        elif isinstance(color, str):
-            self.color = color
+        if intern:
+            from .pool import intern as intern_node
+            modules = [intern_node(i) for i in modules]
+        if color is None or isinstance(color, str):
+            pass
         elif isinstance(color, Color):
-            self.color = color.__str__()
+            color = color.__str__()
         elif isinstance(color, NamedColor):
-            self.color = color.value.__str__()
+            color = color.value.__str__()
         else:
-            raise ValueError('incorrect color value: ' + self.color)
+            raise ValueError('incorrect color value: ' + str(color))
+        # 槽直接通过描述符赋值，不经过 __setattr__；模块列表只复制一次
+        _set_json(self, None)
+        _set_size(self, None)
+        _set_digest(self, None)
+        _set_interned(self, intern)
+        _set_query(self, None)
+        _set_modules(self, _ChildList(modules, self))
+        _set_theme(self, theme if isinstance(theme, str) else theme.value)
+        _set_card_size(self, size if isinstance(size, str) else size.value)
+        _set_color(self, color)
+
+    def __setattr__(self, key, value) -> None:
+        if key == 'modules':
+            # 复制为能感知原地修改的列表
+            if isinstance(value, _LazyModules):
+                if value._owner is None or value._owner() is not self:
+                    value = _LazyModules(value._items, self)
+            else:
+                value = _own_list(value if isinstance(value, list) else list(value), self)
+        object.__setattr__(self, key, value)
+        if key[0] != '_':
+            self._json = None
+            self._size = None
+            self._digest = None
+            if key == 'modules':
+                self._query = None
+
+    def _invalidate(self) -> None:
+        self._json = None
+        self._size = None
+        self._digest = None
+
+    def _children_changed(self) -> None:
+        """``modules`` 被原地修改"""
+        self._json = None
+        self._size = None
+        self._digest = None
+        self._query = None
+
+    def __getstate__(self) -> dict:
+        # 不包含缓存与索引，复制后的卡片重新序列化
+        return {'modules': list(self.modules), 'theme': self.theme, 'size': self.size, 'color': self.color,
+                '_interned': self._interned}
+
+    def __setstate__(self, state: dict) -> None:
+        self._json = None
+        self._size = None
+        self._digest = None
+        self._query = None
+        for key, value in state.items():
+            setattr(self, key, value)
 
     def __getitem__(self, item: int) -> _Module:
         return self.modules[item]
 
     def __setitem__(self, key: int, value: _Module):
-        self.modules[key] = value
+        if self._interned and isinstance(key, int):
+            from .pool import intern
+            value = intern(value)
+        # 列表被修改时会清空缓存与索引，之后再按替换的部分更新
+        size = self._size
+        query = self._query
+        if size is not None and isinstance(key, int):
+            old = self.modules[key].serialized_size
+            self.modules[key] = value
+            new = value.serialized_size
+            value._add_parent(self)
+            self._size = SerializedSize(size.bytes - old.bytes + new.bytes, size.chars - old.chars + new.chars,
+                                        size.text_chars - old.text_chars + new.text_chars)
+        else:
+            self.modules[key] = value
+        if query is not None:
+            self._query = query
+            if isinstance(key, int):
+                query.replace(range(len(self.modules))[key], value)
+            else:
+                self._query = None
 
     def __len__(self):
         return len(self.modules)
@@ -74,12 +299,63 @@ class Card(Sequence):
         return self.modules.index(value, start, stop)
 
     def append(self, module: _Module):
+        if self._interned:
+            from .pool import intern
+            module = intern(module)
+        # 列表被修改时会清空缓存与索引，之后再按新模块更新
+        size = self._size
+        query = self._query
         self.modules.append(module)
+        if query is not None:
+            query.append(module)
+            self._query = query
+        if size is not None:
+            # 已经统计过大小时只累加新模块
+            added = module.serialized_size
+            module._add_parent(self)
+            comma = 1 if len(self.modules) > 1 else 0
+            self._size = SerializedSize(size.bytes + added.bytes + comma, size.chars + added.chars + comma,
+                                        size.text_chars + added.text_chars)
+
+    @classmethod
+    def from_dict(cls, data: dict, lazy: bool = False) -> 'Card':
+        """
+        从构造后的字典还原卡片
+
+        :param data: ``build()`` 的结果或官方编辑器导出的 json 对象
+        :param lazy: 为 true 时模块在第一次被访问时才还原
+        :return: 还原后的卡片
+        """
+        if data.get('type', 'card') != 'card':
+            raise ValueError(f'类型 {data["type"]!r} 不是卡片')
+        modules = data.get('modules', [])
+        ret = cls(theme=data.get('theme', ThemeTypes.PRIMARY), size=data.get('size', SizeTypes.LG),
+                  color=data.get('color'))
+        if lazy:
+            ret.modules = _LazyModules(modules, ret)
+        else:
+            ret.modules = [_Module.from_dict(i) for i in modules]
+        return ret
+
+    @classmethod
+    def from_json(cls, text: Union[str, bytes], lazy: bool = False) -> 'Card':
+        """
+        从 json 文本还原卡片
 
-    def build(self) -> dict:
+        :param text: json 文本
+        :param lazy: 为 true 时模块在第一次被访问时才还原
+        :return: 还原后的卡片
         """
+        return cls.from_dict(json.loads(text), lazy)
+
+    def build(self, validate: bool = False) -> dict:
+        """
+        :param validate: 为 true 时先检查是否符合平台限制，不符合时抛出 ``CardValidationError``
         :return: 构造后卡片
         """
+        if validate:
+            from .validator import check
+            check(self)
         ret = {'type': self.type, 'theme': self.theme, 'size': self.size, 'modules': []}
         if self.color is not None:
             ret['color'] = self.color
@@ -87,8 +363,223 @@ class Card(Sequence):
             ret['modules'].append(i.build())
         return ret
 
-    def build_to_json(self) -> str:
-        return json.dumps(self.build(), indent=4, ensure_ascii=False)
+    def build_to_json(self, pretty: Optional[bool] = None, as_bytes: Optional[bool] = None,
+                      backend: Optional[str] = None) -> Union[str, bytes]:
+        """
+        序列化为 json，参数为 None 时使用 ``configure_json`` 的全局设置（默认为带缩进的 str）
+
+        :param pretty: 是否输出带缩进的 json
+        :param as_bytes: 是否返回 UTF-8 编码的 bytes
+        :param backend: auto|orjson|ujson|json
+        :return: json 文本
+        """
+        return to_json(self, pretty, as_bytes, backend)
+
+    def fingerprint(self) -> str:
+        """
+        内容的指纹，内容相同时相同，与对象本身无关
+
+        由各模块缓存的指纹计算，修改模块后只重新计算改动的模块
+
+        :return: 32 位十六进制字符串
+        """
+        digest = self._digest
+        if digest is None:
+            head, tail = self._envelope()
+            hasher = blake2b(head.encode('utf-8'), digest_size=16)
+            for i in self.modules:
+                hasher.update(i.fingerprint().encode('ascii'))
+                i._add_parent(self)
+            hasher.update(tail.encode('utf-8'))
+            digest = self._digest = hasher.hexdigest()
+        return digest
+
+    def _envelope(self) -> Tuple[str, str]:
+        """:return: 模块列表前后的 json 文本"""
+        head = '{"type":' + encode_value(self.type) + ',"theme":' + encode_value(self.theme) + ',"size":' + \
+               encode_value(self.size) + ',"modules":['
+        if self.color is not None:
+            return head, '],"color":' + encode_value(self.color) + '}'
+        return head, ']}'
+
+    def _iterencode(self) -> Iterator[str]:
+        if self._json is not None:
+            yield self._json
+            return
+        head, tail = self._envelope()
+        yield head
+        first = True
+        for i in self.modules:
+            if first:
+                first = False
+                yield i._encode()
+            else:
+                yield ',' + i._encode()
+        yield tail
+
+    def _encode(self) -> str:
+        if self._json is None:
+            self._json = ''.join(self._iterencode())
+            for i in self.modules:
+                i._add_parent(self)
+        return self._json
+
+    def encode(self) -> bytes:
+        """
+        直接编码为紧凑的 UTF-8 json，不经过中间字典
+
+        :return: 与 ``json.dumps(self.build(), separators=(',', ':'), ensure_ascii=False).encode()`` 一致
+        """
+        return self._encode().encode('utf-8')
+
+    def iter_encode(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        分块编码为紧凑的 UTF-8 json
+
+        :param chunk_size: 每块的近似大小
+        :return: 字节块迭代器
+        """
+        return iter_chunks(self._iterencode(), chunk_size)
+
+    def write_to(self, stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        分块写入紧凑的 UTF-8 json
+
+        :param stream: 可写的二进制流
+        :param chunk_size: 每块的近似大小
+        :return: 写入的字节数
+        """
+        return write_chunks(stream, self._iterencode(), chunk_size)
+
+    @property
+    def serialized_size(self) -> SerializedSize:
+        """
+        序列化后的大小
+
+        由各模块缓存的大小累加得到，不会重新序列化整个卡片；``append`` 与替换模块时增量更新，修改模块后只重新统计改动的模块
+        """
+        size = self._size
+        if size is None:
+            head, tail = self._envelope()
+            envelope = head + tail
+            nbytes = len(envelope.encode('utf-8'))
+            chars = len(envelope)
+            text_chars = 0
+            for i in self.modules:
+                module_size = i.serialized_size
+                i._add_parent(self)
+                nbytes += module_size.bytes
+                chars += module_size.chars
+                text_chars += module_size.text_chars
+            commas = max(len(self.modules) - 1, 0)
+            size = self._size = SerializedSize(nbytes + commas, chars + commas, text_chars)
+        return size
+
+    def diff(self, other: 'Card') -> 'CardDiff':
+        """
+        与另一个卡片比较
+
+        :param other: 新的卡片
+        :return: 差异，包含改动的位置与作用于 ``build()`` 结果的 json patch，没有差异时为假
+        """
+        from .diff import diff
+        return diff(self, other)
+
+    async def resolve(self, concurrency: Optional[int] = None, store: Optional['AssetStore'] = None) -> 'Card':
+        """
+        并发解析所有模块中尚未解析的资源地址（awaitable、函数或本地文件形式的 ``src`` ``cover`` 等）
+
+        :param concurrency: 同时解析的资源数，为 None 时使用 ``assets.DEFAULT_CONCURRENCY``
+        :param store: 上传本地文件（``pathlib.Path``、bytes 或 ``LocalAsset``）使用的 ``AssetStore``
+        :return: 自身
+        """
+        from .assets import resolve
+        await resolve(self, concurrency, store)
+        return self
+
+    async def abuild(self, concurrency: Optional[int] = None, validate: bool = False,
+                     store: Optional['AssetStore'] = None) -> dict:
+        """
+        解析所有资源地址后构造
+
+        :param concurrency: 同时解析的资源数
+        :param validate: 为 true 时先检查是否符合平台限制
+        :param store: 上传本地文件使用的 ``AssetStore``
+        :return: 构造后卡片
+        """
+        await self.resolve(concurrency, store)
+        return self.build(validate)
+
+    def paginate(self, max_modules: int = MAX_MODULES, max_bytes: Optional[int] = None, repeat_header: bool = True,
+                 keep_style: bool = True) -> List['CardMessage']:
+        """
+        把卡片切分为多页，每页为只包含一个卡片的卡片消息
+
+        :param max_modules: 每页最多包含的模块数
+        :param max_bytes: 每页序列化后（紧凑 UTF-8 json）的最大字节数，为 None 时不限制
+        :param repeat_header: 为 true 时卡片的第一个模块是标题模块时，该模块会在每一页重复
+        :param keep_style: 为 true 时每一页都保留卡片的主题、大小与颜色
+        :return: 卡片消息列表
+        """
+        from .pagination import split_cards
+        return split_cards([self], max_modules, max_bytes, 1, repeat_header, keep_style)
+
+    @property
+    def query_index(self) -> 'CardIndex':
+        """
+        模块与元素的索引，第一次访问时建立
+
+        ``append`` 与替换模块时增量更新，修改模块或元素的属性后只重建该模块的部分；
+        直接修改 ``modules`` 列表（如 ``card.modules.insert(...)``）时重新建立
+        """
+        query = self._query
+        if query is None:
+            from .query import CardIndex
+            query = self._query = CardIndex(self.modules)
+        return query
+
+    def find(self, type: 'TypeFilter' = None, **attrs) -> Optional['_Node']:
+        """
+        查找第一个符合条件的模块或元素
+
+        ex::
+
+            card.find(Button, value='vote:1')
+            card.find('section', mode='left')
+            card.find(Button, value=lambda v: v.startswith('vote:'))
+
+        :param type: 类（包括子类）或 ``type`` 字段的值，为 None 时不限制
+        :param attrs: 属性名 -> 属性值，或接收属性值返回是否符合的函数
+        :return: 按在卡片中出现的顺序第一个符合的节点，没有时为 None
+        """
+        hits = self.query_index.hits(type, attrs)
+        return hits[0][1] if hits else None
+
+    def find_all(self, type: 'TypeFilter' = None, **attrs) -> List['_Node']:
+        """
+        查找所有符合条件的模块或元素，条件同 ``find``
+
+        按属性值查找时使用索引，只检查值相同的节点；属性值为函数时检查该类型的所有节点
+
+        :param type: 类（包括子类）或 ``type`` 字段的值，为 None 时不限制
+        :param attrs: 属性名 -> 属性值，或接收属性值返回是否符合的函数
+        :return: 按在卡片中出现的顺序排列的节点
+        """
+        return self.query_index.find_all(type, **attrs)
+
+    def select(self, selector: str) -> List['_Node']:
+        """
+        使用类似 CSS 的选择器查找模块或元素
+
+        支持 ``type`` 字段的值（如 ``section`` ``button`` ``plain-text``）、``*``、
+        ``[name]`` ``[name=value]`` ``[name^=value]`` ``[name$=value]`` ``[name*=value]``，
+        以及后代（空格）与直接子节点（``>``）组合，如 ``section > button[value^="vote:"]``；
+        未加引号的值按 json 解析（``[cols=3]`` ``[circle=true]``），解析失败时作为字符串
+
+        :param selector: 选择器
+        :return: 按在卡片中出现的顺序排列的节点
+        """
+        return self.query_index.select(selector)
 
     def clear(self) -> 'Card':
         self.modules.clear()
@@ -117,6 +608,7 @@ class Card(Sequence):
 
 
 class CardMessage(Sequence):
+    __slots__ = ('card_list',)
     card_list: List[Card]
 
     def __init__(self, *card: Card) -> None:
@@ -152,8 +644,213 @@ class CardMessage(Sequence):
     def append(self, card: Card):
         self.card_list.append(card)
 
-    def build(self):
+    @classmethod
+    def from_dict(cls, data: List[dict], lazy: bool = False) -> 'CardMessage':
+        """
+        从构造后的列表还原卡片消息
+
+        :param data: ``build()`` 的结果或官方编辑器导出的 json 数组
+        :param lazy: 为 true 时模块在第一次被访问时才还原
+        :return: 还原后的卡片消息
+        """
+        if isinstance(data, dict):
+            data = [data]
+        return cls(*[Card.from_dict(i, lazy) for i in data])
+
+    @classmethod
+    def from_json(cls, text: Union[str, bytes], lazy: bool = False) -> 'CardMessage':
+        """
+        从 json 文本还原卡片消息
+
+        :param text: json 文本
+        :param lazy: 为 true 时模块在第一次被访问时才还原
+        :return: 还原后的卡片消息
+        """
+        return cls.from_dict(json.loads(text), lazy)
+
+    def diff(self, other: 'CardMessage') -> 'CardDiff':
+        """
+        与另一个卡片消息逐个模块比较
+
+        ex::
+
+            changes = old.diff(new)
+            if changes:
+                logger.info('更新 %s', changes.paths)
+
+        :param other: 新的卡片消息
+        :return: 差异，包含改动的位置与作用于 ``build()`` 结果的 json patch，没有差异时为假
+        """
+        from .diff import diff
+        return diff(self, other)
+
+    async def resolve(self, concurrency: Optional[int] = None,
+                      store: Optional['AssetStore'] = None) -> 'CardMessage':
+        """
+        并发解析所有卡片中尚未解析的资源地址（awaitable、函数或本地文件形式的 ``src`` ``cover`` 等）
+
+        :param concurrency: 同时解析的资源数，为 None 时使用 ``assets.DEFAULT_CONCURRENCY``
+        :param store: 上传本地文件（``pathlib.Path``、bytes 或 ``LocalAsset``）使用的 ``AssetStore``
+        :return: 自身
+        """
+        from .assets import resolve
+        await resolve(self, concurrency, store)
+        return self
+
+    async def abuild(self, concurrency: Optional[int] = None, validate: bool = False,
+                     store: Optional['AssetStore'] = None) -> List[dict]:
+        """
+        解析所有资源地址后构造
+
+        :param concurrency: 同时解析的资源数
+        :param validate: 为 true 时先检查是否符合平台限制
+        :param store: 上传本地文件使用的 ``AssetStore``
+        :return: 构造后卡片消息
+        """
+        await self.resolve(concurrency, store)
+        return self.build(validate)
+
+    def split(self, max_modules: int = MAX_MODULES, max_bytes: Optional[int] = None, max_cards: int = MAX_CARDS,
+              repeat_header: bool = True, keep_style: bool = True) -> List['CardMessage']:
+        """
+        把卡片消息切分为多个符合限制的卡片消息，过大的卡片会被拆开
+
+        :param max_modules: 每个卡片消息最多包含的模块数
+        :param max_bytes: 每个卡片消息序列化后（紧凑 UTF-8 json）的最大字节数，为 None 时不限制
+        :param max_cards: 每个卡片消息最多包含的卡片数
+        :param repeat_header: 为 true 时卡片的第一个模块是标题模块时，该模块会在拆开后的每个卡片重复
+        :param keep_style: 为 true 时拆开后的每个卡片都保留原卡片的主题、大小与颜色
+        :return: 卡片消息列表
+        """
+        from .pagination import split_cards
+        return split_cards(self.card_list, max_modules, max_bytes, max_cards, repeat_header, keep_style)
+
+    def find(self, type: 'TypeFilter' = None, **attrs) -> Optional['_Node']:
+        """
+        在所有卡片中查找第一个符合条件的模块或元素，条件同 ``Card.find``
+
+        :return: 符合的节点，没有时为 None
+        """
+        for card in self.card_list:
+            node = card.find(type, **attrs)
+            if node is not None:
+                return node
+        return None
+
+    def find_all(self, type: 'TypeFilter' = None, **attrs) -> List['_Node']:
+        """
+        在所有卡片中查找符合条件的模块或元素，条件同 ``Card.find``，每个卡片使用各自的索引
+
+        :return: 按在卡片消息中出现的顺序排列的节点
+        """
+        return [node for card in self.card_list for node in card.find_all(type, **attrs)]
+
+    def select(self, selector: str) -> List['_Node']:
+        """
+        在所有卡片中使用选择器查找，语法同 ``Card.select``
+
+        :param selector: 选择器
+        :return: 按在卡片消息中出现的顺序排列的节点
+        """
+        return [node for card in self.card_list for node in card.select(selector)]
+
+    def build(self, validate: bool = False) -> List[dict]:
+        """
+        :param validate: 为 true 时先检查是否符合平台限制，不符合时抛出 ``CardValidationError``
+        :return: 构造后卡片消息
+        """
+        if validate:
+            from .validator import check
+            check(self)
         return [card.build() for card in self.card_list]
 
-    def build_to_json(self) -> str:
-        return json.dumps(self.build(), indent=4, ensure_ascii=False)
+    def build_to_json(self, pretty: Optional[bool] = None, as_bytes: Optional[bool] = None,
+                      backend: Optional[str] = None) -> Union[str, bytes]:
+        """
+        序列化为 json，参数为 None 时使用 ``configure_json`` 的全局设置（默认为带缩进的 str）
+
+        :param pretty: 是否输出带缩进的 json
+        :param as_bytes: 是否返回 UTF-8 编码的 bytes
+        :param backend: auto|orjson|ujson|json
+        :return: json 文本
+        """
+        return to_json(self, pretty, as_bytes, backend)
+
+    def fingerprint(self) -> str:
+        """
+        内容的指纹，由各卡片的指纹计算
+
+        :return: 32 位十六进制字符串
+        """
+        hasher = blake2b(b'[', digest_size=16)
+        for card in self.card_list:
+            hasher.update(card.fingerprint().encode('ascii'))
+        return hasher.hexdigest()
+
+    def _iterencode(self) -> Iterator[str]:
+        yield '['
+        first = True
+        for card in self.card_list:
+            if first:
+                first = False
+            else:
+                yield ','
+            yield from card._iterencode()
+        yield ']'
+
+    def _encode(self) -> str:
+        return '[' + ','.join([card._encode() for card in self.card_list]) + ']'
+
+    def encode(self) -> bytes:
+        """
+        直接编码为紧凑的 UTF-8 json，不经过中间字典
+
+        :return: 与 ``json.dumps(self.build(), separators=(',', ':'), ensure_ascii=False).encode()`` 一致
+        """
+        return self._encode().encode('utf-8')
+
+    def iter_encode(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        分块编码为紧凑的 UTF-8 json
+
+        :param chunk_size: 每块的近似大小
+        :return: 字节块迭代器
+        """
+        return iter_chunks(self._iterencode(), chunk_size)
+
+    def write_to(self, stream: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+        """
+        分块写入紧凑的 UTF-8 json
+
+        :param stream: 可写的二进制流
+        :param chunk_size: 每块的近似大小
+        :return: 写入的字节数
+        """
+        return write_chunks(stream, self._iterencode(), chunk_size)
+
+    @property
+    def serialized_size(self) -> SerializedSize:
+        """
+        序列化后的大小，由各卡片缓存的大小累加得到
+        """
+        # 方括号与卡片之间的逗号
+        nbytes = chars = 2 + max(len(self.card_list) - 1, 0)
+        text_chars = 0
+        for card in self.card_list:
+            size = card.serialized_size
+            nbytes += size.bytes
+            chars += size.chars
+            text_chars += size.text_chars
+        return SerializedSize(nbytes, chars, text_chars)
+
+
+# Card 的槽的描述符，绕过 __setattr__ 直接赋值
+_set_json = Card._json.__set__
+_set_size = Card._size.__set__
+_set_digest = Card._digest.__set__
+_set_interned = Card._interned.__set__
+_set_query = Card._query.__set__
+_set_modules = Card.modules.__set__
+_set_theme = Card.theme.__set__
+_set_card_size = Card.size.__set__
+_set_color = Card.color.__set__
@@ -1,10 +1,24 @@
+import colorsys
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+__all__ = ['Color']
+
+_HEX = re.compile(r'[0-9a-fA-F]{6}')
+
+
 class Color:
     """
     添加颜色
+
+    不可修改，可以作为字典的键；十六进制形式只在创建时计算一次
     """
+    __slots__ = ('R', 'G', 'B', '_hex')
     R: int
     G: int
     B: int
+    _hex: str
 
     def __init__(self, r: int, g: int, b: int) -> None:
         """
@@ -18,21 +32,131 @@ class Color:
             raise Exception('RGB数字必须为0-255')
         if r < 0 or g < 0 or b < 0:
             raise Exception('RGB数字必须为0-255')
-        self.R = r
-        self.G = g
-        self.B = b
+        _init(self, r, g, b)
+
+    def __setattr__(self, key, value) -> None:
+        raise AttributeError('Color 不可修改')
+
+    def __delattr__(self, item) -> None:
+        raise AttributeError('Color 不可修改')
+
+    def __reduce__(self):
+        return Color, (self.R, self.G, self.B)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Color):
+            return self.R == other.R and self.G == other.G and self.B == other.B
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.R, self.G, self.B))
 
     def __str__(self) -> str:
-        r = str(hex(self.R))[2:]
-        g = str(hex(self.G))[2:]
-        b = str(hex(self.B))[2:]
-        if len(r) == 1:
-            r = '0' + r
-        if len(g) == 1:
-            g = '0' + g
-        if len(b) == 1:
-            b = '0' + b
-        return f'#{r+g+b}'
+        return self._hex
 
     def __repr__(self):
         return f'Color(r={self.R}, g={self.G}, b={self.B})'
+
+    @property
+    def hex(self) -> str:
+        """十六进制形式 ex: #55ffff"""
+        return self._hex
+
+    @classmethod
+    def from_hex(cls, text: str) -> 'Color':
+        """
+        从十六进制字符串创建颜色，相同的字符串返回同一个对象
+
+        :param text: #rrggbb、#rgb，可以省略 #
+        :return: 颜色
+        """
+        return _from_hex(text)
+
+    @classmethod
+    def from_hsl(cls, h: float, s: float, l: float) -> 'Color':
+        """
+        从 HSL 创建颜色
+
+        :param h: 色相 0-360
+        :param s: 饱和度 0-1
+        :param l: 亮度 0-1
+        :return: 颜色
+        """
+        r, g, b = colorsys.hls_to_rgb((h % 360) / 360, l, s)
+        return _make(round(r * 255), round(g * 255), round(b * 255))
+
+    def to_hsl(self) -> Tuple[float, float, float]:
+        """
+        :return: (色相 0-360, 饱和度 0-1, 亮度 0-1)
+        """
+        h, l, s = colorsys.rgb_to_hls(self.R / 255, self.G / 255, self.B / 255)
+        return h * 360, s, l
+
+    def lerp(self, other: 'Color', t: float) -> 'Color':
+        """
+        线性插值
+
+        :param other: 目标颜色
+        :param t: 0 时为自身，1 时为 ``other``，超出 0-1 时按两端处理
+        :return: 颜色
+        """
+        # _make 不检查范围，t 超出 0-1 时分量会越界
+        if t < 0:
+            t = 0
+        elif t > 1:
+            t = 1
+        return _make(round(self.R + (other.R - self.R) * t), round(self.G + (other.G - self.G) * t),
+                     round(self.B + (other.B - self.B) * t))
+
+    @classmethod
+    def gradient(cls, start: 'Color', end: 'Color', n: int) -> List['Color']:
+        """
+        一次生成从 ``start`` 到 ``end`` 的 ``n`` 个颜色（包含两端）
+
+        ex: 按排名给卡片上色 ``colors = Color.gradient(NamedColor.GOLD.value, NamedColor.GRAY.value, len(ranks))``
+
+        :param start: 起始颜色
+        :param end: 结束颜色
+        :param n: 颜色数量
+        :return: 颜色列表
+        """
+        if n < 1:
+            return []
+        if n == 1:
+            return [start]
+        r, g, b = start.R, start.G, start.B
+        step = n - 1
+        dr, dg, db = (end.R - r) / step, (end.G - g) / step, (end.B - b) / step
+        return [_make(round(r + dr * i), round(g + dg * i), round(b + db * i)) for i in range(n)]
+
+
+# __setattr__ 被禁用，直接通过槽描述符赋值
+_set_r = Color.R.__set__
+_set_g = Color.G.__set__
+_set_b = Color.B.__set__
+_set_hex = Color._hex.__set__
+
+
+def _init(color: Color, r: int, g: int, b: int) -> None:
+    _set_r(color, r)
+    _set_g(color, g)
+    _set_b(color, b)
+    _set_hex(color, '#%02x%02x%02x' % (r, g, b))
+
+
+def _make(r: int, g: int, b: int) -> Color:
+    """创建已知合法的颜色，跳过范围检查"""
+    color = object.__new__(Color)
+    _init(color, r, g, b)
+    return color
+
+
+@lru_cache(maxsize=4096)
+def _from_hex(text: str) -> Color:
+    value = text[1:] if text.startswith('#') else text
+    if len(value) == 3:
+        value = value[0] * 2 + value[1] * 2 + value[2] * 2
+    if not _HEX.fullmatch(value):
+        raise ValueError(f'颜色格式应为 #rrggbb，实际为 {text!r}')
+    number = int(value, 16)
+    return _make(number >> 16, (number >> 8) & 0xff, number & 0xff)
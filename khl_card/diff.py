@@ -0,0 +1,133 @@
+from typing import Any, List, Union
+
+from .card import Card, CardMessage
+from .node import _Node
+
+__all__ = ['CardDiff', 'diff']
+
+_Tree = Union[CardMessage, Card, _Node]
+
+
+class CardDiff:
+    """
+    两个卡片消息（或卡片、模块）之间的差异
+    """
+    __slots__ = ('patch',)
+    # RFC 6902 json patch，作用于 ``build()`` 的结果
+    patch: List[dict]
+
+    def __init__(self, patch: List[dict]) -> None:
+        self.patch = patch
+
+    @property
+    def paths(self) -> List[str]:
+        """所有改动的位置（json pointer）"""
+        return [i['path'] for i in self.patch]
+
+    def __bool__(self) -> bool:
+        return bool(self.patch)
+
+    def __len__(self) -> int:
+        return len(self.patch)
+
+    def __repr__(self):
+        return f'CardDiff(paths={self.paths})'
+
+
+def _escape(key: str) -> str:
+    return key.replace('~', '~0').replace('/', '~1')
+
+
+def _same(old, new) -> bool:
+    """节点与卡片直接比较缓存的序列化结果，字符串的哈希值也会被缓存，不同时不必逐字比较"""
+    if old is new:
+        return True
+    if type(old) is not type(new):
+        return False
+    if isinstance(old, (_Node, Card)):
+        old = old._encode()
+        new = new._encode()
+        return hash(old) == hash(new) and old == new
+    return old == new
+
+
+def _built(value) -> Any:
+    if isinstance(value, (_Node, Card)):
+        return value.build()
+    return value
+
+
+def _diff(old, new, path: str, out: List[dict]) -> None:
+    if _same(old, new):
+        return
+    if type(old) is not type(new):
+        out.append({'op': 'replace', 'path': path, 'value': _built(new)})
+    elif isinstance(old, Card):
+        _diff_dict({'theme': old.theme, 'size': old.size, 'color': old.color},
+                   {'theme': new.theme, 'size': new.size, 'color': new.color}, path, out)
+        _diff_list(old.modules, new.modules, path + '/modules', out)
+    elif isinstance(old, _Node):
+        _diff(old.build(), new.build(), path, out)
+    elif isinstance(old, dict):
+        _diff_dict(old, new, path, out)
+    elif isinstance(old, list):
+        _diff_list(old, new, path, out)
+    else:
+        out.append({'op': 'replace', 'path': path, 'value': new})
+
+
+def _diff_dict(old: dict, new: dict, path: str, out: List[dict]) -> None:
+    for key, value in old.items():
+        if key not in new:
+            if value is not None:
+                out.append({'op': 'remove', 'path': path + '/' + _escape(key)})
+        elif new[key] is None and value is not None:
+            # card.color 为 None 时 build() 中没有该字段
+            out.append({'op': 'remove', 'path': path + '/' + _escape(key)})
+        elif value is None and new[key] is not None:
+            out.append({'op': 'add', 'path': path + '/' + _escape(key), 'value': _built(new[key])})
+        else:
+            _diff(value, new[key], path + '/' + _escape(key), out)
+    for key, value in new.items():
+        if key not in old and value is not None:
+            out.append({'op': 'add', 'path': path + '/' + _escape(key), 'value': _built(value)})
+
+
+def _diff_list(old: list, new: list, path: str, out: List[dict]) -> None:
+    # 跳过相同的开头与结尾，中间部分逐项比较，多出的部分整体添加或删除；只处理单处插入与删除，保证线性复杂度
+    old_length = len(old)
+    new_length = len(new)
+    start = 0
+    limit = min(old_length, new_length)
+    while start < limit and _same(old[start], new[start]):
+        start += 1
+    end = 0
+    while end < limit - start and _same(old[old_length - 1 - end], new[new_length - 1 - end]):
+        end += 1
+    old_middle = old_length - end - start
+    new_middle = new_length - end - start
+    common = min(old_middle, new_middle)
+    for i in range(start, start + common):
+        _diff(old[i], new[i], f'{path}/{i}', out)
+    for i in range(start + common, start + new_middle):
+        out.append({'op': 'add', 'path': f'{path}/{i}', 'value': _built(new[i])})
+    for _ in range(old_middle - common):
+        out.append({'op': 'remove', 'path': f'{path}/{start + common}'})
+
+
+def diff(old: _Tree, new: _Tree) -> CardDiff:
+    """
+    比较两个卡片消息、卡片或模块
+
+    相同的子树直接比较缓存的序列化结果后跳过，只有改动的模块才会构造为字典比较，整体为线性复杂度
+
+    :param old: 原来的对象
+    :param new: 新的对象
+    :return: 差异，没有差异时为假
+    """
+    out = []
+    if isinstance(old, CardMessage) and isinstance(new, CardMessage):
+        _diff_list(old.card_list, new.card_list, '', out)
+    else:
+        _diff(old, new, '', out)
+    return CardDiff(out)
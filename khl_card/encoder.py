@@ -0,0 +1,77 @@
+import inspect
+import json
+from typing import Any, BinaryIO, Iterable, Iterator
+
+from .upload import is_local
+
+__all__ = ['encode_value', 'dumps', 'iter_chunks', 'write_chunks']
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# ensure_ascii=False 时 json 模块使用的字符串编码函数，有 C 加速时为 C 实现
+_encode_str = json.encoder.encode_basestring
+
+
+def _default(value: Any) -> Any:
+    if inspect.isawaitable(value) or callable(value) or is_local(value):
+        raise TypeError(f'资源地址 {value!r} 尚未解析，请先 await card.resolve()')
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+# 与 json.dumps(obj, separators=(',', ':'), ensure_ascii=False) 等价的紧凑编码
+dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default).encode
+
+
+def encode_value(value: Any) -> str:
+    """
+    把单个值编码为紧凑 json 文本
+
+    :param value: 要编码的值
+    :return: json 文本
+    """
+    if value.__class__ is str:
+        return _encode_str(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return dumps(value)
+
+
+def iter_chunks(pieces: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    把 json 片段合并为 UTF-8 字节块
+
+    :param pieces: json 文本片段
+    :param chunk_size: 每块的近似大小（按字符计）
+    :return: 字节块迭代器
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def write_chunks(stream: BinaryIO, pieces: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    把 json 片段分块写入二进制流
+
+    :param stream: 可写的二进制流，如 ``io.BytesIO`` 或以 ``'wb'`` 打开的文件
+    :param pieces: json 文本片段
+    :param chunk_size: 每块的近似大小（按字符计）
+    :return: 写入的字节数
+    """
+    written = 0
+    for chunk in iter_chunks(pieces, chunk_size):
+        stream.write(chunk)
+        written += len(chunk)
+    return written
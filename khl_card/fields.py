@@ -0,0 +1,383 @@
+import json
+from types import MemberDescriptorType
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from .encoder import encode_value
+
+__all__ = ['Field', 'field', 'child', 'children', 'generate']
+
+
+class _Missing:
+    def __repr__(self):
+        return 'MISSING'
+
+
+# 没有默认值，从字典还原时必须存在
+MISSING: Any = _Missing()
+
+VALUE = 0
+CHILD = 1
+CHILDREN = 2
+
+
+class Field(NamedTuple):
+    """
+    字段声明，在类中以 ``_fields`` 元组按序列化顺序列出，类创建时据此生成方法
+    """
+    # 属性名，同时也是构造函数的参数名
+    name: str
+    # 序列化后的键
+    key: str
+    # 默认值，从字典还原时缺少该键时使用
+    default: Any
+    # 为真时值等于默认值的字段不会出现在序列化结果中
+    omit_default: bool
+    # VALUE|CHILD|CHILDREN
+    kind: int
+    # 子节点从字典还原时使用的类
+    base: Optional[type]
+    # 为真时子节点列表以 *args 传给构造函数
+    star: bool
+
+
+def field(name: str, default: Any = MISSING, *, key: Optional[str] = None, omit_default: bool = False) -> Field:
+    """
+    普通值字段
+
+    :param name: 属性名
+    :param default: 默认值
+    :param key: 序列化后的键，默认与属性名相同
+    :param omit_default: 等于默认值时是否省略
+    """
+    return Field(name, name if key is None else key, default, omit_default, VALUE, None, False)
+
+
+def child(name: str, base: type, default: Any = MISSING, *, key: Optional[str] = None,
+          omit_default: bool = False) -> Field:
+    """
+    子节点字段
+
+    :param name: 属性名
+    :param base: 从字典还原时使用的类，根据 type 字段选择其子类
+    :param default: 默认值，为 None 时允许没有子节点
+    :param key: 序列化后的键，默认与属性名相同
+    :param omit_default: 等于默认值时是否省略
+    """
+    return Field(name, name if key is None else key, default, omit_default, CHILD, base, False)
+
+
+def children(name: str, base: type, *, key: Optional[str] = None, star: bool = False) -> Field:
+    """
+    子节点列表字段
+
+    :param name: 属性名
+    :param base: 从字典还原时使用的类，根据 type 字段选择其子类
+    :param key: 序列化后的键，默认与属性名相同
+    :param star: 构造函数是否以 ``*args`` 接收子节点
+    """
+    return Field(name, name if key is None else key, (), False, CHILDREN, base, star)
+
+
+def _seq_eq(a, b) -> bool:
+    # 列表与冻结后的元组内容相同时也相等
+    if a is b:
+        return True
+    if len(a) != len(b):
+        return False
+    for x, y in zip(a, b):
+        if x is not y and not x == y:
+            return False
+    return True
+
+
+class _Source:
+    """生成代码时的命名空间，常量以名称引用"""
+
+    def __init__(self, namespace: Dict[str, Any]) -> None:
+        self.namespace = namespace
+
+    def const(self, value: Any) -> str:
+        if value is None or value is True or value is False or value.__class__ in (int, str):
+            return repr(value)
+        name = f'_c{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+
+def _omitted(source: _Source, field: Field, var: str) -> str:
+    """:return: 值不等于默认值（需要输出）的条件"""
+    if field.default is None or field.default is True or field.default is False:
+        return f'{var} is not {field.default!r}'
+    return f'{var} != {source.const(field.default)}'
+
+
+def _build_value(field: Field, var: str) -> str:
+    if field.kind == VALUE:
+        return var
+    if field.default is None and not field.omit_default:
+        return f'(None if {var} is None else {var}.build())'
+    return f'{var}.build()'
+
+
+def _build_children(lines: list, field: Field, indent: str = '    ') -> str:
+    # 3.11 及以下的列表推导式是一次函数调用，子节点通常只有几个，循环 append 更快
+    var = f'_{field.name}'
+    lines.append(f'{indent}{var} = []')
+    lines.append(f'{indent}for i in self.{field.name}:')
+    lines.append(f'{indent}    {var}.append(i.build())')
+    return var
+
+
+def _dump_value(field: Field, var: str) -> str:
+    if field.kind == VALUE:
+        return f'_encode_value({var})'
+    if field.kind == CHILD:
+        if field.default is None and not field.omit_default:
+            return f'("null" if {var} is None else {var}._encode())'
+        return f'{var}._encode()'
+    return f"'[' + ','.join([i._encode() for i in {var}]) + ']'"
+
+
+def _type(cls: type) -> str:
+    # 类的 type 是字符串时直接写入生成的代码，省去一次属性查找
+    kind = getattr(cls, 'type', None)
+    return repr(kind) if isinstance(kind, str) else 'self.type'
+
+
+def _gen_build(cls: type, fields: Tuple[Field, ...]) -> Tuple[str, Dict[str, Any]]:
+    source = _Source({})
+    lines = ['def build(self):']
+    items = [f"'type': {_type(cls)}"]
+    index = 0
+    # 第一个可省略的字段之前的字段直接写在字典字面量中
+    while index < len(fields) and not fields[index].omit_default:
+        field = fields[index]
+        if field.kind == CHILDREN:
+            value = _build_children(lines, field)
+        else:
+            value = _build_value(field, 'self.' + field.name)
+        items.append(f'{field.key!r}: {value}')
+        index += 1
+    if index == len(fields):
+        lines.append(f'    return {{{", ".join(items)}}}')
+        return '\n'.join(lines), source.namespace
+    lines.append(f'    ret = {{{", ".join(items)}}}')
+    for field in fields[index:]:
+        indent = '    '
+        if field.omit_default:
+            lines.append(f'    v = self.{field.name}')
+            lines.append(f'    if {_omitted(source, field, "v")}:')
+            indent = '        '
+        elif field.kind != CHILDREN:
+            lines.append(f'    v = self.{field.name}')
+        if field.kind == CHILDREN:
+            value = _build_children(lines, field, indent)
+        else:
+            value = _build_value(field, 'v')
+        lines.append(f'{indent}ret[{field.key!r}] = {value}')
+    lines.append('    return ret')
+    return '\n'.join(lines), source.namespace
+
+
+def _json_key(field: Field) -> str:
+    return repr(',' + json.dumps(field.key, ensure_ascii=False) + ':')
+
+
+def _gen_dump(cls: type, fields: Tuple[Field, ...]) -> Tuple[str, Dict[str, Any]]:
+    source = _Source({'_encode_value': encode_value})
+    lines = ['def _dump(self):']
+    kind = getattr(cls, 'type', None)
+    if isinstance(kind, str):
+        parts = [repr('{"type":' + encode_value(kind))]
+    else:
+        parts = [repr('{"type":'), '_encode_value(self.type)']
+    index = 0
+    while index < len(fields) and not fields[index].omit_default:
+        field = fields[index]
+        parts.append(_json_key(field))
+        parts.append(_dump_value(field, 'self.' + field.name))
+        index += 1
+    if index == len(fields):
+        parts.append("'}'")
+        lines.append(f'    return {" + ".join(parts)}')
+        return '\n'.join(lines), source.namespace
+    lines.append(f'    ret = {" + ".join(parts)}')
+    for field in fields[index:]:
+        lines.append(f'    v = self.{field.name}')
+        statement = f'ret += {_json_key(field)} + {_dump_value(field, "v")}'
+        if field.omit_default:
+            lines.append(f'    if {_omitted(source, field, "v")}:')
+            lines.append(f'        {statement}')
+        else:
+            lines.append(f'    {statement}')
+    lines.append("    return ret + '}'")
+    return '\n'.join(lines), source.namespace
+
+
+# 编码结果只包含 ASCII 字符的值类型
+_SCALARS = (type(None), bool, int, float)
+
+
+def _extra(text: str) -> int:
+    """:return: 非 ASCII 字符在 UTF-8 中额外占用的字节数"""
+    return 0 if text.isascii() else len(text.encode('utf-8')) - len(text)
+
+
+def _gen_extra_bytes(cls: type, fields: Tuple[Field, ...]) -> Tuple[str, Dict[str, Any]]:
+    lines = ['def _extra_bytes(self):']
+    source = _Source({'_extra': _extra, '_encode_value': encode_value, '_SCALARS': _SCALARS})
+    kind = getattr(cls, 'type', None)
+    # type 与一定输出的键是常量
+    static = sum([_extra(field.key) for field in fields if not field.omit_default])
+    if isinstance(kind, str):
+        lines.append(f'    extra = {static + _extra(kind)}')
+    else:
+        lines.append(f'    extra = {static} + _extra(self.type)')
+    for field in fields:
+        body = []
+        if field.omit_default and _extra(field.key):
+            body.append(f'extra += {_extra(field.key)}')
+        if field.kind == VALUE:
+            body.append('if v.__class__ is str:')
+            body.append('    if not v.isascii():')
+            body.append("        extra += len(v.encode('utf-8')) - len(v)")
+            body.append('elif v.__class__ not in _SCALARS:')
+            body.append('    extra += _extra(_encode_value(v))')
+        if not body:
+            continue
+        lines.append(f'    v = self.{field.name}')
+        indent = '    '
+        if field.omit_default:
+            lines.append(f'    if {_omitted(source, field, "v")}:')
+            indent = '        '
+        lines.extend([indent + i for i in body])
+    lines.append('    return extra')
+    return '\n'.join(lines), source.namespace
+
+
+def _gen_repr(fields: Tuple[Field, ...]) -> Tuple[str, Dict[str, Any]]:
+    parts = []
+    for field in fields:
+        if field.star:
+            parts.append(f"', '.join([repr(i) for i in self.{field.name}])")
+        else:
+            parts.append(f"{field.name + '='!r} + repr(self.{field.name})")
+    body = " + ', ' + ".join(parts) if parts else "''"
+    return f"def __repr__(self):\n    return type(self).__name__ + '(' + {body} + ')'", {}
+
+
+def _gen_eq(fields: Tuple[Field, ...], node: type) -> Tuple[str, Dict[str, Any]]:
+    lines = [
+        'def __eq__(self, other):',
+        '    if self is other:',
+        '        return True',
+        '    if type(other) is not type(self):',
+        '        return False if isinstance(other, _Node) else NotImplemented',
+    ]
+    checks = []
+    for field in fields:
+        if field.kind == CHILDREN:
+            checks.append(f'_seq_eq(self.{field.name}, other.{field.name})')
+        else:
+            checks.append(f'self.{field.name} == other.{field.name}')
+    lines.append(f'    return {" and ".join(checks) if checks else "True"}')
+    return '\n'.join(lines), {'_Node': node, '_seq_eq': _seq_eq}
+
+
+def _gen_hash(fields: Tuple[Field, ...]) -> Tuple[str, Dict[str, Any]]:
+    items = ['type(self)']
+    for field in fields:
+        if field.kind == CHILDREN:
+            items.append(f'tuple(self.{field.name})')
+        else:
+            items.append(f'self.{field.name}')
+    return f'def __hash__(self):\n    return hash(({", ".join(items)},))', {}
+
+
+def _gen_init(cls: type, fields: Tuple[Field, ...], own_list: Callable) -> Tuple[str, Dict[str, Any]]:
+    source = _Source({'_own_list': own_list})
+    lines = [f'def _init_fields(self{"".join([", " + field.name for field in fields])}):']
+    # 槽直接通过描述符赋值，不经过 __setattr__；新建的节点没有缓存，也没有需要通知的父节点
+    for name in cls._cache_slots:
+        lines.append(f'    {source.const(getattr(cls, name).__set__)}(self, None)')
+    for field in fields:
+        value = f'_own_list({field.name}, self)' if field.kind == CHILDREN else field.name
+        descriptor = getattr(cls, field.name, None)
+        if isinstance(descriptor, MemberDescriptorType):
+            lines.append(f'    {source.const(descriptor.__set__)}(self, {value})')
+        else:
+            lines.append(f'    self.{field.name} = {value}')
+    if len(lines) == 1:
+        lines.append('    pass')
+    return '\n'.join(lines), source.namespace
+
+
+def _gen_from_dict(fields: Tuple[Field, ...]) -> Tuple[str, Dict[str, Any]]:
+    source = _Source({})
+    args = []
+    for field in fields:
+        if field.default is MISSING:
+            raw = f'data[{field.key!r}]'
+        else:
+            raw = f'data.get({field.key!r}, {source.const(field.default)})'
+        if field.kind == VALUE:
+            args.append(f'{field.name}={raw}')
+            continue
+        base = source.const(field.base)
+        if field.kind == CHILDREN:
+            converted = f'[{base}.from_dict(i) for i in {raw}]'
+            args.append(f'*{converted}' if field.star else f'{field.name}={converted}')
+        elif field.default is None:
+            args.append(f'{field.name}=_child({base}, {raw})')
+        else:
+            args.append(f'{field.name}={base}.from_dict({raw})')
+    source.namespace['_child'] = lambda base, data: None if data is None else base.from_dict(data)
+    return f'def _from_dict(cls, data):\n    return cls({", ".join(args)})', source.namespace
+
+
+def _compile(code: str, namespace: Dict[str, Any], cls: type, name: str):
+    namespace = dict(namespace)
+    exec(compile(code, f'<{cls.__name__}.{name} generated by khl_card.fields>', 'exec'), namespace)
+    func = namespace[name]
+    func.__qualname__ = f'{cls.__qualname__}.{name}'
+    func.__module__ = cls.__module__
+    func._generated = True
+    return func
+
+
+def generate(cls: type, node: type, own_list: Callable) -> None:
+    """
+    根据 ``cls._fields`` 生成 ``build`` ``_dump`` ``_extra_bytes`` ``__repr__`` ``__eq__`` ``__hash__``
+    ``_from_dict``，以及构造函数使用的 ``_init_fields``，类中已经定义的方法不会被替换
+
+    没有声明 ``_fields`` 而是继承的类只重新生成内联了 ``type`` 的 ``build`` ``_dump`` 与 ``_extra_bytes``，
+    并且只替换继承来的生成方法；重写了 ``build`` 的类不会被处理
+
+    :param cls: 节点类
+    :param node: 节点基类，用于判断比较的对象是否为节点
+    :param own_list: 把列表转换为属于节点、能感知原地修改的列表的函数
+    """
+    fields: Tuple[Field, ...] = cls._fields
+    generators = (
+        ('build', lambda: _gen_build(cls, fields)),
+        ('_dump', lambda: _gen_dump(cls, fields)),
+        ('_extra_bytes', lambda: _gen_extra_bytes(cls, fields)),
+        ('__repr__', lambda: _gen_repr(fields)),
+        ('__eq__', lambda: _gen_eq(fields, node)),
+        ('__hash__', lambda: _gen_hash(fields)),
+        ('_from_dict', lambda: _gen_from_dict(fields)),
+        ('_init_fields', lambda: _gen_init(cls, fields, own_list)),
+    )
+    declared = '_fields' in cls.__dict__
+    if not declared:
+        if 'build' in cls.__dict__:
+            return
+        generators = generators[:3]
+    for name, generator in generators:
+        if name in cls.__dict__:
+            continue
+        if not declared and not getattr(getattr(cls, name), '_generated', False):
+            continue
+        code, namespace = generator()
+        func = _compile(code, namespace, cls, name)
+        setattr(cls, name, classmethod(func) if name == '_from_dict' else func)
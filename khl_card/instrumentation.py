@@ -0,0 +1,227 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from .card import Card, CardMessage
+from .node import _node_types
+
+__all__ = ['BuildRecord', 'BuildStats', 'build_stats', 'add_hook', 'remove_hook', 'instrument', 'is_instrumented']
+
+# hook(类型, 耗时（秒）, 输出字节数, 嵌套深度)，卡片消息的深度为 1，其中的卡片为 2，依此类推
+BuildHook = Callable[[str, float, int, int], None]
+
+
+class BuildRecord(NamedTuple):
+    """
+    一种类型的统计
+    """
+    # 调用次数
+    calls: int
+    # 累计耗时（秒），包含子节点 build 的耗时，不包含统计本身的耗时
+    seconds: float
+    # 累计输出的紧凑 UTF-8 json 字节数
+    bytes: int
+    # 最大嵌套深度
+    max_depth: int
+
+
+class BuildStats:
+    """
+    按类型（模块与元素的 ``type`` 字段，卡片消息为 ``CardMessage``）统计 ``build`` 的调用次数、耗时、输出大小与嵌套深度，
+    可以在多个线程中使用
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: Dict[str, List] = {}
+
+    def record(self, kind: str, seconds: float, size: int, depth: int) -> None:
+        """
+        记录一次调用，可以直接作为 hook 使用
+
+        :param kind: 类型
+        :param seconds: 耗时（秒）
+        :param size: 输出字节数
+        :param depth: 嵌套深度
+        """
+        with self._lock:
+            item = self._data.get(kind)
+            if item is None:
+                self._data[kind] = [1, seconds, size, depth]
+                return
+            item[0] += 1
+            item[1] += seconds
+            item[2] += size
+            if depth > item[3]:
+                item[3] = depth
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._data.clear()
+
+    def as_dict(self) -> Dict[str, BuildRecord]:
+        """
+        :return: 类型 -> 统计，按累计耗时从大到小排列
+        """
+        with self._lock:
+            items = [(k, BuildRecord(*v)) for k, v in self._data.items()]
+        items.sort(key=lambda i: i[1].seconds, reverse=True)
+        return dict(items)
+
+    def to_prometheus(self, prefix: str = 'khl_card_build') -> str:
+        """
+        导出为 Prometheus 文本格式
+
+        :param prefix: 指标名前缀
+        :return: 文本，每个指标以 ``type`` 标签区分类型
+        """
+        records = self.as_dict()
+        metrics = (
+            ('calls_total', 'counter', 'build 调用次数', lambda r: str(r.calls)),
+            ('seconds_total', 'counter', 'build 累计耗时（秒）', lambda r: repr(r.seconds)),
+            ('bytes_total', 'counter', 'build 累计输出的 json 字节数', lambda r: str(r.bytes)),
+            ('max_depth', 'gauge', 'build 最大嵌套深度', lambda r: str(r.max_depth)),
+        )
+        lines = []
+        for suffix, metric_type, text, value in metrics:
+            name = f'{prefix}_{suffix}'
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for kind, record in records.items():
+                label = kind.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{name}{{type="{label}"}} {value(record)}')
+        return '\n'.join(lines) + '\n'
+
+    def __repr__(self):
+        return f'BuildStats({self.as_dict()})'
+
+
+# 进程内共享的统计，``add_hook(build_stats.record)`` 后开始记录
+build_stats = BuildStats()
+
+_hooks: List[BuildHook] = []
+_lock = threading.Lock()
+_local = threading.local()
+# 类 -> 替换前的 build
+_originals: Dict[type, Callable] = {}
+
+
+def _kind(cls: type) -> str:
+    kind = getattr(cls, 'type', None)
+    return kind if isinstance(kind, str) else cls.__name__
+
+
+def _wrap(original: Callable) -> Callable:
+    @wraps(original)
+    def build(self, *args, **kwargs):
+        local = _local
+        # 子类的 build 通过 super() 调用父类同样被替换的 build 时只记录最外层
+        current = getattr(local, 'current', None)
+        if current is self or getattr(local, 'paused', False):
+            return original(self, *args, **kwargs)
+        depth = getattr(local, 'depth', 0) + 1
+        local.depth = depth
+        local.current = self
+        overhead = getattr(local, 'overhead', None)
+        if overhead is None:
+            overhead = local.overhead = 0.0
+        start = time.perf_counter()
+        try:
+            ret = original(self, *args, **kwargs)
+        finally:
+            local.depth = depth - 1
+            local.current = current
+        end = time.perf_counter()
+        # 子节点计算大小与调用 hook 的耗时不计入父节点
+        seconds = end - start - (local.overhead - overhead)
+        try:
+            # 自定义节点计算大小时可能再次调用 build，不重复记录
+            local.paused = True
+            try:
+                size = self.serialized_size.bytes
+            finally:
+                local.paused = False
+            kind = _kind(type(self))
+            for hook in tuple(_hooks):
+                hook(kind, seconds, size, depth)
+        finally:
+            local.overhead += time.perf_counter() - end
+        return ret
+
+    return build
+
+
+def _install() -> None:
+    for cls in (CardMessage, Card, *_node_types):
+        original = cls.__dict__.get('build')
+        if original is None or getattr(original, '__isabstractmethod__', False):
+            continue
+        _originals[cls] = original
+        cls.build = _wrap(original)
+
+
+def _uninstall() -> None:
+    for cls, original in _originals.items():
+        cls.build = original
+    _originals.clear()
+
+
+def add_hook(hook: BuildHook) -> None:
+    """
+    添加 hook，之后每次调用卡片消息、卡片、模块与元素的 ``build`` 都会调用它
+
+    没有 hook 时 ``build`` 是原来的方法，没有额外开销；添加第一个 hook 时才替换为记录耗时的版本。
+    之后才定义的自定义子类如果重写了 ``build``，需要先移除所有 hook 再重新添加。
+
+    :param hook: hook(类型, 耗时（秒）, 输出字节数, 嵌套深度)
+    """
+    with _lock:
+        if not _hooks:
+            _install()
+        _hooks.append(hook)
+
+
+def remove_hook(hook: BuildHook) -> None:
+    """
+    移除 hook，移除最后一个时恢复原来的 ``build``
+
+    :param hook: ``add_hook`` 添加的 hook
+    """
+    with _lock:
+        _hooks.remove(hook)
+        if not _hooks:
+            _uninstall()
+
+
+def is_instrumented() -> bool:
+    """
+    :return: 当前是否有 hook
+    """
+    return bool(_hooks)
+
+
+@contextmanager
+def instrument(stats: Optional[BuildStats] = None) -> Iterator[BuildStats]:
+    """
+    在此期间统计 ``build``
+
+    ex::
+
+        with instrument() as stats:
+            message.build()
+        print(stats.to_prometheus())
+
+    :param stats: 记录到的统计，为 None 时使用新的统计；传入 ``build_stats`` 可以累计到全局统计
+    :return: 统计
+    """
+    if stats is None:
+        stats = BuildStats()
+    hook = stats.record
+    add_hook(hook)
+    try:
+        yield stats
+    finally:
+        remove_hook(hook)
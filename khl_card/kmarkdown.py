@@ -0,0 +1,286 @@
+import re
+from typing import List, Optional, Union
+
+__all__ = ['KmdLeaf', 'KmdSpan', 'parse', 'to_plain_text', 'truncate']
+
+# 需要成对出现的标记与对应的类型
+_TOGGLES = {
+    '***': 'bold_italic',
+    '**': 'bold',
+    '*': 'italic',
+    '~~': 'strikethrough',
+    '(ins)': 'underline',
+    '(spl)': 'spoiler',
+}
+# 提及标记，中间的内容原样保留
+_MENTIONS = {'(met)': ('user', '@'), '(rol)': ('role', '@'), '(chn)': ('channel', '#')}
+
+_TOKEN = re.compile(r'\\[\s\S]|```|`|\(met\)|\(rol\)|\(chn\)|\(ins\)|\(spl\)|\(font\)|\*\*\*|\*\*|\*|~~|\[|\]\(|\n\n'
+                    r'|^> |^---$', re.M)
+_FONT_COLOR = re.compile(r'\[([^\]\n]*)\]')
+_PAREN = re.compile(r'[()]')
+
+
+class KmdLeaf:
+    """
+    kmarkdown 中不可再分的部分
+
+    ``kind`` 为 text 时是普通文本，其余（escape、code、code_block、user、role、channel、divider）为不可截断的整体
+    """
+    __slots__ = ('kind', 'raw', 'text', 'value')
+    kind: str
+    raw: str
+    text: str
+    value: Optional[str]
+
+    def __init__(self, kind: str, raw: str, text: str, value: Optional[str] = None) -> None:
+        """
+        :param kind: 类型
+        :param raw: 原始的 kmarkdown 文本
+        :param text: 显示的文本
+        :param value: 提及的 id 或代码块的语言
+        """
+        self.kind = kind
+        self.raw = raw
+        self.text = text
+        self.value = value
+
+    def __repr__(self):
+        return f'KmdLeaf(kind=\'{self.kind}\', raw={self.raw!r})'
+
+
+class KmdSpan:
+    """
+    kmarkdown 中带格式的一段文本
+
+    ``kind`` 为 root、bold、italic、bold_italic、strikethrough、underline、spoiler、color、link 或 quote
+    """
+    __slots__ = ('kind', 'opener', 'closer', 'children', 'value')
+    kind: str
+    opener: str
+    closer: str
+    children: List[Union[KmdLeaf, 'KmdSpan']]
+    value: Optional[str]
+
+    def __init__(self, kind: str, opener: str, closer: str, children: List[Union[KmdLeaf, 'KmdSpan']],
+                 value: Optional[str] = None) -> None:
+        """
+        :param kind: 类型
+        :param opener: 开始标记
+        :param closer: 结束标记
+        :param children: 子节点
+        :param value: 链接地址或文字颜色
+        """
+        self.kind = kind
+        self.opener = opener
+        self.closer = closer
+        self.children = children
+        self.value = value
+
+    def __repr__(self):
+        return f'KmdSpan(kind=\'{self.kind}\', children={self.children!r})'
+
+
+def _close(stack: list, index: int, closer: str, value: Optional[str] = None) -> None:
+    """关闭 stack[index]，其上未关闭的标记作为普通文本并入其中"""
+    while len(stack) > index + 1:
+        _flatten(stack)
+    kind, opener, children, _ = stack.pop()
+    stack[-1][2].append(KmdSpan(kind, opener, closer, children, value))
+
+
+def _flatten(stack: list) -> None:
+    """把栈顶未关闭的标记当作普通文本"""
+    _, opener, children, _ = stack.pop()
+    parent = stack[-1][2]
+    parent.append(KmdLeaf('text', opener, opener))
+    parent.extend(children)
+
+
+def _find(stack: list, kind: str) -> int:
+    for index in range(len(stack) - 1, 0, -1):
+        if stack[index][0] == kind:
+            return index
+    return -1
+
+
+def _link_end(content: str, start: int) -> int:
+    """
+    查找链接地址的结束括号，地址中成对的括号（如 ``http://x.com/a_(b)``）属于地址本身
+
+    :param content: kmarkdown 文本
+    :param start: 地址的开始位置
+    :return: 结束括号的位置，没有时为 -1
+    """
+    depth = 0
+    for match in _PAREN.finditer(content, start):
+        if match.group() == '(':
+            depth += 1
+        elif depth:
+            depth -= 1
+        else:
+            return match.start()
+    # 括号不成对时退回到第一个右括号
+    return content.find(')', start)
+
+
+def parse(content: str) -> KmdSpan:
+    """
+    一次遍历把 kmarkdown 文本解析为语法树，不成对的标记视为普通文本
+
+    :param content: kmarkdown 文本
+    :return: 类型为 root 的根节点
+    """
+    # 每一层为 [类型, 开始标记, 子节点, 附加值]
+    stack = [['root', '', [], None]]
+    pos = 0
+    length = len(content)
+    while pos < length:
+        match = _TOKEN.search(content, pos)
+        if match is None:
+            stack[-1][2].append(KmdLeaf('text', content[pos:], content[pos:]))
+            break
+        start, end = match.span()
+        if start > pos:
+            stack[-1][2].append(KmdLeaf('text', content[pos:start], content[pos:start]))
+        token = match.group()
+        children = stack[-1][2]
+        pos = end
+        if token[0] == '\\':
+            children.append(KmdLeaf('escape', token, token[1]))
+        elif token == '```' or token == '`':
+            close = content.find(token, end)
+            if close == -1:
+                children.append(KmdLeaf('text', token, token))
+                continue
+            body = content[end:close]
+            pos = close + len(token)
+            if token == '`':
+                children.append(KmdLeaf('code', content[start:pos], body))
+            else:
+                language, _, code = body.partition('\n') if '\n' in body else ('', '', body)
+                children.append(KmdLeaf('code_block', content[start:pos], code.rstrip('\n'), language))
+        elif token in _MENTIONS:
+            close = content.find(token, end)
+            if close == -1:
+                children.append(KmdLeaf('text', token, token))
+                continue
+            kind, prefix = _MENTIONS[token]
+            pos = close + len(token)
+            children.append(KmdLeaf(kind, content[start:pos], prefix + content[end:close], content[end:close]))
+        elif token in _TOGGLES:
+            kind = _TOGGLES[token]
+            index = _find(stack, kind)
+            if index == -1:
+                stack.append([kind, token, [], None])
+            else:
+                _close(stack, index, token)
+        elif token == '(font)':
+            index = _find(stack, 'color')
+            if index == -1:
+                stack.append(['color', token, [], None])
+            else:
+                color = _FONT_COLOR.match(content, end)
+                if color is not None:
+                    pos = color.end()
+                    _close(stack, index, content[start:pos], color.group(1))
+                else:
+                    _close(stack, index, token)
+        elif token == '[':
+            stack.append(['link', token, [], None])
+        elif token == '](':
+            index = _find(stack, 'link')
+            close = _link_end(content, end)
+            if index == -1 or close == -1:
+                children.append(KmdLeaf('text', token, token))
+                continue
+            pos = close + 1
+            _close(stack, index, content[start:pos], content[end:close])
+        elif token == '\n\n':
+            index = _find(stack, 'quote')
+            if index != -1:
+                _close(stack, index, '')
+            stack[-1][2].append(KmdLeaf('text', token, token))
+        elif token == '> ':
+            if _find(stack, 'quote') == -1:
+                stack.append(['quote', token, [], None])
+            else:
+                children.append(KmdLeaf('text', token, token))
+        else:
+            children.append(KmdLeaf('divider', token, ''))
+    index = _find(stack, 'quote')
+    while len(stack) > 1:
+        if len(stack) - 1 == index:
+            _close(stack, index, '')
+        else:
+            _flatten(stack)
+    return KmdSpan('root', '', '', stack[0][2])
+
+
+def to_plain_text(node: Union[KmdSpan, KmdLeaf]) -> str:
+    """
+    去掉所有格式，提及显示为 ``@id`` 或 ``#id``
+
+    :param node: 语法树
+    :return: 纯文本
+    """
+    if isinstance(node, KmdLeaf):
+        return node.text
+    out = []
+    pending = node.children[::-1]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, KmdLeaf):
+            out.append(item.text)
+        else:
+            pending.extend(item.children[::-1])
+    return ''.join(out)
+
+
+def _render(node: Union[KmdSpan, KmdLeaf], budget: List[int], out: List[str]) -> bool:
+    """按剩余的可见字符数输出 kmarkdown 文本，用完时返回 False"""
+    if isinstance(node, KmdLeaf):
+        size = len(node.text)
+        if size <= budget[0]:
+            budget[0] -= size
+            out.append(node.raw)
+            return True
+        if node.kind == 'text' and budget[0] > 0:
+            out.append(node.raw[:budget[0]])
+        budget[0] = 0
+        return False
+    if node.kind != 'root' and budget[0] <= 0:
+        return False
+    out.append(node.opener)
+    mark = len(out)
+    complete = True
+    for child in node.children:
+        if not _render(child, budget, out):
+            complete = False
+            break
+    if mark == len(out) and node.children:
+        # 没有输出任何内容时连同开始标记一起去掉
+        out.pop()
+        return complete
+    out.append(node.closer)
+    return complete
+
+
+def truncate(node: KmdSpan, limit: int, ellipsis: str = '...') -> str:
+    """
+    把可见字符数限制在 ``limit`` 以内，只会截断普通文本，格式标记总是完整成对
+
+    :param node: 语法树
+    :param limit: 最大可见字符数
+    :param ellipsis: 截断后添加在末尾的文本
+    :return: kmarkdown 文本
+    """
+    out = []
+    if len(to_plain_text(node)) <= limit:
+        _render(node, [limit], out)
+        return ''.join(out)
+    if len(ellipsis) > limit:
+        raise ValueError('ellipsis 比 limit 更长')
+    _render(node, [limit - len(ellipsis)], out)
+    out.append(ellipsis)
+    return ''.join(out)
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+__all__ = ['MAX_CARDS', 'MAX_MODULES', 'MAX_PLAIN_TEXT_LENGTH', 'MAX_KMARKDOWN_LENGTH', 'MAX_HEADER_LENGTH',
+           'MAX_PARAGRAPH_FIELDS', 'MAX_IMAGES', 'MAX_BUTTONS', 'MAX_CONTEXT_ELEMENTS', 'MAX_BUTTON_VALUE_LENGTH',
+           'trusted', 'is_trusted']
+
+# 卡片消息最多包含的卡片数
+MAX_CARDS = 5
+# 卡片消息中最多包含的模块数
+MAX_MODULES = 50
+# plain-text 最大长度
+MAX_PLAIN_TEXT_LENGTH = 2000
+# kmarkdown 最大长度
+MAX_KMARKDOWN_LENGTH = 5000
+# 标题模块文本最大长度
+MAX_HEADER_LENGTH = 100
+# 多列文本最多包含的文本数
+MAX_PARAGRAPH_FIELDS = 50
+# 图片组与容器最多包含的图片数
+MAX_IMAGES = 9
+# 交互模块最多包含的按钮数
+MAX_BUTTONS = 4
+# 备注模块最多包含的元素数
+MAX_CONTEXT_ELEMENTS = 10
+# 点击后回传的按钮 value 最大长度
+MAX_BUTTON_VALUE_LENGTH = 100
+
+# 每个线程与 asyncio 任务各自独立
+_trusted: ContextVar[bool] = ContextVar('khl_card_trusted', default=False)
+
+
+def is_trusted() -> bool:
+    """
+    :return: 当前是否处于信任模式
+    """
+    return _trusted.get()
+
+
+@contextmanager
+def trusted() -> Iterator[None]:
+    """
+    信任模式，在此期间构造模块与元素时跳过构造函数中的检查
+
+    适合批量构造已知合法的卡片，之后可以使用 ``validate`` 一次性检查。该状态只对当前线程与 asyncio 任务生效。
+    """
+    token = _trusted.set(True)
+    try:
+        yield
+    finally:
+        _trusted.reset(token)
@@ -1,18 +1,26 @@
-import json
-import time
 from abc import abstractmethod, ABC
-from typing import Optional, Tuple, Union
+from datetime import tzinfo
+from typing import TYPE_CHECKING, Optional, Tuple, Union
 
 from .accessory import _BaseText, _BaseNonText, _BaseAccessory, PlainText, Image, Button, Paragraph
+from .encoder import encode_value
+from .fields import child, children, field
+from .limits import MAX_IMAGES, MAX_BUTTONS, MAX_CONTEXT_ELEMENTS, is_trusted
+from .node import _Node
+from .timestamp import TimeValue, now, to_timestamp
+
+if TYPE_CHECKING:
+    from .assets import AssetSource
 
 __all__ = ['Header', 'Section', 'ImageGroup', 'Container', 'Context', 'ActionGroup', 'File', 'Audio', 'Video',
            'Divider', 'Invite', 'Countdown', '_Module']
 
 
-class _Module(ABC):
+class _Module(_Node, ABC):
     """
     模块基类
     """
+    __slots__ = ()
 
     @abstractmethod
     def build(self) -> dict:
@@ -22,9 +30,6 @@ class _Module(ABC):
         :return: 构造后模块
         """
 
-    def build_to_json(self) -> str:
-        return json.dumps(self.build(), indent=4, ensure_ascii=False)
-
     @abstractmethod
     def __repr__(self):
         ...
@@ -36,7 +41,10 @@ class Header(_Module):
 
     标题模块只能支持展示标准文本（text），突出标题样式。
     """
+    __slots__ = ('text',)
+    type = 'header'
     text: PlainText
+    _fields = (child('text', PlainText),)
 
     def __init__(self, text: Union[str, PlainText] = '') -> None:
         """
@@ -46,14 +54,7 @@ class Header(_Module):
 
         :param text: 标题内容
         """
-        self.type = 'header'
-        self.text = text if isinstance(text, PlainText) else PlainText(text)
-
-    def build(self) -> dict:
-        return {"type": self.type, "text": self.text.build()}
-
-    def __repr__(self):
-        return f'Header({self.text.__repr__()})'
+        Header._init_fields(self, text if isinstance(text, PlainText) else PlainText(text))
 
 
 class Section(_Module):
@@ -62,9 +63,13 @@ class Section(_Module):
 
     结构化的内容，显示文本+其它元素。
     """
+    __slots__ = ('mode', 'text', 'accessory')
+    type = 'section'
     mode: str
     text: _BaseText
     accessory: _BaseNonText
+    _fields = (field('mode', 'right'), child('text', _BaseAccessory),
+               child('accessory', _BaseNonText, None, omit_default=True))
 
     def __init__(self, text: Union[_BaseText, Paragraph], *, mode: str = 'right',
                  accessory: _BaseNonText = None) -> None:
@@ -77,20 +82,7 @@ class Section(_Module):
         :param text: 文本元素，和结构体
         :param accessory: 非文本元素
         """
-        self.type = 'section'
-        self.mode = mode
-        self.text = text
-        self.accessory = accessory
-
-    def build(self) -> dict:
-        ret = {'type': self.type, 'mode': self.mode, 'text': self.text.build()}
-        if self.accessory is None:
-            return ret
-        ret['accessory'] = self.accessory.build()
-        return ret
-
-    def __repr__(self):
-        return f'Section(text={self.text.__repr__()}, mode=\'{self.mode}\', accessory={self.accessory.__repr__()})'
+        Section._init_fields(self, mode, text, accessory)
 
 
 class ImageGroup(_Module):
@@ -99,7 +91,10 @@ class ImageGroup(_Module):
 
     1 到多张图片的组合
     """
+    __slots__ = ('elements',)
+    type = 'image-group'
     elements: Tuple[Image]
+    _fields = (children('elements', Image, star=True),)
 
     def __init__(self, *elements: Image) -> None:
         """
@@ -109,26 +104,19 @@ class ImageGroup(_Module):
 
         :param elements: 图片元素，其它元素无效
         """
-        self.type = 'image-group'
-        if len(elements) > 9:
+        if len(elements) > MAX_IMAGES and not is_trusted():
             raise Exception('图片元素最多为9个')
-        self.elements = elements
-
-    def build(self) -> dict:
-        ret = {'type': self.type, 'elements': []}
-        for i in self.elements:
-            ret['elements'].append(i.build())
-        return ret
-
-    def __repr__(self):
-        return 'ImageGroup(' + ', '.join([image.__repr__() for image in self.elements]) + ')'
+        ImageGroup._init_fields(self, elements)
 
 
 class Container(_Module):
     """
     构建容器模块
     """
+    __slots__ = ('elements',)
+    type = 'container'
     elements: Tuple[Image]
+    _fields = (children('elements', Image, star=True),)
 
     def __init__(self, *elements: Image) -> None:
         """
@@ -138,19 +126,9 @@ class Container(_Module):
 
         :param elements: 图片元素，其它元素无效
         """
-        self.type = 'container'
-        if len(elements) > 9:
+        if len(elements) > MAX_IMAGES and not is_trusted():
             raise Exception('图片元素最多为9个')
-        self.elements = elements
-
-    def build(self) -> dict:
-        ret = {'type': self.type, 'elements': []}
-        for i in self.elements:
-            ret['elements'].append(i.build())
-        return ret
-
-    def __repr__(self):
-        return 'Container(' + ', '.join([image.__repr__() for image in self.elements]) + ')'
+        Container._init_fields(self, elements)
 
 
 class ActionGroup(_Module):
@@ -159,7 +137,10 @@ class ActionGroup(_Module):
 
     交互模块中包含交互控件元素，目前支持的交互控件为按钮（button）
     """
+    __slots__ = ('elements',)
+    type = 'action-group'
     elements: Tuple[Button]
+    _fields = (children('elements', Button, star=True),)
 
     def __init__(self, *elements: Button) -> None:
         """
@@ -169,19 +150,9 @@ class ActionGroup(_Module):
 
         :param elements: 按钮元素，其他无效
         """
-        self.type = 'action-group'
-        if len(elements) > 4:
+        if len(elements) > MAX_BUTTONS and not is_trusted():
             raise Exception('按钮元素最多为4个')
-        self.elements = elements
-
-    def build(self) -> dict:
-        ret = {'type': self.type, 'elements': []}
-        for i in self.elements:
-            ret['elements'].append(i.build())
-        return ret
-
-    def __repr__(self):
-        return 'ActionGroup(' + ', '.join([button.__repr__() for button in self.elements]) + ')'
+        ActionGroup._init_fields(self, elements)
 
 
 class Context(_Module):
@@ -190,7 +161,10 @@ class Context(_Module):
 
     展示图文混合的内容。
     """
+    __slots__ = ('elements',)
+    type = 'context'
     elements: Tuple[_BaseAccessory]
+    _fields = (children('elements', _BaseAccessory, star=True),)
 
     def __init__(self, *elements: _BaseAccessory) -> None:
         """
@@ -200,19 +174,9 @@ class Context(_Module):
 
         :param elements: 文本元素以及图片元素
         """
-        self.type = 'context'
-        if len(elements) > 10:
+        if len(elements) > MAX_CONTEXT_ELEMENTS and not is_trusted():
             raise Exception('元素最多为10个')
-        self.elements = elements
-
-    def build(self) -> dict:
-        ret = {'type': self.type, 'elements': []}
-        for i in self.elements:
-            ret['elements'].append(i.build())
-        return ret
-
-    def __repr__(self):
-        return 'Context(' + ', '.join([element.__repr__() for element in self.elements]) + ')'
+        Context._init_fields(self, elements)
 
 
 class Divider(_Module):
@@ -221,6 +185,9 @@ class Divider(_Module):
 
     展示分割线。
     """
+    __slots__ = ()
+    type = 'divider'
+    _fields = ()
 
     def __init__(self) -> None:
         """
@@ -228,13 +195,6 @@ class Divider(_Module):
 
         展示分割线。
         """
-        self.type = 'divider'
-
-    def build(self) -> dict:
-        return {'type': self.type}
-
-    def __repr__(self):
-        return 'Divider()'
 
 
 class Countdown(_Module):
@@ -243,67 +203,77 @@ class Countdown(_Module):
 
     展示倒计时。
     """
+    __slots__ = ('endTime', 'startTime', 'mode')
+    type = 'countdown'
     endTime: int
     startTime: int
     mode: str
+    _fields = (field('mode'), field('endTime'), field('startTime'))
 
-    def __init__(self, endtime: int, mode: str, starttime: int = time.time() * 1000) -> None:
+    def __init__(self, endtime: TimeValue, mode: str, starttime: Optional[TimeValue] = None,
+                 tz: Optional[tzinfo] = None) -> None:
         """
         构建倒计时模块
 
         展示倒计时
 
         :param mode: 倒计时样式, 按天显示，按小时显示或者按秒显示
-        :param endtime: 到期的毫秒时间戳
-        :param starttime: 起始的毫秒时间戳，仅当mode为second才有这个字段，默认为当前时间
-        """
-        self.type = 'countdown'
-        if mode != 'day' and mode != 'hour' and mode != 'second':
-            raise Exception('mode必须为 day|hour|second')
-        self.mode = mode
-        if endtime < starttime:
-            raise Exception('结束时间要大于开始时间')
-        self.endTime = endtime
-        self.startTime = int(starttime)
+        :param endtime: 到期时间，毫秒时间戳、datetime 或时间字符串（2022-05-05 08:00:00 或 ISO 8601）
+        :param starttime: 起始时间，仅当mode为second才有这个字段，默认为当前时间
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
+        """
+        endtime = to_timestamp(endtime, tz)
+        starttime = now() if starttime is None else to_timestamp(starttime, tz)
+        if not is_trusted():
+            if mode != 'day' and mode != 'hour' and mode != 'second':
+                raise Exception('mode必须为 day|hour|second')
+            if endtime < starttime:
+                raise Exception('结束时间要大于开始时间')
+        Countdown._init_fields(self, mode, endtime, starttime)
 
     @classmethod
-    def new_countdown(cls, end_time: str, mode):
+    def new_countdown(cls, end_time: TimeValue, mode, tz: Optional[tzinfo] = None):
         """
         :param mode: 倒计时模式
         :param end_time: 结束时间 ex: 2022-05-05 08:00:00
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
         """
-        time_stamp = time.mktime(time.strptime(end_time, '%Y-%m-%d %H:%M:%S'))
-        return cls(int(time_stamp * 1000), mode)
+        return cls(end_time, mode, tz=tz)
 
     @classmethod
-    def new_day_countdown(cls, end_time: str):
+    def new_day_countdown(cls, end_time: TimeValue, tz: Optional[tzinfo] = None):
         """
         :param end_time: 结束时间 ex: 2022-05-05 08:00:00
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
         """
-        return cls.new_countdown(end_time, 'day')
+        return cls.new_countdown(end_time, 'day', tz)
 
     @classmethod
-    def new_hour_countdown(cls, end_time: str):
+    def new_hour_countdown(cls, end_time: TimeValue, tz: Optional[tzinfo] = None):
         """
         :param end_time: 结束时间 ex: 2022-05-05 08:00:00
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
         """
-        return cls.new_countdown(end_time, 'hour')
+        return cls.new_countdown(end_time, 'hour', tz)
 
     @classmethod
-    def new_second_countdown(cls, end_time: str, start_time: Optional[str] = None):
+    def new_second_countdown(cls, end_time: TimeValue, start_time: Optional[TimeValue] = None,
+                             tz: Optional[tzinfo] = None):
         """
         :param end_time: 结束时间 ex: 2022-05-05 08:00:00
         :param start_time: 开始时间 ex: 2022-05-05 08:00:00 留空则为当前时间
+        :param tz: 没有时区信息的时间所在的时区，默认为本地时区
         """
-        time_stamp = time.mktime(time.strptime(end_time, '%Y-%m-%d %H:%M:%S'))
-        if start_time is None:
-            start_time = time.time()
-        else:
-            start_time = time.mktime(time.strptime(start_time, '%Y-%m-%d %H:%M:%S'))
-        return cls(int(time_stamp * 1000), 'second', starttime=int(start_time * 1000))
+        return cls(end_time, 'second', start_time, tz)
 
-    def build(self) -> dict:
-        return {'type': self.type, 'mode': self.mode, 'endTime': self.endTime, 'startTime': self.startTime}
+    @classmethod
+    def _from_dict(cls, data: dict) -> 'Countdown':
+        # 存档中的倒计时可能已经结束，这里不做构造函数中的时间检查
+        ret = cls.__new__(cls)
+        ret.mode = data['mode']
+        ret.endTime = data['endTime']
+        ret.startTime = data['startTime'] if 'startTime' in data else now()
+        return ret
 
     def __repr__(self):
         if self.mode == 'second':
@@ -318,7 +288,10 @@ class Invite(_Module):
 
     提供服务器邀请/语音频道邀请
     """
+    __slots__ = ('code',)
+    type = 'invite'
     code: str
+    _fields = (field('code'),)
 
     def __init__(self, code: str) -> None:
         """
@@ -328,30 +301,21 @@ class Invite(_Module):
 
         :param code: 邀请链接或者邀请码
         """
-        self.type = 'invite'
-        self.code = code
-
-    def build(self) -> dict:
-        return {'type': self.type, 'code': self.code}
-
-    def __repr__(self):
-        return f'Invite(code=\'{self.code}\')'
+        Invite._init_fields(self, code)
 
 
 class _FileModule(_Module, ABC):
     """
     文件模块基类
     """
+    __slots__ = ('src', 'title')
     src: str
     title: str
     type: str
+    _fields = (field('src'), field('title', ''))
 
-    def __init__(self, src: str, title: str) -> None:
-        self.src = src
-        self.title = title
-
-    def build(self) -> dict:
-        return {'type': self.type, 'src': self.src, 'title': self.title}
+    def __init__(self, src: Union[str, 'AssetSource'], title: str) -> None:
+        _FileModule._init_fields(self, src, title)
 
 
 class File(_FileModule):
@@ -360,17 +324,15 @@ class File(_FileModule):
 
     展示文件
     """
+    __slots__ = ()
+    type = 'file'
 
-    def __init__(self, src: str, title: str) -> None:
+    def __init__(self, src: Union[str, 'AssetSource'], title: str) -> None:
         """
-        :param src: 文件地址
+        :param src: 文件地址，也可以是返回地址的 awaitable 或函数，构造前需要 ``await card.resolve()``
         :param title: 标题
         """
         super().__init__(src, title)
-        self.type = 'file'
-
-    def __repr__(self):
-        return f'File(src=\'{self.src}\', title=\'{self.title}\')'
 
 
 class Video(_FileModule):
@@ -379,21 +341,19 @@ class Video(_FileModule):
 
     展示视频
     """
+    __slots__ = ()
+    type = 'video'
 
-    def __init__(self, src: str, title: str) -> None:
+    def __init__(self, src: Union[str, 'AssetSource'], title: str) -> None:
         """
         构建视频模块
 
         展示视频
 
-        :param src: 视频地址
+        :param src: 视频地址，也可以是返回地址的 awaitable 或函数，构造前需要 ``await card.resolve()``
         :param title: 标题
         """
         super().__init__(src, title)
-        self.type = 'video'
-
-    def __repr__(self):
-        return f'Video(src=\'{self.src}\', title=\'{self.title}\')'
 
 
 class Audio(_FileModule):
@@ -402,26 +362,28 @@ class Audio(_FileModule):
 
     展示音频
     """
+    __slots__ = ('cover',)
+    type = 'audio'
     cover: str
+    _fields = _FileModule._fields + (field('cover', None),)
 
-    def __init__(self, src: str, title: str, cover: Optional[str] = None) -> None:
+    def __init__(self, src: Union[str, 'AssetSource'], title: str,
+                 cover: Union[str, 'AssetSource', None] = None) -> None:
         """
         构建音频模块
 
         展示音频
 
-        :param src: 音频地址
+        :param src: 音频地址，也可以是返回地址的 awaitable 或函数，构造前需要 ``await card.resolve()``
         :param title: 标题
-        :param cover: 封面地址
+        :param cover: 封面地址，同 ``src``
         """
-        super().__init__(src, title)
-        self.type = 'audio'
-        self.cover = cover
+        Audio._init_fields(self, src, title, cover)
 
     def build(self) -> dict:
         ret = super().build()
         ret['cover'] = self.cover if self.cover is not None else ''
         return ret
 
-    def __repr__(self):
-        return f'Audio(src=\'{self.src}\', title=\'{self.title}\', cover=\'{self.cover}\')'
+    def _dump(self) -> str:
+        return super()._dump()[:-1] + ',"cover":' + encode_value(self.cover if self.cover is not None else '') + '}'
@@ -0,0 +1,396 @@
+import json
+import weakref
+from abc import ABC
+from hashlib import blake2b
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type, Union
+
+from .encoder import dumps
+from .fields import Field, generate
+from .serializer import to_json
+
+__all__ = ['_Node', 'SerializedSize']
+
+# type 字段到对应类的映射，子类定义 type 类属性时自动登记
+_registry: Dict[str, Type['_Node']] = {}
+# 冻结的节点把 _parents 设置为该值，不再记录父节点也不允许修改
+_FROZEN = object()
+# 所有节点类，判断子节点时用集合查找代替 ABC 的 isinstance
+_node_types = set()
+
+
+class _ChildList(list):
+    """
+    模块与元素的列表属性（以及 ``Card.modules``），原地修改时让所属对象的缓存失效
+
+    赋值列表时会复制为该类型，之后修改赋值前的列表不会影响所属对象
+    """
+    __slots__ = ('_owner',)
+
+    def __init__(self, iterable=(), owner=None) -> None:
+        super().__init__(iterable)
+        self._owner = None if owner is None else weakref.ref(owner)
+
+    def _changed(self) -> None:
+        owner = self._owner
+        if owner is not None:
+            owner = owner()
+            if owner is not None:
+                owner._children_changed()
+
+    def __reduce_ex__(self, protocol):
+        # 复制与序列化时还原为普通列表，所属对象的 __setstate__ 会重新包装
+        return list, (list(self),)
+
+
+def _mutator(name: str):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        ret = method(self, *args, **kwargs)
+        self._changed()
+        return ret
+
+    wrapper.__name__ = wrapper.__qualname__ = name
+    return wrapper
+
+
+for _name in ('append', 'extend', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse', '__setitem__',
+              '__delitem__', '__iadd__', '__imul__'):
+    setattr(_ChildList, _name, _mutator(_name))
+del _name
+
+
+def _own_list(value, owner):
+    """:return: 属于 owner 的 _ChildList，value 不是列表时原样返回"""
+    if not isinstance(value, list):
+        return value
+    if value.__class__ is _ChildList and value._owner is not None and value._owner() is owner:
+        return value
+    return _ChildList(value, owner)
+
+
+class SerializedSize(NamedTuple):
+    """
+    序列化后的大小
+    """
+    # 紧凑 UTF-8 json 的字节数
+    bytes: int
+    # 紧凑 json 的字符数
+    chars: int
+    # 所有 plain-text 与 kmarkdown 文本内容的字符数之和
+    text_chars: int
+
+
+class _Node(ABC):
+    """
+    模块与元素的公共基类
+
+    序列化结果（紧凑 json 文本）缓存在节点上，父节点直接拼接子节点的缓存；修改公开属性时只会让该节点到根节点路径上的缓存失效。
+    列表类属性会被复制为能感知修改的列表，原地修改（如 ``paragraph.fields.append(...)``）同样会让缓存失效。
+
+    ``build`` 每次都会构造新的字典，调用方修改返回值不会影响缓存。
+    """
+    __slots__ = ('_json', '_size', '_digest', '_parents', '__weakref__')
+    _json: Optional[str]
+    _size: Optional[SerializedSize]
+    _digest: Optional[str]
+    _parents: Union[weakref.ref, List[weakref.ref], object, None]
+    _slot_fields: tuple = ()
+    # 字段声明，见 fields.py；声明了该属性的类在创建时生成 build、__repr__、__eq__ 等方法
+    _fields: Tuple[Field, ...] = ()
+
+    def __new__(cls, *args, **kwargs):
+        self = _new_object(cls)
+        _set_json(self, None)
+        _set_size(self, None)
+        _set_digest(self, None)
+        _set_parents(self, None)
+        return self
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            for name in ((slots,) if isinstance(slots, str) else slots):
+                if name[0] != '_' and name not in fields:
+                    fields.append(name)
+        cls._slot_fields = tuple(fields)
+        # 子类中的私有槽（如 Kmarkdown 的语法树缓存），复制与反序列化时重置为 None
+        cls._cache_slots = tuple(name for klass in cls.__mro__[:-1] for name in klass.__dict__.get('__slots__', ())
+                                 if name[0] == '_' and name[:2] != '__' and klass is not _Node)
+        # 没有使用 __slots__ 的自定义子类的属性保存在 __dict__ 中
+        cls._has_dict = cls.__dictoffset__ != 0
+        _node_types.add(cls)
+        node_type = cls.__dict__.get('type')
+        if isinstance(node_type, str):
+            # 内置类先登记，自定义子类不会覆盖同名的内置类型
+            _registry.setdefault(node_type, cls)
+        if '_fields' in cls.__dict__:
+            generate(cls, _Node, _own_list)
+            return
+        if isinstance(node_type, str):
+            # 修改了 type 的子类重新生成内联了 type 的 build 与 _dump
+            generate(cls, _Node, _own_list)
+        if 'build' in cls.__dict__ and '_dump' not in cls.__dict__:
+            # 重写了 build 的自定义子类使用 build 的结果序列化
+            cls._dump = _Node._dump
+        names = {i.name for i in cls._fields}
+        if cls._has_dict or any(i not in names for i in cls._slot_fields):
+            # 添加了字段声明之外的属性，生成的比较方法会忽略这些属性，改为比较序列化结果
+            if '__eq__' not in cls.__dict__:
+                cls.__eq__ = _Node.__eq__
+            if '__hash__' not in cls.__dict__:
+                cls.__hash__ = _Node.__hash__
+
+    def __setattr__(self, key, value) -> None:
+        parents = self._parents
+        if parents is _FROZEN and key[0] != '_':
+            raise AttributeError(f'{type(self).__name__} 已被共享，不能修改')
+        if key[0] != '_':
+            value = _own_list(value, self)
+        object.__setattr__(self, key, value)
+        if key[0] != '_' and (self._json is not None or parents is not None):
+            self._invalidate()
+
+    def _children_changed(self) -> None:
+        """列表属性被原地修改"""
+        if self._json is not None or self._parents is not None:
+            self._invalidate()
+
+    def __getstate__(self) -> dict:
+        # 不包含缓存与父节点的弱引用，复制后的节点重新序列化，修改时也不会通知原来的父节点
+        state = {}
+        for name in self._slot_fields:
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        if self._has_dict:
+            state.update(self.__dict__)
+        if self._parents is _FROZEN:
+            state['_frozen'] = True
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        _set_json(self, None)
+        _set_size(self, None)
+        _set_digest(self, None)
+        _set_parents(self, None)
+        for name in self._cache_slots:
+            object.__setattr__(self, name, None)
+        frozen = state.pop('_frozen', False)
+        for name, value in state.items():
+            object.__setattr__(self, name, value if frozen else _own_list(value, self))
+        if frozen:
+            _set_parents(self, _FROZEN)
+
+    def __eq__(self, other) -> bool:
+        """类型相同且序列化结果相同时相等"""
+        if self is other:
+            return True
+        if not isinstance(other, _Node):
+            return NotImplemented
+        return type(self) is type(other) and self._encode() == other._encode()
+
+    def __hash__(self) -> int:
+        # 修改属性后哈希值会改变，作为字典的键或放入集合前请先使用 intern 冻结
+        return hash((type(self), self._encode()))
+
+    @property
+    def frozen(self) -> bool:
+        """是否已被 ``intern`` 冻结"""
+        return self._parents is _FROZEN
+
+    def _freeze(self) -> None:
+        """冻结节点，列表类属性转换为元组；子节点需要先冻结"""
+        for name in self._slot_fields:
+            value = getattr(self, name, None)
+            if isinstance(value, list):
+                object.__setattr__(self, name, tuple(value))
+        self._parents = _FROZEN
+
+    def _iter_children(self) -> List['_Node']:
+        """直接子节点（属性中的节点以及列表、元组中的节点）"""
+        values = [getattr(self, name, None) for name in self._slot_fields]
+        if self._has_dict:
+            values.extend(self.__dict__.values())
+        node_types = _node_types
+        children = []
+        for value in values:
+            if value.__class__ in node_types:
+                children.append(value)
+            elif isinstance(value, (list, tuple)):
+                children.extend([i for i in value if i.__class__ in node_types])
+        return children
+
+    def _add_parent(self, parent) -> None:
+        """记录引用了该节点的父节点（弱引用），用于向上传递缓存失效"""
+        parents = self._parents
+        if parents is None:
+            # 绝大多数节点只有一个父节点，此时直接保存弱引用，不额外分配列表
+            self._parents = weakref.ref(parent)
+            return
+        if parents is _FROZEN:
+            # 冻结的节点不会改变，不需要通知父节点，也避免被大量卡片共享时记录过多的父节点
+            return
+        if parents.__class__ is not list:
+            if parents() is parent:
+                return
+            parents = [parents] if parents() is not None else []
+            self._parents = parents
+        else:
+            for ref in parents:
+                if ref() is parent:
+                    return
+            parents[:] = [ref for ref in parents if ref() is not None]
+        parents.append(weakref.ref(parent))
+
+    def _invalidate(self) -> None:
+        """让自身及所有祖先节点的缓存失效"""
+        _set_json(self, None)
+        _set_size(self, None)
+        _set_digest(self, None)
+        parents = self._parents
+        if parents is None or parents is _FROZEN:
+            return
+        if parents.__class__ is not list:
+            parent = parents()
+            if parent is not None:
+                parent._invalidate()
+            return
+        for ref in parents:
+            parent = ref()
+            if parent is not None:
+                parent._invalidate()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> '_Node':
+        """
+        从构造后的字典还原，根据 ``type`` 字段选择对应的类
+
+        :param data: ``build()`` 的结果或官方编辑器导出的 json 对象
+        :return: 还原后的模块或元素
+        """
+        try:
+            target = _registry[data['type']]
+        except KeyError:
+            raise ValueError(f'未知的类型: {data.get("type")!r}') from None
+        if not issubclass(target, cls):
+            raise ValueError(f'类型 {data["type"]!r} 不是 {cls.__name__}')
+        return target._from_dict(data)
+
+    @classmethod
+    def from_json(cls, text: Union[str, bytes]) -> '_Node':
+        """
+        从 json 文本还原
+
+        :param text: json 文本
+        :return: 还原后的模块或元素
+        """
+        return cls.from_dict(json.loads(text))
+
+    @classmethod
+    def _from_dict(cls, data: dict) -> '_Node':
+        """由具体的类实现，``data['type']`` 已经确认属于该类"""
+        raise NotImplementedError(f'{cls.__name__} 不支持从字典还原')
+
+    def build_to_json(self, pretty: Optional[bool] = None, as_bytes: Optional[bool] = None,
+                      backend: Optional[str] = None) -> Union[str, bytes]:
+        """
+        序列化为 json，参数为 None 时使用 ``configure_json`` 的全局设置（默认为带缩进的 str）
+
+        :param pretty: 是否输出带缩进的 json
+        :param as_bytes: 是否返回 UTF-8 编码的 bytes
+        :param backend: auto|orjson|ujson|json
+        :return: json 文本
+        """
+        return to_json(self, pretty, as_bytes, backend)
+
+    def fingerprint(self) -> str:
+        """
+        内容的指纹，内容相同时相同，与对象本身无关；与序列化缓存一同失效
+
+        :return: 32 位十六进制字符串
+        """
+        digest = self._digest
+        if digest is None:
+            digest = self._digest = blake2b(self._encode().encode('utf-8'), digest_size=16).hexdigest()
+        return digest
+
+    def _encode(self) -> str:
+        """
+        :return: 紧凑 json 文本，与 ``json.dumps(self.build(), separators=(',', ':'), ensure_ascii=False)`` 一致
+        """
+        text = self._json
+        if text is None:
+            text = self._dump()
+            _set_json(self, text)
+            # 只有被缓存的父节点才需要接收失效通知，因此在这里而不是赋值时登记
+            ref = None
+            for child in self._iter_children():
+                if child._parents is None:
+                    # 最常见的情况：子节点第一次被引用，直接保存弱引用
+                    if ref is None:
+                        ref = weakref.ref(self)
+                    _set_parents(child, ref)
+                else:
+                    child._add_parent(self)
+        return text
+
+    @property
+    def serialized_size(self) -> SerializedSize:
+        """
+        序列化后的大小，与缓存的序列化结果一同失效，未修改时直接返回缓存的值
+
+        由子节点缓存的大小与自身的字段累加得到，不会重新编码整个片段
+        """
+        size = self._size
+        if size is None:
+            text = self._encode()
+            chars = len(text)
+            text_chars = self._text_chars()
+            # 字节数 = 字符数 + 非 ASCII 字符在 UTF-8 中额外占用的字节数
+            extra = 0
+            for child in self._iter_children():
+                child_size = child.serialized_size
+                text_chars += child_size.text_chars
+                extra += child_size.bytes - child_size.chars
+            if text.isascii():
+                nbytes = chars
+            elif getattr(self._dump, '_generated', False):
+                # 生成的 _dump 原样拼接子节点的片段，其余部分只来自自身的字段
+                nbytes = chars + extra + self._extra_bytes()
+            else:
+                nbytes = len(text.encode('utf-8'))
+            size = self._size = SerializedSize(nbytes, chars, text_chars)
+        return size
+
+    def _extra_bytes(self) -> int:
+        """
+        由 fields.py 根据字段声明生成，只在使用生成的 ``_dump`` 时调用
+
+        :return: 节点自身的 type、键与字段值（不含子节点）中非 ASCII 字符在 UTF-8 中额外占用的字节数
+        """
+        raise NotImplementedError
+
+    def _text_chars(self) -> int:
+        """:return: 节点自身（不含子节点）的文本内容字符数"""
+        return 0
+
+    def _dump(self) -> str:
+        """
+        生成紧凑 json 文本，内置类直接拼接子节点的缓存，自定义子类默认使用 ``build`` 的结果
+
+        :return: 紧凑 json 文本
+        """
+        return dumps(self.build())
+
+
+# _Node 与 ABC 都没有定义 __new__，直接调用 object.__new__ 省去 super() 的查找
+_new_object = object.__new__
+# 槽的描述符，绕过 __setattr__ 直接赋值
+_set_json = _Node._json.__set__
+_set_size = _Node._size.__set__
+_set_digest = _Node._digest.__set__
+_set_parents = _Node._parents.__set__
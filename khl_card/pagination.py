@@ -0,0 +1,314 @@
+import inspect
+from typing import AsyncIterable, AsyncIterator, Any, Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .accessory import Kmarkdown, Paragraph, _BaseText
+from .card import Card, CardMessage
+from .color import Color
+from .limits import MAX_CARDS, MAX_KMARKDOWN_LENGTH, MAX_MODULES
+from .modules import Context, Header, Section, _Module
+from .types import NamedColor, SizeTypes, ThemeTypes
+
+__all__ = ['split_cards', 'paginate_rows']
+
+# 行格式化后的结果：kmarkdown 文本、文本元素、模块，或者 columns 个单元格（文本或文本元素）
+Row = Union[str, _BaseText, _Module, Sequence[Union[str, _BaseText]]]
+# 页眉与页脚：文本、模块、模块列表，或者接收页码（从 1 开始）返回以上内容的函数
+Decoration = Union[None, str, _Module, Sequence[_Module], Callable[[int], Union[None, str, _Module, Sequence[_Module]]]]
+
+
+def _size(obj) -> int:
+    return obj.serialized_size.bytes
+
+
+class _Splitter:
+    """
+    按模块数与字节数把卡片切分为多个卡片消息
+
+    每个模块只序列化一次，页面大小在添加模块时增量累计，整体为线性复杂度。
+    """
+
+    def __init__(self, max_modules: int, max_bytes: Optional[int], max_cards: int, repeat_header: bool,
+                 keep_style: bool) -> None:
+        if max_modules < 1 or max_cards < 1:
+            raise ValueError('max_modules 与 max_cards 至少为 1')
+        self.max_modules = max_modules
+        self.max_bytes = max_bytes
+        self.max_cards = max_cards
+        self.repeat_header = repeat_header
+        self.keep_style = keep_style
+        self.pages: List[List[Card]] = []
+        self.page: List[Card] = []
+        self.page_modules = 0
+        self.page_bytes = 2
+        # 正在填充的卡片
+        self.source: Optional[Card] = None
+        self.style: Optional[dict] = None
+        self.modules: List[_Module] = []
+        self.content = 0
+        self.card_bytes = 0
+        self.headers: List[_Module] = []
+        self.header_sizes: List[int] = []
+
+    def _flush_page(self) -> None:
+        if self.page:
+            self.pages.append(self.page)
+        self.page = []
+        self.page_modules = 0
+        self.page_bytes = 2
+
+    def _close_card(self) -> None:
+        if self.content:
+            self.page.append(Card(*self.modules, **self.style))
+        else:
+            # 卡片中没有正文，撤销已经计入页面的大小
+            self.page_modules -= len(self.modules)
+            self.page_bytes -= self.card_bytes + (1 if self.page else 0)
+        self.modules = []
+        self.content = 0
+
+    def _open_card(self, continuation: bool) -> None:
+        if len(self.page) >= self.max_cards:
+            self._flush_page()
+        source = self.source
+        if not continuation or self.keep_style:
+            self.style = {'theme': source.theme, 'size': source.size, 'color': source.color}
+        else:
+            self.style = {}
+        self.card_bytes = _size(Card(**self.style))
+        self.page_bytes += self.card_bytes + (1 if self.page else 0)
+        self.modules = []
+        self.content = 0
+        if continuation:
+            for module, size in zip(self.headers, self.header_sizes):
+                if not self._fits(size):
+                    raise ValueError('重复的标题模块超过了每页的限制')
+                self._push(module, size)
+
+    def _fits(self, size: int) -> bool:
+        if self.page_modules + 1 > self.max_modules:
+            return False
+        added = size + (1 if self.modules else 0)
+        return self.max_bytes is None or self.page_bytes + added <= self.max_bytes
+
+    def _push(self, module: _Module, size: int) -> None:
+        added = size + (1 if self.modules else 0)
+        self.modules.append(module)
+        self.page_modules += 1
+        self.page_bytes += added
+        self.card_bytes += added
+
+    def _add(self, module: _Module, size: int, continuation: bool) -> None:
+        if not self._fits(size):
+            self._close_card()
+            self._flush_page()
+            self._open_card(continuation)
+            if not self._fits(size):
+                raise ValueError(f'模块 {module!r} 单独成页时仍超过限制')
+        self._push(module, size)
+        self.content += 1
+
+    def split(self, cards: Iterable[Card]) -> List[CardMessage]:
+        for source in cards:
+            self.source = source
+            modules = list(source)
+            # 只重复作为第一个模块的标题，之后的标题属于正文
+            headers = modules[:1] if self.repeat_header and modules and isinstance(modules[0], Header) else []
+            self.headers = headers
+            self.header_sizes = [_size(i) for i in headers]
+            self._open_card(False)
+            for index, module in enumerate(modules):
+                self._add(module, _size(module), index > 0)
+            self._close_card()
+        self._flush_page()
+        return [CardMessage(*page) for page in self.pages]
+
+
+def split_cards(cards: Iterable[Card], max_modules: int = MAX_MODULES, max_bytes: Optional[int] = None,
+                max_cards: int = MAX_CARDS, repeat_header: bool = True, keep_style: bool = True) -> List[CardMessage]:
+    """
+    把卡片切分为多个符合限制的卡片消息
+
+    :param cards: 要切分的卡片
+    :param max_modules: 每个卡片消息最多包含的模块数
+    :param max_bytes: 每个卡片消息序列化后（紧凑 UTF-8 json）的最大字节数，为 None 时不限制
+    :param max_cards: 每个卡片消息最多包含的卡片数
+    :param repeat_header: 为 true 时卡片的第一个模块是标题模块时，该模块会在切分出的每一页重复
+    :param keep_style: 为 true 时切分出的每一页都保留原卡片的主题、大小与颜色
+    :return: 卡片消息列表
+    """
+    return _Splitter(max_modules, max_bytes, max_cards, repeat_header, keep_style).split(cards)
+
+
+def _text(cell: Union[str, _BaseText]) -> _BaseText:
+    if isinstance(cell, _BaseText):
+        return cell
+    if len(cell) > MAX_KMARKDOWN_LENGTH:
+        raise ValueError(f'行的文本最多 {MAX_KMARKDOWN_LENGTH} 个字符，实际为 {len(cell)}')
+    return Kmarkdown(cell)
+
+
+class _RowPager:
+    """
+    把逐行到达的内容排成页，只保存当前页的模块
+
+    页面大小在添加行时增量累计，行数、模块数或字节数将要超出时结束当前页。
+    """
+
+    def __init__(self, per_page: int, columns: int, header: Decoration, footer: Decoration, max_modules: int,
+                 max_bytes: Optional[int], message: bool, style: dict) -> None:
+        if per_page < 1:
+            raise ValueError('per_page 至少为 1')
+        if not (0 <= columns <= 3):
+            raise ValueError(f'columns 只能为 0-3，实际为 {columns}')
+        self.per_page = per_page
+        self.columns = columns
+        self.header = header
+        self.footer = footer
+        self.max_modules = max_modules
+        self.max_bytes = max_bytes
+        self.message = message
+        self.style = style
+        # 没有模块的卡片（以及卡片消息的方括号）的字节数
+        self.empty_bytes = _size(Card(**style)) + (2 if message else 0)
+        self.page = 0
+        self.rows: Optional[List[_Module]] = None
+        self.top: List[_Module] = []
+        self.bottom: List[_Module] = []
+        self.modules = 0
+        self.bytes = 0
+
+    def _decoration(self, spec: Decoration, make: Callable[[str], _Module]) -> List[_Module]:
+        if callable(spec):
+            spec = spec(self.page)
+        if spec is None:
+            return []
+        if isinstance(spec, str):
+            return [make(spec)]
+        if isinstance(spec, _Module):
+            return [spec]
+        return list(spec)
+
+    def _open(self) -> None:
+        self.page += 1
+        self.rows = []
+        self.top = self._decoration(self.header, Header)
+        self.bottom = self._decoration(self.footer, lambda text: Context(Kmarkdown(text)))
+        self.modules = 0
+        self.bytes = self.empty_bytes
+        for module in (*self.top, *self.bottom):
+            self._count(_size(module))
+
+    def _count(self, size: int) -> None:
+        self.bytes += size + (1 if self.modules else 0)
+        self.modules += 1
+
+    def _fits(self, size: int) -> bool:
+        if self.modules + 1 > self.max_modules:
+            return False
+        return self.max_bytes is None or self.bytes + size + (1 if self.modules else 0) <= self.max_bytes
+
+    def _close(self) -> Union[Card, CardMessage]:
+        card = Card(*self.top, *self.rows, *self.bottom, **self.style)
+        self.rows = None
+        return CardMessage(card) if self.message else card
+
+    def _module(self, row: Row) -> _Module:
+        if isinstance(row, _Module):
+            return row
+        if self.columns == 0:
+            if not isinstance(row, (str, _BaseText)):
+                raise TypeError(f'columns 为 0 时每行应为文本或模块，实际为 {type(row).__name__}')
+            return Section(_text(row))
+        if isinstance(row, (str, _BaseText)) or len(row) != self.columns:
+            raise TypeError(f'columns 为 {self.columns} 时每行应为 {self.columns} 个单元格')
+        return Section(Paragraph(self.columns, [_text(i) for i in row]))
+
+    def add(self, row: Row) -> List[Union[Card, CardMessage]]:
+        """
+        :param row: 格式化后的一行
+        :return: 因此结束的页（最多两页）
+        """
+        module = self._module(row)
+        size = _size(module)
+        out = []
+        if self.rows is None:
+            self._open()
+        if not self._fits(size):
+            if self.rows:
+                out.append(self._close())
+                self._open()
+            if not self._fits(size):
+                raise ValueError(f'行 {module!r} 加上页眉页脚后单独成页时仍超过限制')
+        self.rows.append(module)
+        self._count(size)
+        if len(self.rows) >= self.per_page:
+            out.append(self._close())
+        return out
+
+    def finish(self) -> Optional[Union[Card, CardMessage]]:
+        """:return: 最后一页，没有剩余的行时为 None"""
+        if self.rows:
+            return self._close()
+        return None
+
+
+def _paginate(pager: _RowPager, rows: Iterable[Any], row_formatter: Optional[Callable[[Any], Row]]) -> Iterator:
+    for row in rows:
+        yield from pager.add(row if row_formatter is None else row_formatter(row))
+    last = pager.finish()
+    if last is not None:
+        yield last
+
+
+async def _apaginate(pager: _RowPager, rows: AsyncIterable[Any],
+                     row_formatter: Optional[Callable[[Any], Row]]) -> AsyncIterator:
+    async for row in rows:
+        if row_formatter is not None:
+            row = row_formatter(row)
+            if inspect.isawaitable(row):
+                row = await row
+        for page in pager.add(row):
+            yield page
+    last = pager.finish()
+    if last is not None:
+        yield last
+
+
+def paginate_rows(rows: Union[Iterable[Any], AsyncIterable[Any]], row_formatter: Optional[Callable[[Any], Row]] = None,
+                  per_page: int = 10, header: Decoration = None, footer: Decoration = None, columns: int = 0,
+                  max_modules: int = MAX_MODULES, max_bytes: Optional[int] = None, message: bool = True,
+                  theme: Union[str, ThemeTypes] = ThemeTypes.PRIMARY, size: Union[str, SizeTypes] = SizeTypes.LG,
+                  color: Union[Color, NamedColor, str, None] = None) -> Union[Iterator, AsyncIterator]:
+    """
+    逐行读取数据并排成多页卡片，每凑满一页就产出，内存中只保存当前页
+
+    ex::
+
+        for page in paginate_rows(cursor, lambda r: f'{r.rank}. (met){r.user_id}(met) **{r.score}**',
+                                  header='排行榜', footer=lambda page: f'第 {page} 页'):
+            await channel.send(page.build())
+
+        async for page in paginate_rows(fetch_rows(), format_row, columns=3):
+            ...
+
+    :param rows: 数据，可以是生成器、数据库游标等任意可迭代对象；为异步可迭代对象时返回异步生成器，此时格式化函数也可以是 async 函数
+    :param row_formatter: 把一条数据格式化为一行，为 None 时数据本身就是格式化后的行。
+        columns 为 0 时返回 kmarkdown 文本或文本元素（放在 ``Section`` 中）；为 1-3 时返回对应个数的单元格（放在 ``Paragraph`` 中）；
+        也可以直接返回模块
+    :param per_page: 每页最多的行数
+    :param header: 每页开头的模块，字符串为 ``Header``，函数接收页码（从 1 开始）
+    :param footer: 每页末尾的模块，字符串为 kmarkdown 的 ``Context``，函数接收页码
+    :param columns: 0 时每行一个 ``Section``，1-3 时每行为一个对应列数的 ``Paragraph``
+    :param max_modules: 每页最多的模块数（包括页眉与页脚）
+    :param max_bytes: 每页序列化后（紧凑 UTF-8 json）的最大字节数，为 None 时不限制
+    :param message: 为 true 时每页为卡片消息，否则为卡片
+    :param theme: 卡片主题
+    :param size: 卡片大小
+    :param color: 卡片颜色
+    :return: 逐页产出 ``CardMessage``（或 ``Card``）的生成器；没有数据时不产出任何页
+    """
+    style = {'theme': theme, 'size': size, 'color': color}
+    pager = _RowPager(per_page, columns, header, footer, max_modules, max_bytes, message, style)
+    if hasattr(rows, '__aiter__'):
+        return _apaginate(pager, rows, row_formatter)
+    return _paginate(pager, iter(rows), row_formatter)
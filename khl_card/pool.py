@@ -0,0 +1,80 @@
+import weakref
+from typing import Tuple, Type, TypeVar
+
+from .card import Card, CardMessage
+from .node import _Node
+
+__all__ = ['intern', 'pool_size', 'clear_pool']
+
+_T = TypeVar('_T', _Node, Card, CardMessage)
+
+# (类, 序列化结果) -> 共享的节点，没有卡片引用时自动移除
+_pool: 'weakref.WeakValueDictionary[Tuple[Type[_Node], str], _Node]' = weakref.WeakValueDictionary()
+
+
+def _is_node(value) -> bool:
+    # 比 isinstance 快，_Node 是 ABC，isinstance 会经过 __instancecheck__
+    return _Node in type(value).__mro__
+
+
+def _intern_value(value):
+    if isinstance(value, (list, tuple)):
+        return tuple([intern(i) if _is_node(i) else i for i in value])
+    if _is_node(value):
+        return intern(value)
+    return value
+
+
+def intern(obj: _T) -> _T:
+    """
+    共享值相同的模块与元素
+
+    返回池中与 ``obj`` 值相同的节点，没有时冻结 ``obj`` 并放入池中。共享的节点只序列化一次，
+    之后不能再修改，也不会记录引用它的卡片。传入卡片或卡片消息时原地替换其中的模块。
+
+    ex::
+
+        footer = intern(Context(PlainText('由 xxx 生成')))
+        cards = [Card(Section(Kmarkdown(line)), Divider(), footer, intern=True) for line in lines]
+
+    :param obj: 模块、元素、卡片或卡片消息
+    :return: 共享的节点，卡片与卡片消息返回自身
+    """
+    if not _is_node(obj):
+        if isinstance(obj, CardMessage):
+            for card in obj:
+                intern(card)
+            return obj
+        if isinstance(obj, Card):
+            obj.modules = [intern(i) for i in obj.modules]
+            obj._interned = True
+            return obj
+        raise TypeError(f'无法共享 {type(obj).__name__}')
+    if obj.frozen:
+        return obj
+    # 序列化结果与子节点是否共享无关，先查池，命中时不改动调用方的节点
+    key = (type(obj), obj._encode())
+    shared = _pool.get(key)
+    if shared is not None:
+        return shared
+    for name in obj._slot_fields:
+        value = getattr(obj, name, None)
+        shared = _intern_value(value)
+        if shared is not value:
+            # 值相同，序列化缓存仍然有效
+            object.__setattr__(obj, name, shared)
+    obj._freeze()
+    _pool[key] = obj
+    return obj
+
+
+def pool_size() -> int:
+    """
+    :return: 池中共享的节点数
+    """
+    return len(_pool)
+
+
+def clear_pool() -> None:
+    """清空共享池，已经共享的节点仍然保持冻结"""
+    _pool.clear()
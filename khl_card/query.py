@@ -0,0 +1,309 @@
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .node import _Node, _node_types
+
+__all__ = ['CardIndex', 'TypeFilter']
+
+# 类（匹配其实例，包括子类）或 ``type`` 字段的值，如 ``'button'``
+TypeFilter = Union[type, str, None]
+
+# (模块内的先序序号, 节点, 父节点的 _Hit)
+_Hit = Tuple[int, _Node, Optional[tuple]]
+# 模块位置 -> 该模块中按先序排列的节点
+_Postings = Dict[int, List[_Hit]]
+
+_MISSING = object()
+
+
+def _walk(node: _Node, parent: Optional[_Hit], hits: List[_Hit]) -> None:
+    hit = (len(hits), node, parent)
+    hits.append(hit)
+    for child in node._iter_children():
+        # 子节点修改时失效通知沿父节点传到模块，再传到索引
+        child._add_parent(node)
+        _walk(child, hit, hits)
+
+
+def _indexable(value) -> bool:
+    # 节点修改后哈希值会改变，不能作为索引的键
+    if value.__class__ in _node_types:
+        return False
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class _Entry:
+    """一个位置上的模块，登记为模块的父节点，模块或其子节点被修改时标记该位置需要重建"""
+    __slots__ = ('dirty', 'position', 'module', 'hits', 'keys', '__weakref__')
+
+    def __init__(self, dirty: Set[int], position: int, module: _Node) -> None:
+        # 只引用索引的集合而不引用索引本身，避免循环引用；被替换后为 None
+        self.dirty: Optional[Set[int]] = dirty
+        self.position = position
+        self.module = module
+        self.hits: List[_Hit] = []
+        # 属性名 -> 该模块登记过的属性值
+        self.keys: Dict[str, Set[Any]] = {}
+        _walk(module, None, self.hits)
+
+    def _invalidate(self) -> None:
+        if self.dirty is not None:
+            self.dirty.add(self.position)
+
+
+class CardIndex:
+    """
+    卡片中所有模块与元素的索引，按类与属性值查找
+
+    类的索引在创建时建立，属性值的索引在第一次按该属性查找时建立；``Card.append`` 与替换模块时只更新对应的位置，
+    模块或其中的元素被修改时只在下次查找前重建该模块的部分
+    """
+    __slots__ = ('_entries', '_types', '_attrs', '_dirty')
+
+    def __init__(self, modules: Iterable[_Node]) -> None:
+        self._entries: List[_Entry] = []
+        # 类 -> 位置 -> 节点
+        self._types: Dict[type, _Postings] = {}
+        # 属性名 -> 属性值 -> 位置 -> 节点
+        self._attrs: Dict[str, Dict[Any, _Postings]] = {}
+        self._dirty: Set[int] = set()
+        for module in modules:
+            self.append(module)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def append(self, module: _Node) -> None:
+        """
+        :param module: 添加到末尾的模块
+        """
+        self._entries.append(None)
+        self._add(len(self._entries) - 1, module)
+
+    def replace(self, position: int, module: _Node) -> None:
+        """
+        :param position: 非负的位置
+        :param module: 新的模块
+        """
+        self._remove(position)
+        self._add(position, module)
+
+    def _add(self, position: int, module: _Node) -> None:
+        entry = _Entry(self._dirty, position, module)
+        self._entries[position] = entry
+        module._add_parent(entry)
+        for hit in entry.hits:
+            self._types.setdefault(hit[1].__class__, {}).setdefault(position, []).append(hit)
+        for name, values in self._attrs.items():
+            self._add_attr(entry, name, values)
+
+    def _add_attr(self, entry: _Entry, name: str, values: Dict[Any, _Postings]) -> None:
+        keys = entry.keys[name] = set()
+        for hit in entry.hits:
+            value = getattr(hit[1], name, _MISSING)
+            if value is _MISSING or not _indexable(value):
+                continue
+            keys.add(value)
+            values.setdefault(value, {}).setdefault(entry.position, []).append(hit)
+
+    def _remove(self, position: int) -> None:
+        entry = self._entries[position]
+        entry.dirty = None
+        self._dirty.discard(position)
+        for cls in {hit[1].__class__ for hit in entry.hits}:
+            postings = self._types[cls]
+            del postings[position]
+            if not postings:
+                del self._types[cls]
+        for name, keys in entry.keys.items():
+            values = self._attrs[name]
+            for value in keys:
+                postings = values[value]
+                del postings[position]
+                if not postings:
+                    del values[value]
+
+    def _refresh(self) -> None:
+        if self._dirty:
+            for position in sorted(self._dirty):
+                self.replace(position, self._entries[position].module)
+
+    def _attr(self, name: str) -> Dict[Any, _Postings]:
+        values = self._attrs.get(name)
+        if values is None:
+            values = self._attrs[name] = {}
+            for entry in self._entries:
+                self._add_attr(entry, name, values)
+        return values
+
+    def _candidates(self, kind: TypeFilter, attrs: Dict[str, Any]) -> List[_Postings]:
+        """:return: 包含所有结果的候选集合中较小的一个（可能由多个类的集合组成）"""
+        best = None
+        best_size = None
+        for name, expected in attrs.items():
+            if callable(expected) or not _indexable(expected):
+                continue
+            postings = self._attr(name).get(expected)
+            if postings is None:
+                return []
+            # 以包含结果的模块数估计大小
+            size = len(postings)
+            if best is None or size < best_size:
+                best, best_size = [postings], size
+        if kind is not None and (best is None or best_size > 1):
+            groups = [postings for cls, postings in self._types.items() if _is_type(cls, kind)]
+            size = sum(len(postings) for postings in groups)
+            if best is None or size < best_size:
+                best = groups
+        if best is None:
+            best = list(self._types.values())
+        return best
+
+    def hits(self, kind: TypeFilter = None, attrs: Optional[Dict[str, Any]] = None) -> List[_Hit]:
+        """
+        :param kind: 类型
+        :param attrs: 属性名 -> 属性值或判断函数
+        :return: 按在卡片中出现的顺序排列的结果
+        """
+        self._refresh()
+        attrs = attrs or {}
+        groups = self._candidates(kind, attrs)
+        if len(groups) == 1:
+            merged = groups[0]
+        else:
+            merged = {}
+            for postings in groups:
+                for position, hits in postings.items():
+                    merged.setdefault(position, []).extend(hits)
+        out = []
+        for position in sorted(merged):
+            hits = merged[position]
+            if len(groups) > 1:
+                hits.sort()
+            out.extend([hit for hit in hits if _match(hit[1], kind, attrs)])
+        return out
+
+    def find_all(self, kind: TypeFilter = None, **attrs) -> List[_Node]:
+        """
+        :param kind: 类型
+        :param attrs: 属性名 -> 属性值或判断函数
+        :return: 按在卡片中出现的顺序排列的结果
+        """
+        return [hit[1] for hit in self.hits(kind, attrs)]
+
+    def select(self, selector: str) -> List[_Node]:
+        """
+        :param selector: 选择器，见 ``Card.select``
+        :return: 按在卡片中出现的顺序排列的结果
+        """
+        steps = _parse(selector)
+        kind, attrs = steps[-1][1]
+        return [hit[1] for hit in self.hits(kind, attrs) if _ancestors(hit, steps, len(steps) - 1)]
+
+
+def _is_type(cls: type, kind: TypeFilter) -> bool:
+    if kind.__class__ is str:
+        return getattr(cls, 'type', None) == kind
+    return issubclass(cls, kind)
+
+
+def _match(node: _Node, kind: TypeFilter, attrs: Dict[str, Any]) -> bool:
+    if kind is not None and not _is_type(node.__class__, kind):
+        return False
+    for name, expected in attrs.items():
+        value = getattr(node, name, _MISSING)
+        if value is _MISSING:
+            return False
+        if callable(expected):
+            if not expected(value):
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+# 选择器中的 [name] [name=value] [name^=value] [name$=value] [name*=value]
+_ATTR = re.compile(r'\[\s*([A-Za-z_]\w*)\s*(?:([\^$*]?=)\s*("(?:[^"\\]|\\.)*"|\'[^\']*\'|[^\]\s]+)\s*)?\]')
+_TYPE = re.compile(r'\*|[A-Za-z][\w-]*')
+_COMBINATOR = re.compile(r'\s*>\s*|\s+')
+
+
+def _value(text: str) -> Any:
+    if text[0] == "'":
+        return text[1:-1]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _condition(operator: Optional[str], value: Any) -> Any:
+    if operator is None:
+        return lambda v: v is not None
+    if operator == '=':
+        return value
+    value = str(value)
+    if operator == '^=':
+        return lambda v: isinstance(v, str) and v.startswith(value)
+    if operator == '$=':
+        return lambda v: isinstance(v, str) and v.endswith(value)
+    return lambda v: isinstance(v, str) and value in v
+
+
+@lru_cache(maxsize=256)
+def _parse(selector: str) -> Tuple[Tuple[Optional[str], Tuple[TypeFilter, Dict[str, Any]]], ...]:
+    """:return: ((与左侧的组合符, (类型, 属性条件)), ...)，第一项的组合符为 None"""
+    steps = []
+    combinator = None
+    text = selector.strip()
+    pos = 0
+    while True:
+        start = pos
+        kind = None
+        match = _TYPE.match(text, pos)
+        if match is not None:
+            pos = match.end()
+            if match.group() != '*':
+                kind = match.group()
+        attrs = {}
+        match = _ATTR.match(text, pos)
+        while match is not None:
+            name, operator, raw = match.groups()
+            if name in attrs:
+                raise ValueError(f'选择器 {selector!r} 中的属性 {name} 重复')
+            attrs[name] = _condition(operator, None if raw is None else _value(raw))
+            pos = match.end()
+            match = _ATTR.match(text, pos)
+        if pos == start:
+            raise ValueError(f'无法解析选择器 {selector!r}（位置 {pos}）')
+        steps.append((combinator, (kind, attrs)))
+        if pos == len(text):
+            return tuple(steps)
+        match = _COMBINATOR.match(text, pos)
+        if match is None or match.end() == len(text):
+            raise ValueError(f'无法解析选择器 {selector!r}（位置 {pos}）')
+        combinator = '>' if '>' in match.group() else ' '
+        pos = match.end()
+
+
+def _ancestors(hit: _Hit, steps, i: int) -> bool:
+    """:return: 与第 i 步匹配的节点的祖先是否满足前面的步骤"""
+    if i == 0:
+        return True
+    combinator = steps[i][0]
+    kind, attrs = steps[i - 1][1]
+    parent = hit[2]
+    while parent is not None:
+        if _match(parent[1], kind, attrs) and _ancestors(parent, steps, i - 1):
+            return True
+        if combinator == '>':
+            return False
+        parent = parent[2]
+    return False
+
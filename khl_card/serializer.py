@@ -0,0 +1,160 @@
+import json
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+from .cache import serialization_cache
+from .encoder import dumps
+
+__all__ = ['to_json', 'configure_json', 'get_json_backend', 'available_json_backends']
+
+# 自动选择时的优先顺序
+_PREFERENCE = ('orjson', 'ujson', 'json')
+
+
+class _Backend(NamedTuple):
+    name: str
+    compact: Callable[[Any], Union[str, bytes]]
+    pretty: Callable[[Any], Union[str, bytes]]
+
+
+# 带缩进的格式与标准库 ``json.dumps(..., indent=4, ensure_ascii=False)`` 相同
+_json_pretty = partial(json.dumps, indent=4, ensure_ascii=False)
+
+
+def _double_indent(value: bytes) -> bytes:
+    """把两个空格的缩进改为四个，字符串中的换行都会转义，每行开头的空格只可能是缩进"""
+    return b'\n'.join([line[:len(line) - len(line.lstrip(b' '))] + line for line in value.split(b'\n')])
+
+
+def _orjson_pretty(orjson) -> Callable[[Any], Union[str, bytes]]:
+    option = orjson.OPT_INDENT_2
+
+    def pretty(data: Any) -> Union[str, bytes]:
+        try:
+            value = orjson.dumps(data, option=option)
+        except orjson.JSONEncodeError:
+            # 超过 64 位的整数、非字符串的键等由标准库处理
+            return _json_pretty(data)
+        # orjson 只支持两个空格的缩进
+        return _double_indent(value)
+    return pretty
+
+
+def _load(name: str) -> Optional[_Backend]:
+    """:return: 对应的后端，没有安装时为 None"""
+    if name == 'json':
+        return _Backend('json', dumps, _json_pretty)
+    if name == 'orjson':
+        try:
+            import orjson
+        except ImportError:
+            return None
+        return _Backend('orjson', orjson.dumps, _orjson_pretty(orjson))
+    if name == 'ujson':
+        try:
+            import ujson
+        except ImportError:
+            return None
+        # ujson 带缩进时的格式与标准库不同，使用标准库
+        return _Backend('ujson', partial(ujson.dumps, ensure_ascii=False, escape_forward_slashes=False),
+                        _json_pretty)
+    raise ValueError(f'未知的 json 后端: {name!r}，只能为 {"|".join(_PREFERENCE)}|auto')
+
+
+_backends: Dict[str, Optional[_Backend]] = {}
+# 全局设置，backend 为 auto 时按 orjson、ujson、json 的顺序选择已安装的后端
+_settings = {'backend': 'auto', 'pretty': True, 'as_bytes': False}
+
+
+def _get(name: Optional[str]) -> _Backend:
+    if name is None:
+        name = _settings['backend']
+    if name == 'auto':
+        for i in _PREFERENCE:
+            backend = _get_installed(i)
+            if backend is not None:
+                return backend
+    backend = _get_installed(name)
+    if backend is None:
+        raise ValueError(f'json 后端 {name} 没有安装')
+    return backend
+
+
+def _get_installed(name: str) -> Optional[_Backend]:
+    try:
+        return _backends[name]
+    except KeyError:
+        backend = _backends[name] = _load(name)
+        return backend
+
+
+def available_json_backends() -> List[str]:
+    """
+    :return: 已安装的 json 后端
+    """
+    return [i for i in _PREFERENCE if _get_installed(i) is not None]
+
+
+def get_json_backend() -> str:
+    """
+    :return: 当前全局设置实际使用的 json 后端
+    """
+    return _get(None).name
+
+
+def configure_json(backend: Optional[str] = None, pretty: Optional[bool] = None,
+                   as_bytes: Optional[bool] = None) -> None:
+    """
+    修改 ``build_to_json`` 的全局默认设置，参数为 None 时不修改
+
+    :param backend: auto|orjson|ujson|json，auto 时按顺序选择已安装的后端
+    :param pretty: 是否输出带缩进的 json，默认为 true
+    :param as_bytes: 是否返回 UTF-8 编码的 bytes，默认为 false
+    """
+    if backend is not None:
+        if backend != 'auto' and _get_installed(backend) is None:
+            raise ValueError(f'json 后端 {backend} 没有安装')
+        _settings['backend'] = backend
+    if pretty is not None:
+        _settings['pretty'] = pretty
+    if as_bytes is not None:
+        _settings['as_bytes'] = as_bytes
+
+
+def to_json(obj: Any, pretty: Optional[bool] = None, as_bytes: Optional[bool] = None,
+            backend: Optional[str] = None) -> Union[str, bytes]:
+    """
+    序列化为 json
+
+    卡片消息、卡片、模块与元素的紧凑格式直接使用缓存的序列化结果，与后端无关；
+    带缩进的格式使用后端生成，并以内容指纹缓存在 ``serialization_cache`` 中。
+    带缩进的格式与标准库 ``json.dumps(..., indent=4, ensure_ascii=False)`` 相同，与后端无关
+    （orjson 以科学计数法输出的浮点数除外，卡片中一般不会出现）。
+
+    :param obj: 卡片消息、卡片、模块、元素或可以序列化的 python 对象
+    :param pretty: 是否输出带缩进的 json，为 None 时使用全局设置
+    :param as_bytes: 是否返回 UTF-8 编码的 bytes，为 None 时使用全局设置
+    :param backend: auto|orjson|ujson|json，为 None 时使用全局设置
+    :return: json 文本
+    """
+    if pretty is None:
+        pretty = _settings['pretty']
+    if as_bytes is None:
+        as_bytes = _settings['as_bytes']
+    if not pretty and hasattr(obj, '_encode'):
+        text = obj._encode()
+        return text.encode('utf-8') if as_bytes else text
+    selected = _get(backend)
+    key = None
+    if pretty and hasattr(obj, 'fingerprint'):
+        key = f'{obj.fingerprint()}:{selected.name}:pretty'
+        value = serialization_cache.get(key)
+        if value is not None:
+            return value if as_bytes else value.decode('utf-8')
+    data = obj.build() if hasattr(obj, 'build') else obj
+    value = selected.pretty(data) if pretty else selected.compact(data)
+    if value.__class__ is str:
+        value = value.encode('utf-8')
+    if key is not None:
+        serialization_cache.put(key, value)
+    return value if as_bytes else value.decode('utf-8')
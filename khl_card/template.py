@@ -0,0 +1,189 @@
+import json
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Tuple, Union
+
+from .card import Card, CardMessage
+from .modules import _Module
+
+__all__ = ['CardTemplate', 'Repeat']
+
+_PLACEHOLDER = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+_encode_str = json.encoder.encode_basestring
+
+# (开头的文本, ((参数名, 参数后的文本), ...))
+_Parts = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _escape(value: Any) -> str:
+    """把参数值转义为 json 字符串的内容（不含引号）"""
+    return _encode_str(value if value.__class__ is str else str(value))[1:-1]
+
+
+def _compile(text: str) -> _Parts:
+    pieces = _PLACEHOLDER.split(text)
+    return pieces[0], tuple(zip(pieces[1::2], pieces[2::2]))
+
+
+def _render(parts: _Parts, values: Mapping[str, Any], item: Mapping[str, Any] = None) -> str:
+    head, rest = parts
+    if not rest:
+        return head
+    out = [head]
+    for name, literal in rest:
+        if item is not None and name in item:
+            value = item[name]
+        else:
+            try:
+                value = values[name]
+            except KeyError:
+                raise KeyError(f'缺少模板参数 {name}') from None
+        out.append(_escape(value))
+        out.append(literal)
+    return ''.join(out)
+
+
+class Repeat:
+    """
+    模板中的重复模块
+
+    渲染时按参数中的列表展开为 N 组模块，只能放在 ``CardTemplate`` 的卡片中；
+    不是模块，不能序列化或通过 ``from_dict`` 还原，比较时只与自身相等
+    """
+    __slots__ = ('name', 'modules')
+    name: str
+    modules: Tuple[_Module, ...]
+
+    def __init__(self, name: str, *modules: _Module) -> None:
+        """
+        :param name: 参数名，渲染时传入由字典组成的列表，每个字典渲染一组 ``modules``
+        :param modules: 每一项要渲染的模块，其中的 ``${xxx}`` 优先从该项的字典中取值
+        """
+        for i in modules:
+            if isinstance(i, Repeat):
+                raise Exception('Repeat 不能嵌套')
+            if not isinstance(i, _Module):
+                raise TypeError(f'Repeat 中只能包含模块，实际为 {type(i).__name__}')
+        self.name = name
+        self.modules = modules
+
+    def build(self) -> dict:
+        raise Exception('Repeat 只能在 CardTemplate 中使用')
+
+    def __repr__(self):
+        return f'Repeat(\'{self.name}\', ' + ', '.join([module.__repr__() for module in self.modules]) + ')'
+
+
+class CardTemplate:
+    """
+    预编译的卡片模板
+
+    文本与属性中可以使用 ``${name}`` 作为占位符，模板只在创建时序列化一次，
+    渲染时把转义后的参数拼接到序列化结果中，不会创建任何模块对象或字典。
+
+    ex::
+
+        template = CardTemplate(Card(
+            Section(Kmarkdown('**${title}**')),
+            Repeat('rows', Section(Kmarkdown('${rank}. ${name}'), accessory=Image('${avatar}'))),
+        ))
+        template.render(title='排行榜', rows=[{'rank': 1, 'name': 'foo', 'avatar': 'https://...'}])
+    """
+    __slots__ = ('_cards', '_message')
+    # 每张卡片为 (卡片开头, 模块段列表, 卡片结尾)，模块段为静态模块 _Parts 或 (参数名, [_Parts, ...])
+    _cards: List[Tuple[_Parts, list, _Parts]]
+    _message: bool
+
+    def __init__(self, source: Union[Card, CardMessage]) -> None:
+        """
+        :param source: 包含占位符的卡片或卡片消息
+        """
+        if isinstance(source, Card):
+            self._message = False
+            cards = [source]
+        elif isinstance(source, CardMessage):
+            self._message = True
+            cards = list(source)
+        else:
+            raise TypeError('模板只能由 Card 或 CardMessage 创建')
+        self._cards = [self._compile_card(card) for card in cards]
+
+    @staticmethod
+    def _compile_card(card: Card) -> Tuple[_Parts, list, _Parts]:
+        empty = Card(theme=card.theme, size=card.size, color=card.color)._encode()
+        split = empty.index('"modules":[') + len('"modules":[')
+        segments = []
+        static = []
+        for module in card.modules:
+            if isinstance(module, Repeat):
+                if static:
+                    segments.append(_compile(','.join(static)))
+                    static = []
+                segments.append((module.name, [_compile(i._encode()) for i in module.modules]))
+            else:
+                static.append(module._encode())
+        if static:
+            segments.append(_compile(','.join(static)))
+        return _compile(empty[:split]), segments, _compile(empty[split:])
+
+    @property
+    def names(self) -> List[str]:
+        """模板中用到的所有参数名"""
+        ret = []
+
+        def add(parts: _Parts):
+            for name, _ in parts[1]:
+                if name not in ret:
+                    ret.append(name)
+
+        for head, segments, tail in self._cards:
+            add(head)
+            for segment in segments:
+                if isinstance(segment[1], list):
+                    if segment[0] not in ret:
+                        ret.append(segment[0])
+                    for i in segment[1]:
+                        add(i)
+                else:
+                    add(segment)
+            add(tail)
+        return ret
+
+    def _render_card(self, card: Tuple[_Parts, list, _Parts], values: Dict[str, Any]) -> str:
+        head, segments, tail = card
+        modules = []
+        for segment in segments:
+            if isinstance(segment[1], list):
+                name, parts = segment
+                try:
+                    items: Iterable[Mapping[str, Any]] = values[name]
+                except KeyError:
+                    raise KeyError(f'缺少模板参数 {name}') from None
+                for item in items:
+                    for i in parts:
+                        modules.append(_render(i, values, item))
+            else:
+                modules.append(_render(segment, values))
+        return _render(head, values) + ','.join(modules) + _render(tail, values)
+
+    def render(self, **values: Any) -> str:
+        """
+        渲染模板
+
+        :param values: 占位符对应的值，``Repeat`` 对应由字典组成的可迭代对象
+        :return: 紧凑 json 文本
+        """
+        if not self._message:
+            return self._render_card(self._cards[0], values)
+        return '[' + ','.join([self._render_card(card, values) for card in self._cards]) + ']'
+
+    def render_bytes(self, **values: Any) -> bytes:
+        """
+        渲染模板
+
+        :param values: 占位符对应的值
+        :return: UTF-8 编码的紧凑 json
+        """
+        return self.render(**values).encode('utf-8')
+
+    def __repr__(self):
+        return f'CardTemplate(names={self.names})'
@@ -0,0 +1,64 @@
+import time
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Optional, Union
+
+__all__ = ['TimeValue', 'to_timestamp', 'now']
+
+# 毫秒时间戳、datetime 或时间字符串（2022-05-05 08:00:00 或 ISO 8601）
+TimeValue = Union[int, float, str, datetime]
+
+
+def now() -> int:
+    """
+    :return: 当前的毫秒时间戳
+    """
+    return int(time.time() * 1000)
+
+
+def _from_datetime(value: datetime, tz: Optional[tzinfo]) -> int:
+    if value.tzinfo is None and tz is not None:
+        value = value.replace(tzinfo=tz)
+    # 没有时区信息时按本地时间计算
+    return int(value.timestamp() * 1000)
+
+
+@lru_cache(maxsize=1024)
+def _parse(text: str, tz: Optional[tzinfo]) -> int:
+    if len(text) == 19 and text[4] == '-' and text[7] == '-' and text[10] == ' ' and text[13] == ':' and \
+            text[16] == ':':
+        # 固定格式 %Y-%m-%d %H:%M:%S，直接按位置取值，不经过 strptime
+        try:
+            value = datetime(int(text[0:4]), int(text[5:7]), int(text[8:10]), int(text[11:13]), int(text[14:16]),
+                             int(text[17:19]))
+        except ValueError:
+            raise ValueError(f'无法解析的时间: {text!r}') from None
+        return _from_datetime(value, tz)
+    if text.endswith(('Z', 'z')):
+        text = text[:-1] + '+00:00'
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f'无法解析的时间: {text!r}') from None
+    return _from_datetime(value, tz)
+
+
+def to_timestamp(value: TimeValue, tz: Optional[tzinfo] = None) -> int:
+    """
+    转换为毫秒时间戳
+
+    相同的字符串与时区只会解析一次
+
+    :param value: 毫秒时间戳、datetime 或时间字符串（2022-05-05 08:00:00 或 ISO 8601）
+    :param tz: 没有时区信息的时间所在的时区，为 None 时使用本地时区
+    :return: 毫秒时间戳
+    """
+    if isinstance(value, bool):
+        raise TypeError('时间不能为 bool')
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return _from_datetime(value, tz)
+    if isinstance(value, str):
+        return _parse(value, tz)
+    raise TypeError(f'无法转换为时间戳: {type(value).__name__}')
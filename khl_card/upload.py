@@ -0,0 +1,342 @@
+import asyncio
+import hashlib
+import json
+import mimetypes
+import mmap
+import os
+import threading
+import time
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple, Union
+
+__all__ = ['AssetUploader', 'ThreadPoolUploader', 'HttpUploader', 'AssetCache', 'AssetStore', 'LocalAsset',
+           'LocalSource', 'is_local', 'MMAP_THRESHOLD']
+
+# 本地文件路径或文件内容
+LocalSource = Union[str, bytes, bytearray, memoryview, 'os.PathLike']
+
+# 大于该字节数的文件通过 mmap 读取，哈希与上传时不复制整个文件
+MMAP_THRESHOLD = 1024 * 1024
+
+# kook 的媒体上传接口
+KOOK_ASSET_ENDPOINT = 'https://www.kookapp.cn/api/v3/asset/create'
+
+
+class LocalAsset:
+    """
+    需要上传的本地文件或内容，可以直接作为 ``Image`` ``File`` ``Video`` ``Audio`` 的地址
+
+    ``pathlib.Path`` 与 bytes 会被自动识别，字符串路径或需要指定文件名时使用该类
+    """
+    __slots__ = ('source', 'filename')
+
+    def __init__(self, source: LocalSource, filename: Optional[str] = None) -> None:
+        """
+        :param source: 文件路径（字符串或 ``os.PathLike``）或文件内容
+        :param filename: 上传时的文件名，为 None 时使用路径中的文件名，内容使用其哈希值
+        """
+        self.source = source
+        self.filename = filename
+
+    def __repr__(self):
+        if isinstance(self.source, (bytes, bytearray, memoryview)):
+            return f'LocalAsset(<{len(self.source)} bytes>, filename={self.filename!r})'
+        return f'LocalAsset({os.fspath(self.source)!r}, filename={self.filename!r})'
+
+
+def is_local(value) -> bool:
+    """
+    :param value: 属性值
+    :return: 是否为需要上传的本地文件或内容
+    """
+    return isinstance(value, (LocalAsset, bytes, bytearray, memoryview, os.PathLike))
+
+
+class AssetUploader(ABC):
+    """
+    上传器，把文件内容上传到媒体服务器并返回地址
+    """
+
+    @abstractmethod
+    async def upload(self, data: Union[bytes, memoryview], filename: str) -> str:
+        """
+        :param data: 文件内容，大文件为 mmap 的 memoryview，只在本次调用期间有效
+        :param filename: 文件名
+        :return: 地址
+        """
+        ...
+
+    def close(self) -> None:
+        """释放资源"""
+
+
+class ThreadPoolUploader(AssetUploader):
+    """
+    在线程池中调用阻塞的上传函数
+    """
+
+    def __init__(self, func: Callable[[Union[bytes, memoryview], str], str], max_workers: int = 4) -> None:
+        """
+        :param func: func(文件内容, 文件名) -> 地址
+        :param max_workers: 线程数，同时也是同时上传的数量上限
+        """
+        self._func = func
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='khl-card-upload')
+
+    async def upload(self, data: Union[bytes, memoryview], filename: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._func, data, filename)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class HttpUploader(ThreadPoolUploader):
+    """
+    使用 multipart/form-data 上传到 kook 的媒体接口（或兼容的接口），只依赖标准库
+    """
+
+    def __init__(self, token: str, endpoint: str = KOOK_ASSET_ENDPOINT, max_workers: int = 4,
+                 timeout: float = 30) -> None:
+        """
+        :param token: 机器人 token
+        :param endpoint: 上传接口地址
+        :param max_workers: 同时上传的数量
+        :param timeout: 单次上传的超时（秒）
+        """
+        super().__init__(self._post, max_workers)
+        self.token = token
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def _post(self, data: Union[bytes, memoryview], filename: str) -> str:
+        boundary = uuid.uuid4().hex
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        quoted = filename.replace('\\', '\\\\').replace('"', '\\"')
+        head = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{quoted}"\r\n'
+                f'Content-Type: {content_type}\r\n\r\n').encode('utf-8')
+        tail = f'\r\n--{boundary}--\r\n'.encode('ascii')
+        # 以片段发送，大文件不需要拼接成一个新的 bytes
+        request = urllib.request.Request(self.endpoint, data=(head, data, tail), method='POST', headers={
+            'Authorization': f'Bot {self.token}',
+            'Content-Type': f'multipart/form-data; boundary={boundary}',
+            'Content-Length': str(len(head) + len(data) + len(tail)),
+        })
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = json.loads(response.read().decode('utf-8'))
+        if body.get('code') != 0:
+            raise Exception(f'上传 {filename} 失败: {body.get("message")}')
+        return body['data']['url']
+
+
+class AssetCache:
+    """
+    以 sha256 为键的地址缓存，可以保存为 json 索引文件，超过有效期的条目自动淘汰，可以在多个线程中使用
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = 30 * 24 * 3600) -> None:
+        """
+        :param path: 索引文件路径，为 None 时只保存在内存中；文件存在时立即读取
+        :param ttl: 有效期（秒），为 None 时永不过期
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # sha256 -> (地址, 上传时间)
+        self._data: Dict[str, Tuple[str, float]] = {}
+        # 是否有尚未保存的修改
+        self._dirty = False
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self._data = {k: (v[0], v[1]) for k, v in json.load(f).items()}
+            self.evict()
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, digest: str) -> Optional[str]:
+        """
+        :param digest: 文件内容的 sha256
+        :return: 地址，没有或已过期时为 None
+        """
+        with self._lock:
+            item = self._data.get(digest)
+            if item is None:
+                return None
+            if self._expired(item[1], time.time()):
+                del self._data[digest]
+                self._dirty = True
+                return None
+            return item[0]
+
+    def put(self, digest: str, url: str, save: bool = True) -> None:
+        """
+        记录地址
+
+        :param digest: 文件内容的 sha256
+        :param url: 地址
+        :param save: 有索引文件时是否立即保存，为 false 时在之后的 ``flush`` 中一起保存
+        """
+        with self._lock:
+            self._data[digest] = (url, time.time())
+            if save:
+                self._save()
+            else:
+                self._dirty = True
+
+    def flush(self) -> None:
+        """保存尚未保存的修改"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def evict(self) -> int:
+        """
+        淘汰过期的条目
+
+        :return: 淘汰的条目数
+        """
+        with self._lock:
+            now = time.time()
+            expired = [k for k, v in self._data.items() if self._expired(v[1], now)]
+            for i in expired:
+                del self._data[i]
+            if expired:
+                self._save()
+            return len(expired)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._save()
+
+    def _save(self) -> None:
+        self._dirty = False
+        if self.path is None:
+            return
+        # 先写临时文件再替换，进程中断时不会留下损坏的索引
+        temp = f'{self.path}.{os.getpid()}.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump({k: list(v) for k, v in self._data.items()}, f)
+        os.replace(temp, self.path)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, digest: str) -> bool:
+        return self.get(digest) is not None
+
+    def __repr__(self):
+        return f'AssetCache(path={self.path!r}, ttl={self.ttl}, entries={len(self._data)})'
+
+
+class _Content:
+    """文件内容，大文件使用 mmap"""
+
+    def __init__(self, source: LocalSource) -> None:
+        self._file = None
+        self._map = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.data = source
+            return
+        self._file = open(source, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.data = memoryview(self._map)
+            else:
+                self.data = self._file.read()
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._map is not None:
+            self.data.release()
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class AssetStore:
+    """
+    内容寻址的上传：计算文件的 sha256，相同内容只上传一次，之后直接使用缓存的地址
+
+    ex::
+
+        store = AssetStore(HttpUploader(token), AssetCache('assets.json'))
+        card = Card(Section(Kmarkdown('第一名'), accessory=Image(Path('badges/gold.png'))))
+        await card.resolve(store=store)
+    """
+
+    def __init__(self, uploader: AssetUploader, cache: Optional[AssetCache] = None) -> None:
+        """
+        :param uploader: 上传器
+        :param cache: 地址缓存，为 None 时使用只保存在内存中的缓存
+        """
+        self.uploader = uploader
+        self.cache = cache if cache is not None else AssetCache(ttl=None)
+        # sha256 -> 正在上传的任务，同时请求相同内容时只上传一次
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.uploads = 0
+
+    async def url_for(self, source: Union[LocalAsset, LocalSource], flush: bool = True) -> str:
+        """
+        :param source: 本地文件或内容
+        :param flush: 上传后是否立即保存缓存的索引文件，为 false 时需要之后调用 ``flush``
+        :return: 地址
+        """
+        filename = None
+        if isinstance(source, LocalAsset):
+            filename = source.filename
+            source = source.source
+        loop = asyncio.get_running_loop()
+        # 打开与哈希大文件会阻塞，放到默认线程池中执行
+        content = await loop.run_in_executor(None, _Content, source)
+        try:
+            digest = await loop.run_in_executor(None, _sha256, content.data)
+            url = self.cache.get(digest)
+            if url is not None:
+                return url
+            future = self._pending.get(digest)
+            if future is not None:
+                return await asyncio.shield(future)
+            future = self._pending[digest] = loop.create_future()
+            try:
+                if filename is None:
+                    filename = os.path.basename(os.fspath(source)) if content._file is not None else digest[:32]
+                url = await self.uploader.upload(content.data, filename)
+                self.uploads += 1
+                self.cache.put(digest, url, flush)
+                future.set_result(url)
+                return url
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                # 没有其他等待者时避免 "exception was never retrieved" 警告
+                future.exception()
+                raise
+            finally:
+                del self._pending[digest]
+        finally:
+            content.close()
+
+    def flush(self) -> None:
+        """保存缓存中尚未保存的地址"""
+        self.cache.flush()
+
+    def close(self) -> None:
+        """保存缓存并关闭上传器"""
+        self.cache.flush()
+        self.uploader.close()
+
+
+def _sha256(data: Union[bytes, memoryview]) -> str:
+    return hashlib.sha256(data).hexdigest()
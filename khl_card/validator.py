@@ -0,0 +1,219 @@
+import re
+from typing import List, NamedTuple, Union
+
+from .accessory import _BaseAccessory, PlainText, Kmarkdown, Paragraph, Image, Button
+from .assets import is_pending
+from .card import Card, CardMessage
+from .limits import MAX_CARDS, MAX_MODULES, MAX_PLAIN_TEXT_LENGTH, MAX_KMARKDOWN_LENGTH, MAX_HEADER_LENGTH, \
+    MAX_PARAGRAPH_FIELDS, MAX_IMAGES, MAX_BUTTONS, MAX_CONTEXT_ELEMENTS, MAX_BUTTON_VALUE_LENGTH
+from .modules import _Module, Header, Section, ImageGroup, Container, ActionGroup, Context, Countdown, Invite, Audio, \
+    _FileModule
+from .node import _Node
+from .types import ThemeTypes
+
+__all__ = ['Violation', 'CardValidationError', 'validate', 'check']
+
+_THEMES = frozenset(i.value for i in ThemeTypes)
+_CARD_SIZES = frozenset(('sm', 'lg'))
+_IMAGE_SIZES = frozenset(('sm', 'lg'))
+_SECTION_MODES = frozenset(('left', 'right'))
+_COUNTDOWN_MODES = frozenset(('day', 'hour', 'second'))
+_BUTTON_CLICKS = frozenset(('', 'link', 'return-val'))
+_COLOR = re.compile(r'#[0-9a-fA-F]{6}')
+
+
+class Violation(NamedTuple):
+    """
+    一处不符合平台限制的地方
+    """
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f'{self.path}: {self.message}'
+
+
+class CardValidationError(Exception):
+    """
+    卡片不符合平台限制
+    """
+
+    def __init__(self, violations: List[Violation]) -> None:
+        self.violations = violations
+        super().__init__('\n'.join(str(i) for i in violations))
+
+
+def _kind(value) -> str:
+    """:return: 节点的 type，其它值为类名"""
+    return value.type if isinstance(value, _Node) else type(value).__name__
+
+
+def _text(text: _BaseAccessory, path: str, out: List[Violation], max_length: int = None) -> None:
+    if isinstance(text, PlainText):
+        limit = MAX_PLAIN_TEXT_LENGTH if max_length is None else max_length
+    elif isinstance(text, Kmarkdown):
+        limit = MAX_KMARKDOWN_LENGTH if max_length is None else max_length
+    else:
+        out.append(Violation(path, f'应为 plain-text 或 kmarkdown，实际为 {_kind(text)}'))
+        return
+    if not isinstance(text.content, str):
+        out.append(Violation(path + '.content', '文本内容必须为字符串'))
+    elif len(text.content) > limit:
+        out.append(Violation(path + '.content', f'{text.type} 最多 {limit} 个字符，实际为 {len(text.content)}'))
+
+
+def _paragraph(paragraph: Paragraph, path: str, out: List[Violation]) -> None:
+    if not (1 <= paragraph.cols <= 3):
+        out.append(Violation(path + '.cols', f'列数只能为 1-3，实际为 {paragraph.cols}'))
+    if len(paragraph.fields) > MAX_PARAGRAPH_FIELDS:
+        out.append(Violation(path + '.fields', f'最多 {MAX_PARAGRAPH_FIELDS} 个文本，实际为 {len(paragraph.fields)}'))
+    for index, field in enumerate(paragraph.fields):
+        _text(field, f'{path}.fields[{index}]', out)
+
+
+def _image(image: Image, path: str, out: List[Violation]) -> None:
+    if not image.src:
+        out.append(Violation(path + '.src', '图片地址不能为空'))
+    elif is_pending(image.src):
+        out.append(Violation(path + '.src', '图片地址尚未解析'))
+    if image.size not in _IMAGE_SIZES:
+        out.append(Violation(path + '.size', f'图片大小只能为 sm|lg，实际为 {image.size!r}'))
+
+
+def _button(button: Button, path: str, out: List[Violation]) -> None:
+    if button.theme not in _THEMES:
+        out.append(Violation(path + '.theme', f'未知的按钮主题 {button.theme!r}'))
+    if button.click not in _BUTTON_CLICKS:
+        out.append(Violation(path + '.click', f'click 只能为 link|return-val，实际为 {button.click!r}'))
+    elif button.click and not button.value:
+        out.append(Violation(path + '.value', f'click 为 {button.click} 时 value 不能为空'))
+    elif button.click == 'return-val' and len(button.value) > MAX_BUTTON_VALUE_LENGTH:
+        out.append(Violation(path + '.value',
+                             f'回传的 value 最多 {MAX_BUTTON_VALUE_LENGTH} 个字符，实际为 {len(button.value)}'))
+    _text(button.text, path + '.text', out)
+
+
+def _elements(module: _Module, path: str, out: List[Violation], allowed: tuple, names: str, limit: int) -> None:
+    if not module.elements:
+        out.append(Violation(path + '.elements', '至少需要一个元素'))
+    elif len(module.elements) > limit:
+        out.append(Violation(path + '.elements', f'最多 {limit} 个元素，实际为 {len(module.elements)}'))
+    for index, element in enumerate(module.elements):
+        element_path = f'{path}.elements[{index}]'
+        if not isinstance(element, allowed):
+            out.append(Violation(element_path, f'只能为 {names}，实际为 {_kind(element)}'))
+        elif isinstance(element, Image):
+            _image(element, element_path, out)
+        elif isinstance(element, Button):
+            _button(element, element_path, out)
+        else:
+            _text(element, element_path, out)
+
+
+def _module(module: _Module, path: str, out: List[Violation]) -> None:
+    if not isinstance(module, _Module):
+        out.append(Violation(path, f'应为模块，实际为 {_kind(module)}'))
+    elif isinstance(module, Header):
+        if not isinstance(module.text, PlainText):
+            out.append(Violation(path + '.text', '标题只能为 plain-text'))
+        else:
+            _text(module.text, path + '.text', out, MAX_HEADER_LENGTH)
+    elif isinstance(module, Section):
+        if module.mode not in _SECTION_MODES:
+            out.append(Violation(path + '.mode', f'mode 只能为 left|right，实际为 {module.mode!r}'))
+        if isinstance(module.text, Paragraph):
+            _paragraph(module.text, path + '.text', out)
+        else:
+            _text(module.text, path + '.text', out)
+        accessory = module.accessory
+        if accessory is None:
+            pass
+        elif isinstance(accessory, Image):
+            _image(accessory, path + '.accessory', out)
+        elif isinstance(accessory, Button):
+            if module.mode == 'left':
+                out.append(Violation(path + '.accessory', '按钮只能放在右侧'))
+            _button(accessory, path + '.accessory', out)
+        else:
+            out.append(Violation(path + '.accessory', f'只能为 image 或 button，实际为 {_kind(accessory)}'))
+    elif isinstance(module, (ImageGroup, Container)):
+        _elements(module, path, out, (Image,), 'image', MAX_IMAGES)
+    elif isinstance(module, ActionGroup):
+        _elements(module, path, out, (Button,), 'button', MAX_BUTTONS)
+    elif isinstance(module, Context):
+        _elements(module, path, out, (PlainText, Kmarkdown, Image), 'plain-text|kmarkdown|image',
+                  MAX_CONTEXT_ELEMENTS)
+    elif isinstance(module, Countdown):
+        if module.mode not in _COUNTDOWN_MODES:
+            out.append(Violation(path + '.mode', f'mode 只能为 day|hour|second，实际为 {module.mode!r}'))
+        if module.endTime < module.startTime:
+            out.append(Violation(path + '.endTime', '结束时间要大于开始时间'))
+    elif isinstance(module, Invite):
+        if not module.code:
+            out.append(Violation(path + '.code', '邀请码不能为空'))
+    elif isinstance(module, _FileModule):
+        if not module.src:
+            out.append(Violation(path + '.src', '地址不能为空'))
+        elif is_pending(module.src):
+            out.append(Violation(path + '.src', '地址尚未解析'))
+        if isinstance(module, Audio) and is_pending(module.cover):
+            out.append(Violation(path + '.cover', '封面地址尚未解析'))
+
+
+def _card(card: Card, path: str, out: List[Violation]) -> None:
+    if card.theme not in _THEMES:
+        out.append(Violation(path + '.theme', f'未知的卡片主题 {card.theme!r}'))
+    if card.size not in _CARD_SIZES:
+        out.append(Violation(path + '.size', f'卡片大小只能为 sm|lg，实际为 {card.size!r}'))
+    if card.color is not None and not _COLOR.fullmatch(card.color):
+        out.append(Violation(path + '.color', f'颜色格式应为 #rrggbb，实际为 {card.color!r}'))
+    if len(card) > MAX_MODULES:
+        out.append(Violation(path + '.modules', f'最多 {MAX_MODULES} 个模块，实际为 {len(card)}'))
+    for index, module in enumerate(card):
+        _module(module, f'{path}.modules[{index}]', out)
+
+
+def validate(obj: Union[CardMessage, Card, _Module, _BaseAccessory]) -> List[Violation]:
+    """
+    一次遍历检查卡片消息、卡片、模块或元素是否符合平台限制
+
+    :param obj: 要检查的对象
+    :return: 所有不符合限制的地方，符合时为空列表
+    """
+    out = []
+    if isinstance(obj, CardMessage):
+        if not obj:
+            out.append(Violation('cards', '至少需要一个卡片'))
+        elif len(obj) > MAX_CARDS:
+            out.append(Violation('cards', f'最多 {MAX_CARDS} 个卡片，实际为 {len(obj)}'))
+        total = sum(len(card) for card in obj)
+        if total > MAX_MODULES:
+            out.append(Violation('cards', f'所有卡片最多共 {MAX_MODULES} 个模块，实际为 {total}'))
+        for index, card in enumerate(obj):
+            _card(card, f'cards[{index}]', out)
+    elif isinstance(obj, Card):
+        _card(obj, 'card', out)
+    elif isinstance(obj, _Module):
+        _module(obj, obj.type, out)
+    elif isinstance(obj, Paragraph):
+        _paragraph(obj, obj.type, out)
+    elif isinstance(obj, Image):
+        _image(obj, obj.type, out)
+    elif isinstance(obj, Button):
+        _button(obj, obj.type, out)
+    elif isinstance(obj, _BaseAccessory):
+        _text(obj, obj.type, out)
+    else:
+        raise TypeError(f'无法检查 {type(obj).__name__}')
+    return out
+
+
+def check(obj: Union[CardMessage, Card, _Module, _BaseAccessory]) -> None:
+    """
+    检查是否符合平台限制，不符合时抛出 ``CardValidationError``
+
+    :param obj: 要检查的对象
+    """
+    violations = validate(obj)
+    if violations:
+        raise CardValidationError(violations)
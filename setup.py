@@ -20,6 +20,10 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    packages=find_packages(),
-    python_requires=">=3.6",
+    packages=find_packages(exclude=('benchmarks', 'benchmarks.*', 'tests', 'tests.*')),
+    python_requires=">=3.7",
+    extras_require={
+        "orjson": ["orjson"],
+        "ujson": ["ujson"],
+    },
 )
@@ -0,0 +1,29 @@
+import pytest
+
+from khl_card import ActionGroup, Button, Card, CardBuilder, CardMessage, CardMessageBuilder, ContainerBuilder, \
+    ContextBuilder, Divider, Image, ImageGroupBuilder, Kmarkdown, NamedColor, Paragraph, PlainText, SizeTypes, \
+    ThemeTypes
+
+
+def make_message() -> CardMessage:
+    """包含各种模块与元素的卡片消息"""
+    return CardMessageBuilder().card(
+        CardBuilder()
+        .image_group(ImageGroupBuilder().add(Image('https://img.example/a.png')).build())
+        .context(ContextBuilder().add(Kmarkdown.bold('Test "ctx": ') + Kmarkdown('中文\n\t \\ /'))
+                 .add(Image('x', size=SizeTypes.SM, circle=True)).build())
+        .divider().invite('asfws66')
+        .container(ContainerBuilder().add(Image('a')).add(Image('b')).build())
+        .header('This is a header')
+        .section(Kmarkdown('This is a section'), accessory=Button(PlainText('hi'), value='v'))
+        .section(Paragraph(2, [PlainText('a'), Kmarkdown('b')]), mode='left', accessory=Image('z'))
+        .action_group(ActionGroup(Button(Kmarkdown('k'), ThemeTypes.DANGER, 'v', 'return-val')))
+        .file('file_url', 'title').audio('src', 'title', 'cover').video('v', 't')
+        .second_countdown('2030-05-05 08:00:00')
+        .build()
+    ).card(Card(Divider(), color=NamedColor.GOLD)).build()
+
+
+@pytest.fixture
+def message() -> CardMessage:
+    return make_message()
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from khl_card import ActionRegistry, Button, PlainText
+
+
+@pytest.fixture
+def actions() -> ActionRegistry:
+    return ActionRegistry()
+
+
+@pytest.mark.parametrize('args', [
+    (0, 0),
+    (-1, 2 ** 70),
+    (123456789, -987654321),
+])
+def test_int_round_trip(actions, args):
+    @actions.action
+    def pick(event, a: int, b: int):
+        return event, a, b
+
+    value = pick.encode(*args)
+    assert value.startswith('~' + pick.route)
+    assert actions.decode(value) == (pick, args)
+    assert actions.dispatch(value, 'event') == ('event', *args)
+
+
+def test_all_types_round_trip(actions):
+    @actions.action
+    def mixed(event, flag: bool, ratio: float, name: str, data: bytes, tail: str):
+        return flag, ratio, name, data, tail
+
+    for args in [(True, 1.5, '中文', b'\x00\xff', ''), (False, -0.0, '', b'', 'x' * 20)]:
+        value = mixed.encode(*args)
+        assert actions.dispatch(value, None) == args
+        assert mixed(None, *args) == args
+
+
+def test_no_arguments(actions):
+    @actions.action(name='ping')
+    def ping(event):
+        return 'pong'
+
+    assert ping.encode() == '~' + ping.route
+    assert actions.dispatch(ping.encode(), None) == 'pong'
+    with pytest.raises(ValueError):
+        actions.decode(ping.encode() + 'AA')
+
+
+def test_async_dispatch(actions):
+    @actions.action
+    async def vote(event, poll: int, option: int):
+        return event, poll, option
+
+    assert asyncio.run(actions.dispatch(vote.encode(12, 1), 'e')) == ('e', 12, 1)
+
+
+def test_button(actions):
+    @actions.action
+    def vote(event, poll: int, option: int):
+        ...
+
+    button = vote.button(PlainText('赞成'), 12, 1, theme='danger')
+    assert isinstance(button, Button)
+    assert (button.theme, button.click, button.value) == ('danger', 'return-val', vote.encode(12, 1))
+
+
+def test_unknown_values(actions):
+    @actions.action
+    def vote(event, poll: int):
+        ...
+
+    assert actions.decode('plain value') is None
+    assert actions.dispatch('~zzz', None) is None
+    assert vote.encode(1) in actions
+    assert 'plain' not in actions
+    with pytest.raises(ValueError):
+        actions.decode('~' + vote.route + '!!')
+    with pytest.raises(ValueError):
+        # 多出的字节
+        actions.decode(vote.encode(1) + 'AA')
+
+
+def test_routes(actions):
+    @actions.action(name='a')
+    def first(event, x: int):
+        ...
+
+    # 路由编号只由名称决定，重启后不变
+    assert ActionRegistry().action(first.func, name='a').route == first.route
+    with pytest.raises(ValueError):
+        actions.action(lambda event: None, name='b', route=first.route)
+    with pytest.raises(ValueError):
+        actions.action(lambda event: None, name='c', route='!!!')
+    actions.remove(first)
+    assert len(actions) == 0
+    assert actions.action(first.func, name='a').route == first.route
+
+
+def test_invalid_schema_and_arguments(actions):
+    with pytest.raises(TypeError):
+        @actions.action
+        def untyped(event, x):
+            ...
+
+    with pytest.raises(TypeError):
+        @actions.action
+        def keyword(event, *, x: int):
+            ...
+
+    @actions.action
+    def typed(event, x: int, y: str):
+        ...
+
+    with pytest.raises(TypeError):
+        typed.encode(True, 'a')
+    with pytest.raises(TypeError):
+        typed.encode(1)
+    with pytest.raises(ValueError):
+        typed.encode(1, 'x' * 200)
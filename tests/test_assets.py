@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from khl_card import Audio, Card, CardMessage, File, Image, ImageGroup, Kmarkdown, Section, Video
+from khl_card.assets import DEFAULT_CONCURRENCY, pending_sources, resolve
+
+
+class Counter:
+    """记录同时进行中的请求数的峰值"""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self.calls = []
+
+    async def fetch(self, name: str) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        self.calls.append(name)
+        return f'https://img.example/{name}.png'
+
+
+def test_awaitable_and_deferred_sources():
+    counter = Counter()
+
+    async def main():
+        card = Card(Section(Kmarkdown('x'), accessory=Image(counter.fetch('image'))),
+                    File(lambda: counter.fetch('file'), 'f'),
+                    Video(lambda: 'https://img.example/video.png', 'v'),
+                    Audio(counter.fetch('audio'), 'a', cover=lambda: counter.fetch('cover')))
+        assert len(pending_sources(card)) == 5
+        with pytest.raises(TypeError):
+            card.build_to_json(pretty=False)
+        assert await resolve(card) == 5
+        return card
+
+    card = asyncio.run(main())
+    assert pending_sources(card) == []
+    data = card.build()
+    assert data['modules'][0]['accessory']['src'] == 'https://img.example/image.png'
+    assert data['modules'][1]['src'] == 'https://img.example/file.png'
+    assert data['modules'][2]['src'] == 'https://img.example/video.png'
+    assert data['modules'][3]['src'] == 'https://img.example/audio.png'
+    assert data['modules'][3]['cover'] == 'https://img.example/cover.png'
+
+
+@pytest.mark.parametrize('concurrency, expected', [(1, 1), (3, 3), (None, DEFAULT_CONCURRENCY)])
+def test_concurrency_limit(concurrency, expected):
+    counter = Counter()
+    # 函数形式的资源在获得许可后才调用，awaitable 在创建时就已经是协程
+    images = [Image(lambda i=i: counter.fetch(f'd{i}')) for i in range(6)] + \
+             [Image(counter.fetch(f'a{i}')) for i in range(6)]
+    card = Card(*[ImageGroup(*images[i:i + 4]) for i in range(0, len(images), 4)])
+    assert asyncio.run(resolve(card, concurrency)) == 12
+    assert counter.peak == min(expected, 12)
+    assert len(counter.calls) == 12
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        asyncio.run(resolve(Card(ImageGroup(Image(lambda: 'x'))), 0))
+
+
+def test_same_awaitable_resolved_once():
+    counter = Counter()
+    shared = counter.fetch('shared')
+
+    def deferred():
+        return counter.fetch('deferred')
+
+    message = CardMessage(Card(ImageGroup(Image(shared), Image(deferred))),
+                          Card(File(shared, 'f'), Audio(deferred, 'a', cover=shared)))
+    assert asyncio.run(resolve(message)) == 2
+    assert sorted(counter.calls) == ['deferred', 'shared']
+    data = message.build()
+    assert data[0]['modules'][0]['elements'][0]['src'] == data[1]['modules'][0]['src'] == \
+        data[1]['modules'][1]['cover'] == 'https://img.example/shared.png'
+    assert data[0]['modules'][0]['elements'][1]['src'] == data[1]['modules'][1]['src'] == \
+        'https://img.example/deferred.png'
+
+
+def test_abuild():
+    counter = Counter()
+    card = Card(ImageGroup(Image(counter.fetch('a'))))
+    assert asyncio.run(card.abuild()) == card.build()
+    message = CardMessage(Card(ImageGroup(Image(counter.fetch('b')))), Card(File(lambda: counter.fetch('c'), 'f')))
+    data = asyncio.run(message.abuild(concurrency=1, validate=True))
+    assert data == message.build()
+    assert data[0]['modules'][0]['elements'][0]['src'] == 'https://img.example/b.png'
+    assert data[1]['modules'][0]['src'] == 'https://img.example/c.png'
+    assert counter.peak == 1
+
+
+def test_failure_cancels_pending():
+    counter = Counter()
+
+    async def boom():
+        raise RuntimeError('fail')
+
+    card = Card(ImageGroup(Image(boom()), Image(lambda: counter.fetch('late'))))
+    with pytest.raises(RuntimeError):
+        asyncio.run(CardMessage(card).abuild(1))
+    assert counter.calls == []
@@ -0,0 +1,29 @@
+import pytest
+
+from khl_card import Color, NamedColor
+
+
+def test_lerp():
+    black = Color(0, 0, 0)
+    white = Color(255, 255, 255)
+    assert black.lerp(white, 0) == black
+    assert black.lerp(white, 1) == white
+    assert str(black.lerp(white, 0.5)) == '#808080'
+
+
+@pytest.mark.parametrize('t, expected', [(1.5, '#ffffff'), (100, '#ffffff'), (-0.5, '#000000'), (-3, '#000000')])
+def test_lerp_clamps(t, expected):
+    color = Color(0, 0, 0).lerp(Color(255, 255, 255), t)
+    assert str(color) == expected
+    assert 0 <= color.R <= 255 and 0 <= color.G <= 255 and 0 <= color.B <= 255
+    assert str(Color(255, 255, 255).lerp(Color(0, 0, 0), 1 - t)) == expected
+
+
+def test_gradient():
+    start = NamedColor.GOLD.value
+    end = NamedColor.GRAY.value
+    colors = Color.gradient(start, end, 5)
+    assert len(colors) == 5
+    assert colors[0] == start and colors[-1] == end
+    assert colors[2] == start.lerp(end, 0.5)
+    assert Color.gradient(start, end, 0) == []
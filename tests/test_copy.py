@@ -0,0 +1,125 @@
+import copy
+import json
+import pickle
+
+from khl_card import Card, CardMessage, Divider, Header, Kmarkdown, Paragraph, PlainText, Section, intern
+
+
+def make_card() -> Card:
+    return Card(Header(PlainText('标题')),
+                Section(Paragraph(2, [Kmarkdown('**a**'), PlainText('b')])),
+                Divider())
+
+
+def test_deepcopy_drops_cache():
+    card = make_card()
+    card.encode()
+    copied = copy.deepcopy(card)
+    copied.modules[1].text.fields[0].content = 'changed'
+    assert json.loads(copied.encode()) == copied.build()
+    assert b'changed' in copied.encode()
+    assert b'changed' not in card.encode()
+
+
+def test_deepcopy_module_drops_cache():
+    section = make_card().modules[1]
+    section._encode()
+    copied = copy.deepcopy(section)
+    copied.text.fields[1].content = 'changed'
+    assert json.loads(copied._encode()) == copied.build()
+
+
+def test_pickle_round_trip():
+    card = make_card()
+    card.encode()
+    card.serialized_size
+    loaded = pickle.loads(pickle.dumps(card))
+    assert loaded.build() == card.build()
+    assert loaded.encode() == card.encode()
+    loaded.modules[0].text.content = 'changed'
+    assert json.loads(loaded.encode()) == loaded.build()
+
+    message = CardMessage(make_card(), make_card())
+    message.encode()
+    assert pickle.loads(pickle.dumps(message)).build() == message.build()
+
+
+def test_pickle_interned_node():
+    module = intern(Divider())
+    loaded = pickle.loads(pickle.dumps(module))
+    assert loaded.build() == module.build()
+    assert pickle.loads(pickle.dumps(intern(make_card().modules[1]))).build() == make_card().modules[1].build()
+
+
+def test_in_place_mutation():
+    card = make_card()
+    card.encode()
+    card.serialized_size
+    card.modules.insert(0, Divider())
+    assert json.loads(card.encode()) == card.build()
+    assert card.serialized_size.bytes == len(card.encode())
+
+    paragraph = card.modules[2].text
+    paragraph.fields.append(PlainText('c'))
+    paragraph.cols = 3
+    assert json.loads(card.encode()) == card.build()
+    assert card.build()['modules'][2]['text']['cols'] == 3
+
+    del card.modules[0]
+    card.modules += [Divider()]
+    assert json.loads(card.encode()) == card.build()
+    assert len(card.build()['modules']) == 4
+
+
+def test_in_place_mutation_updates_query():
+    card = make_card()
+    assert len(card.find_all(Divider)) == 1
+    card.modules.insert(0, Divider())
+    card.modules.pop()
+    assert len(card.find_all(Divider)) == 1
+    assert card.find(Divider) is card.modules[0]
+    card.modules[2].text.fields.append(PlainText('c'))
+    assert len(card.find_all(PlainText)) == 3
+    card.modules.clear()
+    assert card.find_all() == []
+
+
+def test_card_methods_after_in_place_mutation():
+    card = make_card()
+    card.serialized_size
+    card.find_all()
+    card.modules.append(Divider())
+    card.append(Header(PlainText('x')))
+    card[0] = Divider()
+    assert card.serialized_size.bytes == len(card.encode())
+    assert card.find_all(Divider) == [card.modules[0], card.modules[2], card.modules[3]]
+
+
+def test_constructor_copies_lists_once():
+    fields = [PlainText('a'), Kmarkdown('b')]
+    paragraph = Paragraph(2, fields)
+    fields.append(PlainText('c'))
+    assert len(paragraph.fields) == 2
+    modules = [Divider()]
+    card = Card(*modules)
+    card.encode()
+    card.modules.append(Divider())
+    assert len(card.build()['modules']) == 2
+    assert json.loads(card.encode()) == card.build()
+
+
+def test_constructor_skips_guarded_setattr(monkeypatch):
+    calls = []
+    original = Section.__setattr__
+
+    def spy(self, key, value):
+        calls.append(key)
+        original(self, key, value)
+
+    monkeypatch.setattr(Section, '__setattr__', spy)
+    section = Section(Kmarkdown('a'))
+    assert calls == []
+    section._encode()
+    section.mode = 'left'
+    assert calls == ['mode']
+    assert json.loads(section._encode()) == section.build()
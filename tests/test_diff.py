@@ -0,0 +1,102 @@
+import copy
+import random
+
+import pytest
+
+from khl_card import Card, CardMessage, Divider, Header, Kmarkdown, Paragraph, PlainText, Section
+from khl_card.diff import diff
+
+
+def apply(doc, patch: list):
+    """按 RFC 6902 应用 add、remove、replace 操作"""
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        parts = [i.replace('~1', '/').replace('~0', '~') for i in op['path'].split('/')[1:]]
+        if not parts:
+            assert op['op'] == 'replace'
+            doc = op['value']
+            continue
+        target = doc
+        for part in parts[:-1]:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        last = parts[-1]
+        if isinstance(target, list):
+            index = len(target) if last == '-' else int(last)
+            if op['op'] == 'add':
+                target.insert(index, op['value'])
+            elif op['op'] == 'remove':
+                del target[index]
+            else:
+                target[index] = op['value']
+        elif op['op'] == 'remove':
+            del target[last]
+        else:
+            target[last] = op['value']
+    return doc
+
+
+def check(old, new):
+    result = diff(old, new)
+    assert apply(old.build(), result.patch) == new.build()
+    return result
+
+
+def copy_of(message: CardMessage) -> CardMessage:
+    return CardMessage.from_dict(message.build())
+
+
+def test_no_difference(message):
+    result = message.diff(copy_of(message))
+    assert not result and len(result) == 0
+
+
+def test_changed_text(message):
+    other = copy_of(message)
+    other[0][6].text.content = 'changed'
+    result = check(message, other)
+    assert result.paths == ['/0/modules/6/text/content']
+
+
+def test_insert_remove_and_style(message):
+    other = copy_of(message)
+    other[0].modules.insert(2, Divider())
+    other[0].color = None
+    other[-1].theme = 'danger'
+    check(message, other)
+
+    other = copy_of(message)
+    del other[0].modules[1:3]
+    other.append(Card(Header('new')))
+    check(message, other)
+
+
+@pytest.mark.parametrize('old, new', [
+    (Card(Header('a')), Card(Header('a'), color='#aabbcc')),
+    (Header('a'), Section(Kmarkdown('a'))),
+    (Section(Paragraph(2, [Kmarkdown('a'), Kmarkdown('b')])),
+     Section(Paragraph(3, [Kmarkdown('a'), PlainText('b'), Kmarkdown('c')]))),
+    (Section(Kmarkdown('a/b~c')), Section(Kmarkdown('a'), accessory=None, mode='left')),
+])
+def test_nodes_and_cards(old, new):
+    check(old, new)
+
+
+def test_random_edits():
+    rng = random.Random(7)
+
+    def make(count: int) -> Card:
+        return Card(*[Section(Kmarkdown(str(rng.randrange(5)))) for _ in range(count)])
+
+    for _ in range(50):
+        old = CardMessage(make(rng.randrange(1, 6)), make(rng.randrange(1, 6)))
+        new = CardMessage.from_dict(old.build())
+        for _ in range(rng.randrange(4)):
+            card = new[rng.randrange(len(new))]
+            action = rng.randrange(3)
+            if action == 0:
+                card.modules.insert(rng.randrange(len(card) + 1), Divider())
+            elif action == 1 and len(card) > 1:
+                del card.modules[rng.randrange(len(card))]
+            else:
+                card[rng.randrange(len(card))] = Section(Kmarkdown('edited'))
+        check(old, new)
@@ -0,0 +1,53 @@
+import io
+import json
+
+import pytest
+
+from khl_card import Card, CardMessage, Kmarkdown, PlainText, Section
+
+
+def expected(obj) -> bytes:
+    return json.dumps(obj.build(), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def test_encode_matches_json_dumps(message):
+    assert message.encode() == expected(message)
+    for card in message:
+        assert card.encode() == expected(card)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 16])
+def test_iter_encode_and_write_to(message, chunk_size):
+    chunks = list(message.iter_encode(chunk_size))
+    assert b''.join(chunks) == expected(message)
+    # 块在片段之间切分，不会拆开多字节字符
+    for chunk in chunks:
+        chunk.decode('utf-8')
+    stream = io.BytesIO()
+    assert message.write_to(stream, chunk_size) == len(expected(message))
+    assert stream.getvalue() == expected(message)
+    card = message[0]
+    assert b''.join(card.iter_encode(chunk_size)) == expected(card)
+    stream = io.BytesIO()
+    assert card.write_to(stream, chunk_size) == len(expected(card))
+    assert stream.getvalue() == expected(card)
+
+
+def test_special_characters():
+    text = '\x00\x1f\x7f"\\/\n\t 😀中文'
+    card = Card(Section(Kmarkdown(text)), Section(PlainText(text, emoji=False)), color='#123456')
+    assert card.encode() == expected(card)
+    assert json.loads(card.encode())['modules'][0]['text']['content'] == text
+    message = CardMessage(card)
+    assert b''.join(message.iter_encode(3)) == expected(message)
+
+
+def test_encode_after_mutation(message):
+    message.encode()
+    card = message[0]
+    card.modules[6].text.content = 'changed'
+    card.theme = 'danger'
+    assert message.encode() == expected(message)
+    assert b''.join(message.iter_encode(5)) == expected(message)
+    message.append(Card(Section(Kmarkdown('new'))))
+    assert message.encode() == expected(message)
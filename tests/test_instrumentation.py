@@ -0,0 +1,39 @@
+from khl_card import Audio, Card, CardMessage, File, instrument
+from khl_card.instrumentation import is_instrumented
+
+
+def test_message_counts(message):
+    ref = message.build()
+    with instrument() as stats:
+        assert message.build() == ref
+    assert not is_instrumented()
+    records = stats.as_dict()
+    assert records['CardMessage'].calls == 1
+    assert records['CardMessage'].max_depth == 1
+    assert records['CardMessage'].bytes == len(message.encode())
+    assert records['card'].calls == 2
+    assert records['card'].max_depth == 2
+
+
+def test_super_build_recorded_once():
+    # Audio.build 通过 super() 调用同样被替换的 _FileModule.build
+    audio = Audio('src', 'title', 'cover')
+    size = len(audio._encode().encode('utf-8'))
+    with instrument() as stats:
+        audio.build()
+        audio.build()
+    record = stats.as_dict()['audio']
+    assert record.calls == 2
+    assert record.bytes == 2 * size
+    assert record.max_depth == 1
+
+
+def test_super_build_nested_in_card():
+    card = Card(Audio('a', 'b', 'c'), File('f', 'g'), Audio('d', 'e'))
+    with instrument() as stats:
+        CardMessage(card).build()
+    records = stats.as_dict()
+    assert records['audio'].calls == 2
+    assert records['audio'].max_depth == 3
+    assert records['file'].calls == 1
+    assert records['card'].calls == 1
@@ -0,0 +1,72 @@
+import pytest
+
+from khl_card import Kmarkdown, KmarkdownColors
+from khl_card.builder import KmarkdownBuilder
+from khl_card.kmarkdown import parse
+
+# (方法名, 参数)
+CASES = [
+    ('bold', ('a*b',)),
+    ('italic', ('a*b',)),
+    ('bold_italic', ('a*b',)),
+    ('strikethrough', ('~x~',)),
+    ('link', ('[t]', 'https://x/(y)')),
+    ('quote', ('> q',)),
+    ('underline', ('(ins)',)),
+    ('spoiler', ('s-p',)),
+    ('at_channel', ('1(2)',)),
+    ('at_user', ('123',)),
+    ('at_role', ('4',)),
+    ('inline_code', ('a`b*',)),
+    ('code_block', ('a`b', 'python')),
+    ('color', ('c*', KmarkdownColors.DANGER)),
+]
+
+
+@pytest.mark.parametrize('name, args', CASES)
+@pytest.mark.parametrize('escape', [False, True])
+def test_builder_matches_kmarkdown(name, args, escape):
+    expected = getattr(Kmarkdown, name)(*args, escape=escape).content
+    assert getattr(KmarkdownBuilder(), name)(*args, escape=escape).to_string() == expected
+
+
+def test_escape():
+    assert Kmarkdown.bold('a*b', escape=True).content == '**a\\*b**'
+    assert Kmarkdown.link('[t]', 'https://x/(y)', escape=True).content == '[\\[t\\]](https://x/%28y%29)'
+    assert Kmarkdown.inline_code('a`b*', escape=True).content == '`a\\`b*`'
+    assert Kmarkdown.escape('-1') == '\\-1'
+
+
+@pytest.mark.parametrize('escape', [False, True])
+def test_non_str_content(escape):
+    assert Kmarkdown.bold(123, escape=escape).content == '**123**'
+    assert KmarkdownBuilder().bold(123, escape=escape).to_string() == '**123**'
+    assert KmarkdownBuilder().text(-1.5, escape=escape).to_string() == ('\\-1.5' if escape else '-1.5')
+    assert KmarkdownBuilder().at_user(42, escape=escape).inline_code(7, escape=escape).to_string() == \
+        '(met)42(met)`7`'
+    assert Kmarkdown.color(None, 'info', escape=escape).content == '(font)None(font)[info]'
+
+
+def test_builder():
+    builder = KmarkdownBuilder('a', Kmarkdown('b'))
+    builder.newline().divider().text('*', escape=True)
+    builder += KmarkdownBuilder().bold('c')
+    assert builder.to_string() == 'ab\n---\\***c**'
+    assert len(builder) == len(builder.to_string())
+    assert builder.build(max_length=4).content == 'a...'
+    with pytest.raises(TypeError):
+        builder.append(1)
+
+
+@pytest.mark.parametrize('content, plain, url', [
+    ('[link](http://x.com/a_(b))', 'link', 'http://x.com/a_(b)'),
+    ('[a](http://x/(y)) tail', 'a tail', 'http://x/(y)'),
+    ('[a](http://x/((y))z) tail', 'a tail', 'http://x/((y))z'),
+    ('[a](b) (c)', 'a (c)', 'b'),
+    ('[a](http://x/(y) tail', 'a tail', 'http://x/(y'),
+])
+def test_link_url_with_parentheses(content, plain, url):
+    kmd = Kmarkdown(content)
+    assert kmd.to_plain_text() == plain
+    assert kmd.visible_length == len(plain)
+    assert parse(content).children[0].value == url
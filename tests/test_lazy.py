@@ -0,0 +1,70 @@
+import copy
+import pickle
+
+from khl_card import Card, CardMessage, Divider, Header, PlainText
+
+
+def load(message: CardMessage, lazy: bool) -> Card:
+    return CardMessage.from_json(message.encode(), lazy=lazy)[0]
+
+
+def test_reads_match_eager(message):
+    eager = load(message, False)
+    lazy = load(message, True)
+    assert lazy.modules == eager.modules
+    assert eager.modules == lazy.modules
+    assert lazy.modules == load(message, True).modules
+    assert not lazy.modules != eager.modules
+    assert lazy.modules[2:5] == eager.modules[2:5]
+    assert lazy.modules[::-1] == eager.modules[::-1]
+    assert lazy.modules + [Divider()] == eager.modules + [Divider()]
+    assert [Divider()] + lazy.modules == [Divider()] + eager.modules
+    assert lazy.modules * 2 == eager.modules * 2
+    assert repr(lazy.modules) == repr(eager.modules)
+    assert str(lazy.modules) == str(eager.modules)
+    assert list(reversed(lazy.modules)) == list(reversed(eager.modules))
+    assert lazy.modules.copy() == eager.modules.copy()
+    assert eager.modules[3] in lazy.modules
+    assert lazy.modules.index(eager.modules[3]) == 3
+    assert lazy.modules.count(eager.modules[3]) == eager.modules.count(eager.modules[3])
+    assert lazy.build() == eager.build()
+    assert lazy.encode() == eager.encode()
+
+
+def test_modules_decoded_on_demand(message):
+    lazy = load(message, True)
+    assert lazy.modules._items[3].__class__ is dict
+    assert lazy[3].build() == message[0].modules[3].build()
+    assert lazy.modules._items[3].__class__ is not dict
+    assert lazy.modules._items[4].__class__ is dict
+
+
+def test_mutation_matches_eager(message):
+    eager = load(message, False)
+    lazy = load(message, True)
+    for card in (eager, lazy):
+        card.encode()
+        card.modules.sort(key=lambda m: m.type)
+        card.modules.insert(0, Header(PlainText('x')))
+        card.modules.pop(3)
+        del card.modules[-1]
+        card.modules += [Divider()]
+        card.modules.reverse()
+        card.modules[1:3] = [Divider()]
+        card.append(Divider())
+    assert lazy.modules == eager.modules
+    assert lazy.encode() == eager.encode()
+    assert lazy.serialized_size == eager.serialized_size
+    assert lazy.find_all(Divider) == eager.find_all(Divider)
+    lazy.modules.clear()
+    assert lazy.build()['modules'] == []
+
+
+def test_copy_and_pickle(message):
+    lazy = load(message, True)
+    assert copy.deepcopy(lazy).build() == lazy.build()
+    assert pickle.loads(pickle.dumps(lazy)).modules == lazy.modules
+    other = Card()
+    other.modules = lazy.modules
+    other.modules.append(Divider())
+    assert len(other.modules) == len(lazy.modules) + 1
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from khl_card import Card, CardMessage, Context, Divider, Header, Kmarkdown, Paragraph, PlainText, Section, \
+    paginate_rows, split_cards
+
+
+def test_only_leading_header_is_repeated():
+    header = Header(PlainText('title'))
+    inner = Header(PlainText('chapter'))
+    card = Card(header, Section(Kmarkdown('a')), inner, Section(Kmarkdown('b')), Section(Kmarkdown('c')),
+                Section(Kmarkdown('d')))
+    pages = split_cards([card], max_modules=3)
+    modules = [list(page[0]) for page in pages]
+    assert all(page[0] is header for page in modules)
+    assert sum(module is inner for page in modules for module in page) == 1
+    assert [module for page in modules for module in page if module is not header] == card.modules[1:]
+
+    # 紧跟在后面的标题也属于正文
+    card = Card(header, inner, *[Section(Kmarkdown(str(i))) for i in range(4)])
+    pages = split_cards([card], max_modules=3)
+    assert sum(module is inner for page in pages for module in page[0]) == 1
+    assert all(page[0].modules[0] is header for page in pages)
+
+    # 第一个模块不是标题时不重复任何模块
+    card = Card(Divider(), Header(PlainText('x')), Section(Kmarkdown('a')), Section(Kmarkdown('b')))
+    pages = split_cards([card], max_modules=2)
+    assert [module for page in pages for module in page[0]] == card.modules
+
+
+def make_card(count: int = 10, **style) -> Card:
+    return Card(Header(PlainText('title')), *[Section(Kmarkdown(f'row {i} 行')) for i in range(count)], **style)
+
+
+def contents(pages) -> list:
+    return [module for page in pages for card in page for module in card if not isinstance(module, Header)]
+
+
+def test_split_by_module_count():
+    card = make_card()
+    pages = split_cards([card], max_modules=4)
+    assert len(pages) == 4
+    assert all(len(page) == 1 and len(page[0]) <= 4 for page in pages)
+    assert contents(pages) == card.modules[1:]
+    assert len(split_cards([card])) == 1
+
+
+def test_split_by_bytes():
+    card = make_card(30)
+    limit = 600
+    pages = split_cards([card], max_bytes=limit)
+    assert len(pages) > 1
+    for page in pages:
+        assert page.serialized_size.bytes == len(page.encode()) <= limit
+        assert page[0].modules[0] is card.modules[0]
+    assert contents(pages) == card.modules[1:]
+
+
+def test_split_by_card_count():
+    cards = [make_card(2) for _ in range(5)]
+    pages = split_cards(cards, max_cards=2)
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [card.modules for page in pages for card in page] == [card.modules for card in cards]
+
+
+def test_split_without_repeating_header():
+    card = make_card()
+    pages = split_cards([card], max_modules=4, repeat_header=False)
+    assert [module for page in pages for module in page[0]] == card.modules
+    assert len(pages) == 3
+
+
+def test_keep_style():
+    card = make_card(theme='danger', size='sm', color='#ff0000')
+    pages = split_cards([card], max_modules=4)
+    assert all((page[0].theme, page[0].size, page[0].color) == ('danger', 'sm', '#ff0000') for page in pages)
+    pages = split_cards([card], max_modules=4, keep_style=False)
+    assert (pages[0][0].theme, pages[0][0].size, pages[0][0].color) == ('danger', 'sm', '#ff0000')
+    assert all((page[0].theme, page[0].size, page[0].color) == ('primary', 'lg', None) for page in pages[1:])
+
+
+def test_split_errors():
+    with pytest.raises(ValueError):
+        split_cards([make_card()], max_modules=0)
+    with pytest.raises(ValueError):
+        split_cards([Card(Section(Kmarkdown('x' * 200)))], max_bytes=100)
+    with pytest.raises(ValueError):
+        split_cards([make_card()], max_modules=1)
+
+
+def rows_of(page) -> list:
+    card = page[0] if isinstance(page, CardMessage) else page
+    return [module.text.content for module in card if isinstance(module, Section)]
+
+
+def test_paginate_rows():
+    pages = list(paginate_rows(range(25), lambda i: f'row {i}', per_page=10, header='排行榜',
+                               footer=lambda page: f'第 {page} 页'))
+    assert len(pages) == 3
+    assert all(isinstance(page, CardMessage) and len(page) == 1 for page in pages)
+    assert [len(rows_of(page)) for page in pages] == [10, 10, 5]
+    assert [row for page in pages for row in rows_of(page)] == [f'row {i}' for i in range(25)]
+    for number, page in enumerate(pages, 1):
+        modules = page[0].modules
+        assert isinstance(modules[0], Header) and modules[0].text.content == '排行榜'
+        assert isinstance(modules[-1], Context) and modules[-1].elements[0].content == f'第 {number} 页'
+    assert list(paginate_rows([])) == []
+
+
+def test_paginate_rows_is_lazy():
+    consumed = []
+
+    def rows():
+        for i in range(100):
+            consumed.append(i)
+            yield str(i)
+
+    pages = paginate_rows(rows(), per_page=10, message=False)
+    first = next(pages)
+    assert isinstance(first, Card) and len(consumed) == 10
+    assert rows_of(first) == [str(i) for i in range(10)]
+
+
+def test_paginate_rows_columns_and_limits():
+    pages = list(paginate_rows([('a', 'b', PlainText('c'))] * 4, columns=3, per_page=3, max_modules=3,
+                               header=Header(PlainText('h')), theme='danger', color='#000000'))
+    assert [len(page[0]) for page in pages] == [3, 3]
+    paragraph = pages[0][0].modules[1].text
+    assert isinstance(paragraph, Paragraph) and paragraph.cols == 3
+    assert (pages[0][0].theme, pages[0][0].color) == ('danger', '#000000')
+
+    limit = 300
+    pages = list(paginate_rows((f'行 {i} ' * 5 for i in range(30)), per_page=100, max_bytes=limit))
+    assert len(pages) > 1
+    assert all(len(page.encode()) <= limit for page in pages)
+    assert sum(len(rows_of(page)) for page in pages) == 30
+
+    with pytest.raises(TypeError):
+        list(paginate_rows([('a', 'b')], columns=3))
+    with pytest.raises(ValueError):
+        list(paginate_rows(['x' * 100], max_bytes=50))
+    with pytest.raises(ValueError):
+        paginate_rows([], per_page=0)
+
+
+def test_paginate_rows_async():
+    async def rows():
+        for i in range(7):
+            await asyncio.sleep(0)
+            yield i
+
+    async def formatter(row):
+        await asyncio.sleep(0)
+        return f'**{row}**'
+
+    async def main():
+        return [page async for page in paginate_rows(rows(), formatter, per_page=3)]
+
+    pages = asyncio.run(main())
+    assert [rows_of(page) for page in pages] == [['**0**', '**1**', '**2**'], ['**3**', '**4**', '**5**'],
+                                                 ['**6**']]
+
+    async def plain():
+        return [page async for page in paginate_rows(rows(), str, per_page=5, message=False)]
+
+    assert [len(rows_of(page)) for page in asyncio.run(plain())] == [5, 2]
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from khl_card import Button, Card, CardMessage, Context, Divider, Kmarkdown, Paragraph, PlainText, Section, intern
+from khl_card.pool import clear_pool, pool_size
+
+
+def make_section() -> Section:
+    return Section(Kmarkdown('x'), accessory=Button(PlainText('b'), value='v'))
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    clear_pool()
+    yield
+    clear_pool()
+
+
+def test_intern_shares_equal_nodes():
+    a = intern(make_section())
+    assert intern(make_section()) is a
+    assert intern(a) is a
+    assert intern(Section(Kmarkdown('y'))) is not a
+    assert intern(Kmarkdown('x')) is a.text
+    assert intern(PlainText('b')) is a.accessory.text
+
+
+def test_interned_node_is_frozen():
+    section = intern(make_section())
+    assert section.frozen and section.text.frozen and section.accessory.frozen
+    with pytest.raises(AttributeError):
+        section.mode = 'left'
+    with pytest.raises(AttributeError):
+        section.accessory.value = 'k'
+    paragraph = intern(Paragraph(2, [PlainText('a'), Kmarkdown('b')]))
+    assert isinstance(paragraph.fields, tuple)
+    assert paragraph.build() == Paragraph(2, [PlainText('a'), Kmarkdown('b')]).build()
+
+
+def test_intern_hit_leaves_argument_untouched():
+    shared = intern(make_section())
+    section = make_section()
+    assert intern(section) is shared
+    assert not section.frozen and not section.accessory.frozen
+    assert section.accessory is not shared.accessory
+    section.accessory.value = 'k'
+    assert section.build()['accessory']['value'] == 'k'
+    assert shared.build()['accessory']['value'] == 'v'
+
+
+def test_intern_card_and_message():
+    footer = Context(PlainText('footer'))
+    cards = [Card(Section(Kmarkdown(str(i))), Divider(), Context(PlainText('footer')), intern=True) for i in range(3)]
+    assert all(card.modules[2] is cards[0].modules[2] for card in cards)
+    assert intern(footer) is cards[0].modules[2]
+    cards[0].append(Divider())
+    assert cards[0].modules[3] is cards[0].modules[1]
+    cards[1][0] = Divider()
+    assert cards[1].modules[0] is cards[0].modules[1]
+
+    message = CardMessage(Card(Divider()), Card(Divider()))
+    assert intern(message) is message
+    assert message[0].modules[0] is message[1].modules[0]
+    assert json.loads(message.encode()) == message.build()
+
+
+def test_pool_size_and_clear():
+    keep = [intern(make_section())]
+    # Section、Kmarkdown、Button、PlainText
+    assert pool_size() == 4
+    clear_pool()
+    assert pool_size() == 0
+    assert keep[0].frozen
+    assert intern(make_section()) is not keep[0]
+
+
+def test_intern_rejects_other_values():
+    with pytest.raises(TypeError):
+        intern('text')
@@ -0,0 +1,80 @@
+import pytest
+
+from khl_card import ActionGroup, Button, Card, CardMessage, Context, Divider, Header, Image, Kmarkdown, Paragraph, \
+    PlainText, Section
+
+
+def make_card() -> Card:
+    return Card(Header(PlainText('title')),
+                Section(Kmarkdown('vote'), accessory=Button(PlainText('a'), value='vote:1')),
+                Section(Paragraph(3, [Kmarkdown('x'), PlainText('y'), Kmarkdown('z')]), mode='left',
+                        accessory=Image('https://img.example/a.png', circle=True)),
+                ActionGroup(Button(PlainText('b'), value='vote:2'), Button(Kmarkdown('c'), value='other', click='link')),
+                Context(PlainText('footer'), Image('https://img.example/b.png')),
+                Divider())
+
+
+def test_find():
+    card = make_card()
+    buttons = [card.modules[1].accessory, *card.modules[3].elements]
+    assert card.find(Button) is buttons[0]
+    assert card.find_all(Button) == buttons
+    assert card.find_all('button') == buttons
+    assert card.find(Button, value='vote:2') is buttons[1]
+    assert card.find_all(Button, value=lambda v: v.startswith('vote:')) == buttons[:2]
+    assert card.find_all('section', mode='left') == [card.modules[2]]
+    assert card.find(Button, value='missing') is None
+    assert len(card.find_all()) == 21
+    assert card.find_all((Header, Divider)) == [card.modules[0], card.modules[5]]
+
+
+@pytest.mark.parametrize('selector, expected', [
+    ('button', ['vote:1', 'vote:2', 'other']),
+    ('button[value^="vote:"]', ['vote:1', 'vote:2']),
+    ('button[value$=er]', ['other']),
+    ('button[value*=":"]', ['vote:1', 'vote:2']),
+    ('button[click=link]', ['other']),
+    ('section > button', ['vote:1']),
+    ('action-group button[value="vote:2"]', ['vote:2']),
+    ('card > button', []),
+])
+def test_select_buttons(selector, expected):
+    assert [i.value for i in make_card().select(selector)] == expected
+
+
+def test_select():
+    card = make_card()
+    paragraph = card.modules[2].text
+    assert card.select('paragraph[cols=3]') == [paragraph]
+    assert card.select('paragraph[cols="3"]') == []
+    assert card.select('image[circle=true]') == [card.modules[2].accessory]
+    assert card.select('section paragraph > kmarkdown') == [paragraph.fields[0], paragraph.fields[2]]
+    assert card.select('section > kmarkdown') == [card.modules[1].text]
+    assert card.select('context > *') == list(card.modules[4].elements)
+    assert card.select('[emoji]') == card.find_all(PlainText)
+    message = CardMessage(card, make_card())
+    assert len(message.select('button')) == 6
+    assert message.find(Divider) is card.modules[5]
+    assert len(message.find_all(Button, value='other')) == 2
+
+
+def test_index_updates_after_mutation():
+    card = make_card()
+    button = card.find(Button, value='vote:1')
+    button.value = 'changed'
+    assert card.find(Button, value='vote:1') is None
+    assert card.find(Button, value='changed') is button
+    assert card.select('button[value=changed]') == [button]
+
+    card.append(Section(Kmarkdown('new'), accessory=Button(PlainText('n'), value='vote:3')))
+    assert [i.value for i in card.select('button[value^="vote:"]')] == ['vote:2', 'vote:3']
+    card[3] = Divider()
+    assert [i.value for i in card.find_all(Button)] == ['changed', 'vote:3']
+    assert card.find_all(Divider) == [card.modules[3], card.modules[5]]
+
+    card.modules.insert(0, Section(Kmarkdown('first'), accessory=Button(PlainText('f'), value='vote:0')))
+    assert card.find(Button, value=lambda v: v.startswith('vote:')).value == 'vote:0'
+    del card.modules[0]
+    card.modules[2].text.fields[1].content = 'yy'
+    assert card.find(PlainText, content='yy') is card.modules[2].text.fields[1]
+    assert card.find(PlainText, content='y') is None
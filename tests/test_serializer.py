@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from khl_card import available_json_backends
+from khl_card.serializer import to_json
+
+BACKENDS = ['auto'] + available_json_backends()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_pretty_matches_stdlib(message, backend):
+    expected = json.dumps(message.build(), indent=4, ensure_ascii=False)
+    assert message.build_to_json(backend=backend) == expected
+    assert message.build_to_json(pretty=True, backend=backend) == expected
+    assert message.build_to_json(pretty=True, as_bytes=True, backend=backend) == expected.encode('utf-8')
+    card = message[0]
+    assert card.build_to_json(backend=backend) == json.dumps(card.build(), indent=4, ensure_ascii=False)
+    module = card.modules[1]
+    assert module.build_to_json(backend=backend) == json.dumps(module.build(), indent=4, ensure_ascii=False)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_compact_matches_stdlib(message, backend):
+    expected = json.dumps(message.build(), separators=(',', ':'), ensure_ascii=False)
+    assert message.build_to_json(pretty=False, backend=backend) == expected
+    assert to_json(message.build(), pretty=False, backend=backend) == expected
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_plain_values(backend):
+    data = {'a': '\x01\x1f\x7f é"\\/\n', 'b': [], 'c': {}, 'd': [1, {'e': None, 'f': True}], 'g': 1.5, 'h': 2 ** 70}
+    assert to_json(data, pretty=True, backend=backend) == json.dumps(data, indent=4, ensure_ascii=False)
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from khl_card import Button, Card, Context, Divider, Header, Image, Kmarkdown, Paragraph, PlainText, Section
+from khl_card.modules import _Module
+
+
+def compact(node) -> str:
+    return json.dumps(node.build(), separators=(',', ':'), ensure_ascii=False)
+
+
+def assert_size(node):
+    text = compact(node)
+    size = node.serialized_size
+    assert size.bytes == len(text.encode('utf-8'))
+    assert size.chars == len(text)
+
+
+def make_card() -> Card:
+    return Card(Header(PlainText('标题 ✨')),
+                Section(Paragraph(2, [Kmarkdown('**粗体**'), PlainText('b')]),
+                        accessory=Button(PlainText('按钮'), value='值')),
+                Context(PlainText('a'), Image('https://img.example/图.png', alt='图片')),
+                Divider())
+
+
+@pytest.mark.parametrize('index', range(4))
+def test_module_size(index):
+    assert_size(make_card().modules[index])
+
+
+def test_size_after_mutation():
+    card = make_card()
+    assert_size(card)
+    section = card.modules[1]
+    section.accessory.value = 'ascii'
+    assert_size(section)
+    assert_size(card)
+    section.text.fields[1].content = '中文'
+    assert_size(section)
+    assert_size(card)
+    section.mode = 'left'
+    section.accessory = None
+    assert_size(section)
+    assert_size(card)
+
+
+def test_size_after_in_place_list_mutation():
+    card = make_card()
+    assert_size(card)
+    context = card.modules[2]
+    context.elements = list(context.elements)
+    context.elements.append(Kmarkdown('追加'))
+    assert_size(context)
+    assert_size(card)
+    card.modules.append(Header(PlainText('尾')))
+    assert_size(card)
+
+
+def test_size_after_append_and_setitem():
+    card = make_card()
+    assert_size(card)
+    card.append(Section(Kmarkdown('新的 ✅')))
+    assert_size(card)
+    card[0] = Header(PlainText('替换'))
+    assert_size(card)
+    card[1].accessory.text.content = '改'
+    assert_size(card)
+
+
+def test_size_of_custom_build():
+    class Custom(_Module):
+        type = 'custom'
+
+        def __init__(self, text: str) -> None:
+            self.text = text
+
+        def build(self) -> dict:
+            return {'type': 'section', 'text': {'type': 'plain-text', 'content': self.text}}
+
+        def __repr__(self):
+            return f'Custom({self.text!r})'
+
+    module = Custom('自定义')
+    assert_size(module)
+    module.text = 'ascii'
+    assert_size(module)
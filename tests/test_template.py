@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from khl_card import Card, CardMessage, CardTemplate, Divider, Image, Kmarkdown, Repeat, Section
+from khl_card.modules import _Module
+from khl_card.node import _Node
+
+
+def make_template_card() -> Card:
+    return Card(Section(Kmarkdown('**${title}**')),
+                Repeat('rows', Section(Kmarkdown('${rank}. ${name}'), accessory=Image('${avatar}'))),
+                Divider())
+
+
+def test_render():
+    template = CardTemplate(make_template_card())
+    assert template.names == ['title', 'rows', 'rank', 'name', 'avatar']
+    text = template.render(title='排行"榜"', rows=[{'rank': 1, 'name': 'a', 'avatar': 'x'},
+                                                  {'rank': 2, 'name': 'b\n', 'avatar': 'y'}])
+    expected = Card(Section(Kmarkdown('**排行"榜"**')),
+                    Section(Kmarkdown('1. a'), accessory=Image('x')),
+                    Section(Kmarkdown('2. b\n'), accessory=Image('y')),
+                    Divider())
+    assert json.loads(text) == expected.build()
+    assert CardTemplate(CardMessage(make_template_card())).render_bytes(title='t', rows=[]) == \
+        ('[' + Card(Section(Kmarkdown('**t**')), Divider())._encode() + ']').encode('utf-8')
+
+
+def test_missing_value():
+    with pytest.raises(KeyError):
+        CardTemplate(make_template_card()).render(title='t')
+
+
+def test_repeat_is_not_a_node():
+    repeat = Repeat('rows', Divider())
+    assert not isinstance(repeat, _Node)
+    with pytest.raises(ValueError):
+        _Module.from_dict({'type': 'repeat'})
+    card = make_template_card()
+    assert card.modules[1] in card.modules
+    assert repeat not in card.modules
+    assert repeat == repeat
+    assert repeat != Repeat('rows', Divider())
+    assert card.modules.index(card.modules[1]) == 1
+    with pytest.raises(Exception):
+        repeat.build()
+
+
+def test_repeat_checks_modules():
+    with pytest.raises(Exception):
+        Repeat('a', Repeat('b'))
+    with pytest.raises(TypeError):
+        Repeat('a', Kmarkdown('x'))
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from khl_card.timestamp import to_timestamp
+
+UTC8 = timezone(timedelta(hours=8))
+
+
+def test_fixed_format():
+    assert to_timestamp('2022-05-05 08:00:00', UTC8) == 1651708800000
+
+
+@pytest.mark.parametrize('text', ['2022-05-05T00:00:00Z', '2022-05-05T00:00:00z', '2022-05-05T08:00:00+08:00',
+                                  '2022-05-05T00:00:00.000+00:00', '2022-05-05 00:00:00+00:00'])
+def test_iso_format(text):
+    assert to_timestamp(text) == 1651708800000
+
+
+def test_naive_uses_tz():
+    assert to_timestamp('2022-05-05T08:00', UTC8) == 1651708800000
+    assert to_timestamp(datetime(2022, 5, 5, 8), UTC8) == 1651708800000
+
+
+@pytest.mark.parametrize('value', ['2022-13-05 08:00:00', 'tomorrow', ''])
+def test_invalid(value):
+    with pytest.raises(ValueError):
+        to_timestamp(value)
+
+
+def test_invalid_type():
+    with pytest.raises(TypeError):
+        to_timestamp(True)
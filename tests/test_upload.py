@@ -0,0 +1,79 @@
+import asyncio
+import json
+from pathlib import Path
+
+from khl_card import AssetCache, AssetStore, AssetUploader, Card, Image, ImageGroup, LocalAsset
+
+
+class StubUploader(AssetUploader):
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def upload(self, data, filename: str) -> str:
+        await asyncio.sleep(0)
+        self.calls.append(filename)
+        return f'https://img.example/{len(self.calls)}/{filename}'
+
+
+def make_card(tmp_path: Path) -> Card:
+    path = tmp_path / 'gold.png'
+    path.write_bytes(b'gold')
+    return Card(ImageGroup(Image(path), Image(b'silver'), Image(LocalAsset(b'gold', 'same.png'))),
+                ImageGroup(Image(bytearray(b'silver')), Image(LocalAsset(str(path)))))
+
+
+def test_dedup_and_persistence(tmp_path, monkeypatch):
+    saves = []
+    save = AssetCache._save
+    monkeypatch.setattr(AssetCache, '_save', lambda self: (saves.append(1), save(self)))
+
+    index = tmp_path / 'assets.json'
+    uploader = StubUploader()
+    store = AssetStore(uploader, AssetCache(str(index)))
+    card = make_card(tmp_path)
+    assert asyncio.run(card.resolve(store=store)) is card
+    # 相同内容只上传一次，所有地址只保存一次索引
+    assert len(uploader.calls) == 2 and store.uploads == 2
+    assert len(saves) == 1
+    srcs = [image.src for module in card.modules for image in module.elements]
+    assert srcs[0] == srcs[2] == srcs[4]
+    assert srcs[1] == srcs[3]
+    assert len(json.loads(index.read_text(encoding='utf-8'))) == 2
+
+    # 新的进程读取索引后不再上传
+    other = StubUploader()
+    second = AssetStore(other, AssetCache(str(index)))
+    card = make_card(tmp_path)
+    asyncio.run(card.resolve(store=second))
+    assert other.calls == [] and second.uploads == 0
+    assert [image.src for module in card.modules for image in module.elements] == srcs
+
+
+def test_url_for_saves_by_default(tmp_path):
+    index = tmp_path / 'assets.json'
+    store = AssetStore(StubUploader(), AssetCache(str(index)))
+    url = asyncio.run(store.url_for(b'data'))
+    assert list(json.loads(index.read_text(encoding='utf-8')).values())[0][0] == url
+    asyncio.run(store.url_for(b'other', flush=False))
+    assert len(json.loads(index.read_text(encoding='utf-8'))) == 1
+    store.flush()
+    assert len(json.loads(index.read_text(encoding='utf-8'))) == 2
+
+
+def test_cache_ttl(tmp_path):
+    index = tmp_path / 'assets.json'
+    cache = AssetCache(str(index), ttl=-1)
+    cache.put('a', 'https://x')
+    assert cache.get('a') is None
+    assert len(AssetCache(str(index), ttl=-1)) == 0
+
+
+def test_expired_get_is_flushed(tmp_path):
+    index = tmp_path / 'assets.json'
+    cache = AssetCache(str(index))
+    cache.put('a', 'https://x')
+    cache.ttl = -1
+    assert cache.get('a') is None
+    assert len(json.loads(index.read_text(encoding='utf-8'))) == 1
+    cache.flush()
+    assert json.loads(index.read_text(encoding='utf-8')) == {}
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+
+import pytest
+
+from khl_card import ActionGroup, Button, Card, Context, Divider, Image, Kmarkdown, Paragraph, PlainText, Section, \
+    trusted, validate
+from khl_card.limits import is_trusted
+
+
+def test_valid_message(message):
+    assert validate(message) == []
+
+
+def test_trusted_skips_checks():
+    with pytest.raises(Exception):
+        Paragraph(4, [PlainText('a')])
+    with trusted():
+        assert is_trusted()
+        paragraph = Paragraph(4, [PlainText('a')])
+    assert not is_trusted()
+    assert [i.path for i in validate(paragraph)] == ['paragraph.cols']
+
+
+def test_trusted_is_per_thread():
+    seen = []
+    with trusted():
+        thread = threading.Thread(target=lambda: seen.append(is_trusted()))
+        thread.start()
+        thread.join()
+    assert seen == [False]
+
+
+def test_trusted_is_per_task():
+    async def other(started: asyncio.Event, seen: list):
+        await started.wait()
+        seen.append(is_trusted())
+
+    async def main():
+        started = asyncio.Event()
+        seen = []
+        task = asyncio.ensure_future(other(started, seen))
+        with trusted():
+            started.set()
+            await task
+        return seen
+
+    assert asyncio.run(main()) == [False]
+
+
+def test_non_node_values_reported():
+    with trusted():
+        card = Card(Section(PlainText('a'), accessory='x'),
+                    Context(PlainText('a'), 1),
+                    ActionGroup(Button(PlainText('b')), None),
+                    Section(Paragraph(2, [PlainText('a'), 'b'])),
+                    Section(object()),
+                    'divider',
+                    Divider())
+    violations = validate(card)
+    assert [(i.path, i.message) for i in violations] == [
+        ('card.modules[0].accessory', '只能为 image 或 button，实际为 str'),
+        ('card.modules[1].elements[1]', '只能为 plain-text|kmarkdown|image，实际为 int'),
+        ('card.modules[2].elements[1]', '只能为 button，实际为 NoneType'),
+        ('card.modules[3].text.fields[1]', '应为 plain-text 或 kmarkdown，实际为 str'),
+        ('card.modules[4].text', '应为 plain-text 或 kmarkdown，实际为 object'),
+        ('card.modules[5]', '应为模块，实际为 str'),
+    ]
+
+
+def test_wrong_node_type_reported():
+    with trusted():
+        card = Card(Section(Image('a')), Context(Kmarkdown('k'), Button(PlainText('b'))))
+    assert [i.message for i in validate(card)] == ['应为 plain-text 或 kmarkdown，实际为 image',
+                                                   '只能为 plain-text|kmarkdown|image，实际为 button']